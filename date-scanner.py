@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Datooprydning for medlemskaber
+Finder ugyldige og modstridende datoer i hele medlemskabstabellen i ét gennemløb af et snapshot, beregner rettelserne
+med samme regler som Membership_Manager::cleanup_invalid_dates() og skriver dem som ét SQL-script med UPDATE i bidder
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from membership_snapshot import insert_statements, open_snapshot
+
+STATUS_ON_HOLD = "on-hold"
+ISSUES = {
+    "end_date": "ugyldig end_date",
+    "start_after_end": "start_date efter end_date",
+    "paused_date": "paused_date uden pause",
+    "status_changed_date": "status_changed_date i fremtiden",
+}
+
+# new \DateTime( $start_date ) for a MySQL DATETIME string. PHP rolls zero
+# and overflowing parts over ('2024-00-00' is 2023-11-30), which SQLite
+# does too when month and day are added as offsets from January 1st.
+PHP_START = """
+CASE WHEN start_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]'
+      AND start_date <> '0000-00-00 00:00:00'
+     THEN datetime(substr(start_date, 1, 4) || '-01-01 ' || substr(start_date, 12, 8),
+                   (substr(start_date, 6, 2) - 1) || ' months', (substr(start_date, 9, 2) - 1) || ' days')
+END
+"""
+
+# Every check in one pass over the table, into a temp table. The end_date
+# condition is the query in cleanup_invalid_dates(); its fix is start_date
+# + 1 year, or one year from when the script runs (new_end NULL) when
+# start_date is empty or unparseable. modify( '+1 year' ) and SQLite both
+# turn Feb 29 into Mar 1. A start_date after a valid end_date gets the same
+# fix. paused_date is cleared when a row leaves on-hold in
+# update_membership(), and status_changed_date is current_time( 'mysql' ),
+# so never later than now.
+SCAN = f"""
+CREATE TEMP TABLE date_fixes AS
+SELECT id, user_id, start_date, end_date, paused_date, status_changed_date,
+       invalid_end, start_after_end, paused, changed_future,
+       invalid_end OR start_after_end AS fix_end,
+       CASE WHEN invalid_end OR start_after_end THEN datetime(php_start, '+1 year') END AS new_end
+FROM (
+    SELECT *,
+           end_date IS NULL OR end_date < '1970-01-01' AS invalid_end,
+           end_date >= '1970-01-01' AND start_date <> '0000-00-00 00:00:00' AND start_date > end_date AS start_after_end,
+           paused_date IS NOT NULL AND status <> '{STATUS_ON_HOLD}' AS paused,
+           COALESCE(status_changed_date > :now, 0) AS changed_future,
+           {PHP_START} AS php_start
+    FROM membership_subscriptions
+)
+WHERE invalid_end OR start_after_end OR paused OR changed_future
+ORDER BY id
+"""
+
+SUMMARY = """
+SELECT (SELECT COUNT(*) FROM membership_subscriptions), COUNT(*),
+       COALESCE(SUM(invalid_end), 0), COALESCE(SUM(start_after_end), 0), COALESCE(SUM(paused), 0),
+       COALESCE(SUM(changed_future), 0), COALESCE(SUM(fix_end AND new_end IS NULL), 0)
+FROM date_fixes
+"""
+
+# First and last id of every chunk_size rows, for the UPDATE ranges
+CHUNKS = """
+SELECT MIN(id), MAX(id) FROM (SELECT id, (ROW_NUMBER() OVER (ORDER BY id) - 1) / ? AS chunk FROM date_fixes)
+GROUP BY chunk ORDER BY chunk
+"""
+
+def scan(connection, now):
+    """Fill the date_fixes temp table with every row that has a date problem; `now` is site time"""
+    connection.execute(SCAN, {"now": now})
+
+def summarize(connection, now_utc):
+    scanned, rows, *counts, from_now = connection.execute(SUMMARY).fetchone()
+    return {
+        "scanned": scanned,
+        "rows": rows,
+        "issues": dict(zip(ISSUES, counts)),
+        # end_date set to a year from when the script runs, as PHP does for an empty start_date
+        "end_from_now": from_now,
+        "end_from_now_value": (now_utc + timedelta(days=365)).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def fixes(connection, limit=None):
+    """The first `limit` rows of date_fixes as dicts, for display"""
+    rows = connection.execute(
+        "SELECT id, user_id, invalid_end, start_after_end, paused, changed_future, start_date, end_date, new_end, "
+        "paused_date, status_changed_date FROM date_fixes ORDER BY id LIMIT ?", (-1 if limit is None else limit,))
+    return [{
+        "id": row_id,
+        "user_id": user_id,
+        "issues": [issue for issue, found in zip(ISSUES, found) if found],
+        "start_date": start_date,
+        "end_date": end_date,
+        "new_end_date": new_end,
+        "paused_date": paused_date,
+        "status_changed_date": status_changed_date,
+    } for row_id, user_id, *found, start_date, end_date, new_end, paused_date, status_changed_date in rows]
+
+def write_sql(stream, connection, prefix="wp_", chunk_size=1000, utc_offset=0.0):
+    """The date_fixes rows as UPDATE ... JOIN over id ranges of chunk_size rows
+
+    Each UPDATE commits on its own and checks the problem again on the live
+    row, so the script can be stopped and run again, and rows fixed since
+    the snapshot are left alone.
+    """
+    memberships = f"`{prefix}membership_subscriptions`"
+    offset = int(round(utc_offset * 60))
+    site_now = f"UTC_TIMESTAMP() + INTERVAL {offset} MINUTE"
+    count = connection.execute("SELECT COUNT(*) FROM date_fixes").fetchone()[0]
+
+    stream.write(f"-- Membership Manager: datooprydning af {count} medlemskaber\n")
+    stream.write(f"-- Genereret {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC. Kan afbrydes og køres igen; ryd objekt-cachen bagefter.\n")
+    stream.write("CREATE TEMPORARY TABLE `mm_date_fix` (id BIGINT UNSIGNED NOT NULL PRIMARY KEY, end_date DATETIME NULL, "
+                 "fix_end TINYINT NOT NULL, fix_paused TINYINT NOT NULL, fix_status_changed TINYINT NOT NULL);\n")
+    for statement in insert_statements(
+            "mm_date_fix", ["id", "end_date", "fix_end", "fix_paused", "fix_status_changed"],
+            connection.execute("SELECT id, new_end, fix_end, paused, changed_future FROM date_fixes ORDER BY id"),
+            chunk_size):
+        stream.write(statement)
+
+    stream.write("\n")
+    for first, last in connection.execute(CHUNKS, (chunk_size,)):
+        stream.write(f"""UPDATE {memberships} s JOIN `mm_date_fix` f ON f.id = s.id
+SET s.end_date = CASE WHEN f.fix_end AND (s.end_date IS NULL OR s.end_date < '1970-01-01' OR YEAR(s.end_date) < 1970
+                                         OR (s.start_date <> '0000-00-00 00:00:00' AND s.start_date > s.end_date))
+                      THEN COALESCE(f.end_date, UTC_TIMESTAMP() + INTERVAL 1 YEAR) ELSE s.end_date END,
+    s.paused_date = CASE WHEN f.fix_paused AND s.status <> '{STATUS_ON_HOLD}' THEN NULL ELSE s.paused_date END,
+    s.status_changed_date = CASE WHEN f.fix_status_changed AND s.status_changed_date > {site_now}
+                                 THEN {site_now} ELSE s.status_changed_date END
+WHERE f.id BETWEEN {first} AND {last};
+""")
+    stream.write("\nDROP TEMPORARY TABLE `mm_date_fix`;\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find ugyldige medlemskabsdatoer i et snapshot og skriv rettelserne som ét SQL-script.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--output", help="Skriv SQL-scriptet hertil (standard: kun opsummering)")
+    parser.add_argument("--prefix", default="wp_", help="WordPress tabelpræfiks")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rækker pr. INSERT og UPDATE")
+    parser.add_argument("--utc-offset", type=float, default=0.0,
+                        help="Sidens tidszone i timer; status_changed_date er current_time('mysql')")
+    parser.add_argument("--now", type=datetime.fromisoformat, help="Tidspunkt (UTC) der tjekkes mod (standard: nu)")
+    parser.add_argument("--limit", type=int, default=20, help="Antal rækker der vises (0 = alle)")
+    parser.add_argument("--json", action="store_true", help="Skriv resultatet som JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    now_utc = args.now or datetime.utcnow().replace(microsecond=0)
+    site_now = (now_utc + timedelta(hours=args.utc_offset)).strftime("%Y-%m-%d %H:%M:%S")
+    connection = open_snapshot(args.snapshot)
+    scan(connection, site_now)
+    summary = summarize(connection, now_utc)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_sql(f, connection, args.prefix, args.chunk_size, args.utc_offset)
+    shown = fixes(connection, args.limit or None)
+
+    if args.json:
+        json.dump({"summary": summary, "fixes": shown}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    for fix in shown:
+        changes = []
+        if "end_date" in fix["issues"] or "start_after_end" in fix["issues"]:
+            changes.append(f"end_date {fix['end_date']} → {fix['new_end_date'] or 'om et år'}")
+        if "paused_date" in fix["issues"]:
+            changes.append(f"paused_date {fix['paused_date']} → NULL")
+        if "status_changed_date" in fix["issues"]:
+            changes.append(f"status_changed_date {fix['status_changed_date']} → nu")
+        print(f"✓ #{fix['id']} (bruger {fix['user_id']}): " + ", ".join(changes))
+    if args.limit and summary["rows"] > args.limit:
+        print(f"   ... og {summary['rows'] - args.limit} mere")
+
+    print(f"\n{'='*60}\n📊 Datooprydning\n{'='*60}")
+    print(f"   {summary['scanned']} medlemskaber gennemgået, {summary['rows']} skal rettes")
+    for issue, label in ISSUES.items():
+        print(f"   {label:<34}{summary['issues'][issue]:>8}")
+    if summary["end_from_now"]:
+        print(f"   {summary['end_from_now']} uden brugbar start_date får end_date et år fra kørslen "
+              f"(nu: {summary['end_from_now_value']})")
+    if args.output:
+        print(f"\n📄 SQL-script skrevet til {args.output}")
+    print(f"\n✅ Gennemgået på {time.perf_counter() - started:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
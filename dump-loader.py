@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Indlæsning af mysqldump-filer som data-snapshot
+Læser en almindelig (evt. gzip-komprimeret) mysqldump linje for linje, indlæser kun de valgte tabeller og
+skriver en SQLite-fil med snapshot-skemaet og indekserne fra membership_snapshot.py, med ugyldige datoer normaliseret
+"""
+
+import argparse
+import gzip
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from membership_snapshot import INDEXES, SCHEMA, blank_values, create_schema
+
+# Snapshot table: the WordPress tables (without prefix) it is built from.
+# Orders come from wc_orders when HPOS is in use and from posts otherwise.
+ORDER_SOURCES = ["posts", "postmeta", "wc_orders", "wc_order_addresses", "wc_orders_meta"]
+ITEM_SOURCES = ORDER_SOURCES + ["woocommerce_order_items", "woocommerce_order_itemmeta",
+                                "term_relationships", "term_taxonomy", "terms"]
+SOURCES = {
+    "membership_subscriptions": ["membership_subscriptions"],
+    "security_log": ["membership_security_log"],
+    "users": ["users"],
+    "usermeta": ["usermeta"],
+    "options": ["options"],
+    "orders": ORDER_SOURCES,
+    "order_items": ITEM_SOURCES,
+    "order_notes": ["comments", "commentmeta"],
+    "wcs_subscriptions": ORDER_SOURCES,
+    "wcs_subscription_items": ITEM_SOURCES,
+}
+
+# Tables copied column by column: {snapshot column: dump column}, the rows
+# to keep, and the datetime columns to validate
+COPIED = {
+    "membership_subscriptions": ({}, "", ["start_date", "end_date", "paused_date", "status_changed_date"]),
+    "security_log": ({}, "", ["created_at"]),
+    "users": ({"id": "ID"}, "", []),
+    "usermeta": ({}, "", []),
+    # Transients are cache entries and often most of the table
+    "options": ({}, r"WHERE option_name NOT LIKE '\_transient%' ESCAPE '\' "
+                    r"AND option_name NOT LIKE '\_site\_transient%' ESCAPE '\'", []),
+    "order_notes": ({"note_id": "comment_ID", "order_id": "comment_post_ID", "date_created": "comment_date",
+                     "content": "comment_content"}, "WHERE comment_type = 'order_note'", ["date_created"]),
+}
+
+# mysqldump writes every statement on one line: strings escape newlines, so
+# a line is at most one extended INSERT (--net-buffer-length, 1 MB by default)
+CREATE = re.compile(rb"CREATE TABLE `([^`]+)` \(")
+COLUMN = re.compile(rb"\s+`([^`]+)` ")
+INSERT = re.compile(rb"(?:INSERT|REPLACE)(?: IGNORE)? INTO `([^`]+)`(?: \(([^)]*)\))? VALUES ")
+ESCAPE = re.compile(r"\\(.)", re.S)
+# _binary '...' and 0x... (--hex-blob) values; strings are matched whole so
+# that text inside them is left alone
+BINARY_VALUE = re.compile(r"'(?:[^']|'')*'|(?<=[(,])_binary (?=')|(?<=[(,])0x([0-9A-Fa-f]*)(?=[,)])")
+MYSQL_ESCAPES = {"'": "''", "0": "'||char(0)||'", "n": "\n", "r": "\r", "t": "\t", "b": "\b", "Z": "\x1a"}
+
+def mysql_to_sqlite(values):
+    """The VALUES list of a mysqldump INSERT with SQLite string literals
+
+    MySQL escapes with backslashes; SQLite only knows '' and reads every
+    other character literally. NUL cannot appear in SQL text, so \\0
+    becomes a char(0) concatenated into the string.
+    """
+    if "\\" in values:
+        values = ESCAPE.sub(lambda match: MYSQL_ESCAPES.get(match.group(1), match.group(1)), values)
+    if "_binary '" in values or "0x" in values:
+        values = BINARY_VALUE.sub(binary_value, values)
+    return values
+
+def binary_value(match):
+    text = match.group(0)
+    if text.startswith("'"):
+        return text
+    return f"X'{match.group(1)}'" if match.group(1) is not None else ""
+
+def open_dump(path):
+    if path == "-":
+        return sys.stdin.buffer
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if compressed else open(path, "rb")
+
+def read_statements(dump, prefix, wanted, columns):
+    """Yield ("create", table, columns) and ("insert", table, SQL) for the wanted tables in a dump
+
+    Tables are named without prefix and `columns` is filled with each
+    table's column list. Only one line of the dump is held at a time.
+    """
+    names = {f"{prefix}{table}".encode(): table for table in wanted}
+    creating = None
+    for line in dump:
+        if line.startswith(b"INSERT") or line.startswith(b"REPLACE"):
+            match = INSERT.match(line)
+            if not match or match.group(1) not in names:
+                continue
+            table = names[match.group(1)]
+            # --complete-insert names the columns in every statement
+            listed = [name.decode() for name in re.findall(rb"`([^`]+)`", match.group(2) or b"")]
+            if table not in columns:
+                if not listed:
+                    raise ValueError(f"{prefix}{table}: INSERT uden kolonneliste og uden CREATE TABLE foran")
+                columns[table] = listed
+                yield "create", table, listed
+            target = f"[{table}] ({', '.join(f'[{name}]' for name in listed)})" if listed else f"[{table}]"
+            values = mysql_to_sqlite(line[match.end():].rstrip().rstrip(b";").decode("utf-8", "replace"))
+            yield "insert", table, f"INSERT INTO {target} VALUES {values}"
+        elif creating is not None:
+            match = COLUMN.match(line)
+            if match:
+                columns[creating].append(match.group(1).decode())
+            elif line.startswith(b")"):
+                yield "create", creating, columns[creating]
+                creating = None
+        elif line.startswith(b"CREATE TABLE"):
+            match = CREATE.match(line)
+            if match and match.group(1) in names:
+                creating = names[match.group(1)]
+                columns[creating] = []
+
+def stage_into(path, statements):
+    """Run the statements against the scratch database at `path`; returns {table: rows}"""
+    connection = sqlite3.connect(path, isolation_level=None, cached_statements=0)
+    # The compiled form of a 1 MB VALUES list is several times its size,
+    # so statements are not cached, and a scratch file needs no journal
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("BEGIN")
+    counts = {}
+    for kind, table, payload in statements:
+        if kind == "create":
+            # Untyped columns keep the values as the dump wrote them
+            connection.execute(f"DROP TABLE IF EXISTS [{table}]")
+            connection.execute(f"CREATE TABLE [{table}] ({', '.join(f'[{name}]' for name in payload)})")
+            counts.setdefault(table, 0)
+        else:
+            before = connection.total_changes
+            try:
+                connection.execute(payload)
+            except sqlite3.Error as error:
+                raise sqlite3.Error(f"{table}: {error}") from None
+            counts[table] += connection.total_changes - before
+    connection.execute("COMMIT")
+    connection.close()
+    return counts
+
+def stage_worker(path, queue, results):
+    """stage_into() fed from a queue until None; errors are reported once the queue is drained"""
+    statements = iter(queue.get, None)
+    try:
+        results.put(stage_into(path, statements))
+    except sqlite3.Error as error:
+        for _ in statements:
+            pass
+        results.put(str(error))
+
+def stage(dump, prefix, wanted, scratch, jobs=1):
+    """Stage the wanted tables of a dump in scratch databases; returns ({table: rows}, {table: columns})
+
+    With more than one job, the INSERTs are spread over worker processes
+    that each parse into their own scratch file, and CREATE TABLE goes to
+    all of them.
+    """
+    columns = {}
+    statements = read_statements(dump, prefix, wanted, columns)
+    if jobs <= 1:
+        return stage_into(scratch[0], statements), columns
+
+    context = multiprocessing.get_context()
+    # A few statements per worker in flight keeps memory bounded
+    queues = [context.Queue(4) for _ in scratch]
+    results = context.Queue()
+    workers = [context.Process(target=stage_worker, args=(path, queue, results), daemon=True)
+               for path, queue in zip(scratch, queues)]
+    for worker in workers:
+        worker.start()
+    try:
+        number = 0
+        for statement in statements:
+            if statement[0] == "create":
+                for queue in queues:
+                    queue.put(statement)
+            else:
+                queues[number % len(queues)].put(statement)
+                number += 1
+        for queue in queues:
+            queue.put(None)
+        results = [results.get() for _ in workers]
+    except BaseException:
+        # Nothing more will be read from the queues
+        for queue in queues:
+            queue.cancel_join_thread()
+        for worker in workers:
+            worker.terminate()
+        raise
+    for worker in workers:
+        worker.join()
+    errors = [result for result in results if isinstance(result, str)]
+    if errors:
+        raise sqlite3.Error(errors[0])
+    counts = {}
+    for result in results:
+        for table, rows in result.items():
+            counts[table] = counts.get(table, 0) + rows
+    return counts, columns
+
+def attach_staging(connection, scratch, staged):
+    """Attach the scratch files and expose each staged table as the view dump_<table>"""
+    for number, path in enumerate(scratch):
+        connection.execute(f"ATTACH DATABASE ? AS stage{number}", (path,))
+    for table in staged:
+        union = " UNION ALL ".join(f"SELECT * FROM stage{number}.[{table}]" for number in range(len(scratch)))
+        connection.execute(f"CREATE TEMP VIEW [dump_{table}] AS {union}")
+
+def valid_datetime(expression, fallback):
+    """SQL for a MySQL datetime that is kept only when it is a real date and time
+
+    0000-00-00 00:00:00 (the column default in activate()), zero months or
+    days and dates such as 2026-02-30 all become `fallback`.
+    """
+    return f"(CASE WHEN datetime({expression}, '+0 days') = {expression} THEN {expression} ELSE {fallback} END)"
+
+def copy_table(connection, table, columns):
+    """INSERT ... SELECT from the dump for a COPIED table; returns the invalid datetimes replaced"""
+    renamed, where, dates = COPIED[table]
+    source = f"[dump_{SOURCES[table][0]}]"
+    blanks = blank_values(table)
+    select = []
+    for column in blanks:
+        name = renamed.get(column, column)
+        if name not in columns:
+            select.append(blanks[column])
+        elif column in dates:
+            select.append(valid_datetime(f"[{name}]", blanks[column]))
+        elif blanks[column] != "NULL":
+            select.append(f"COALESCE([{name}], {blanks[column]})")
+        else:
+            select.append(f"[{name}]")
+    connection.execute(f"INSERT OR REPLACE INTO {table} ({', '.join(blanks)}) SELECT {', '.join(select)} FROM {source} {where}")
+    # Every replaced value is now the column's empty value, so counting
+    # those before and after is cheaper than validating every date twice
+    checked = [column for column in dates if renamed.get(column, column) in columns]
+    if not checked:
+        return 0
+    after = " + ".join(f"({column} IS {blanks[column]})" for column in checked)
+    before = " + ".join(f"([{renamed.get(column, column)}] IS {blanks[column]})" for column in checked)
+    return (connection.execute(f"SELECT TOTAL({after}) FROM {table}").fetchone()[0]
+            - connection.execute(f"SELECT TOTAL({before}) FROM {source} {where}").fetchone()[0])
+
+# The order columns the snapshot needs, from either order storage. HPOS rows
+# win when a store syncs both.
+ORDER_HEAD = """
+CREATE TEMP TABLE order_head (
+    id INTEGER PRIMARY KEY, type TEXT, status TEXT, date_created TEXT, parent_id INTEGER,
+    user_id INTEGER, billing_email TEXT, billing_first_name TEXT, billing_last_name TEXT
+)
+"""
+HPOS_HEAD = """
+INSERT OR IGNORE INTO order_head
+SELECT o.id, o.type, o.status, o.date_created_gmt, o.parent_order_id, o.customer_id, o.billing_email,
+       a.first_name, a.last_name
+FROM dump_wc_orders o
+LEFT JOIN dump_wc_order_addresses a ON a.order_id = o.id AND a.address_type = 'billing'
+WHERE o.type IN ('shop_order', 'shop_subscription')
+"""
+POSTS_HEAD = """
+INSERT OR IGNORE INTO order_head (id, type, status, date_created, parent_id)
+SELECT ID, post_type, post_status, post_date_gmt, post_parent FROM dump_posts
+WHERE post_type IN ('shop_order', 'shop_subscription')
+"""
+META_KEYS = {
+    "customer_user": "_customer_user",
+    "billing_email": "_billing_email",
+    "billing_first_name": "_billing_first_name",
+    "billing_last_name": "_billing_last_name",
+    "membership_created": "_membership_created",
+    "membership_ids": "_membership_ids",
+    "renewal_of": "_subscription_renewal",
+    "schedule_start": "_schedule_start",
+    "schedule_end": "_schedule_end",
+}
+
+def order_meta_sql(table, id_column):
+    pivot = ", ".join(f"MAX(CASE WHEN meta_key = '{key}' THEN meta_value END) AS {name}"
+                      for name, key in META_KEYS.items())
+    keys = ", ".join(f"'{key}'" for key in META_KEYS.values())
+    return (f"INSERT OR IGNORE INTO order_meta SELECT {id_column}, {pivot} FROM dump_{table} "
+            f"WHERE meta_key IN ({keys}) AND {id_column} IN (SELECT id FROM order_head) GROUP BY {id_column}")
+
+ORDERS = f"""
+INSERT OR REPLACE INTO orders
+SELECT h.id, COALESCE(h.status, ''), {valid_datetime("h.date_created", "''")},
+       COALESCE(h.user_id, CAST(m.customer_user AS INTEGER), 0),
+       COALESCE(h.billing_email, m.billing_email, ''),
+       COALESCE(h.billing_first_name, m.billing_first_name, ''),
+       COALESCE(h.billing_last_name, m.billing_last_name, ''),
+       COALESCE(m.membership_created, ''), COALESCE(m.membership_ids, ''),
+       CASE WHEN CAST(m.renewal_of AS INTEGER) > 0 THEN 'renewal' WHEN parent.id IS NOT NULL THEN 'parent' ELSE '' END,
+       CASE WHEN CAST(m.renewal_of AS INTEGER) > 0 THEN CAST(m.renewal_of AS INTEGER) ELSE parent.id END
+FROM order_head h
+LEFT JOIN order_meta m ON m.id = h.id
+LEFT JOIN (SELECT parent_id, MIN(id) AS id FROM order_head WHERE type = 'shop_subscription' GROUP BY parent_id) parent
+       ON parent.parent_id = h.id
+WHERE h.type = 'shop_order'
+"""
+WCS_SUBSCRIPTIONS = """
+INSERT OR REPLACE INTO wcs_subscriptions
+SELECT h.id, COALESCE(h.user_id, CAST(m.customer_user AS INTEGER), 0), COALESCE(h.status, ''),
+       COALESCE(m.schedule_start, ''), COALESCE(m.schedule_end, '')
+FROM order_head h LEFT JOIN order_meta m ON m.id = h.id
+WHERE h.type = 'shop_subscription'
+"""
+# WC_Subscriptions_Product::is_subscription(): the product_type term
+SUBSCRIPTION_PRODUCTS = """
+CREATE TEMP TABLE subscription_products AS
+SELECT DISTINCT tr.object_id AS product_id FROM dump_term_relationships tr
+JOIN dump_term_taxonomy tt ON tt.term_taxonomy_id = tr.term_taxonomy_id AND tt.taxonomy = 'product_type'
+JOIN dump_terms t ON t.term_id = tt.term_id
+WHERE t.slug IN ('subscription', 'variable-subscription')
+"""
+ITEM_PRODUCTS = """
+CREATE TEMP TABLE item_products AS
+SELECT order_item_id AS item_id, MAX(CAST(meta_value AS INTEGER)) AS product_id
+FROM dump_woocommerce_order_itemmeta WHERE meta_key = '_product_id' GROUP BY order_item_id
+"""
+LINE_ITEMS = """
+SELECT i.order_item_id, i.order_id, COALESCE(p.product_id, 0), {name}
+       p.product_id IN (SELECT product_id FROM subscription_products)
+FROM dump_woocommerce_order_items i
+JOIN order_head h ON h.id = i.order_id AND h.type = '{type}'
+LEFT JOIN item_products p ON p.item_id = i.order_item_id
+WHERE i.order_item_type = 'line_item'
+"""
+
+def build_orders(connection, tables, staged):
+    """Fill the WooCommerce snapshot tables among `tables` from the staged order storage"""
+    for table in ORDER_SOURCES[:2] + ITEM_SOURCES[len(ORDER_SOURCES):]:
+        ensure_staging(connection, staged, table)
+    hpos = bool(staged.get("wc_orders"))
+    if hpos:
+        ensure_staging(connection, staged, "wc_order_addresses")
+        ensure_staging(connection, staged, "wc_orders_meta")
+    connection.execute(ORDER_HEAD)
+    if hpos:
+        connection.execute(HPOS_HEAD)
+    connection.execute(POSTS_HEAD)
+    connection.execute(f"CREATE TEMP TABLE order_meta (id INTEGER PRIMARY KEY, {', '.join(META_KEYS)})")
+    if hpos:
+        connection.execute(order_meta_sql("wc_orders_meta", "order_id"))
+    connection.execute(order_meta_sql("postmeta", "post_id"))
+    if "orders" in tables:
+        connection.execute(ORDERS)
+    if "wcs_subscriptions" in tables:
+        connection.execute(WCS_SUBSCRIPTIONS)
+    if "order_items" in tables or "wcs_subscription_items" in tables:
+        connection.execute(SUBSCRIPTION_PRODUCTS)
+        connection.execute(ITEM_PRODUCTS)
+        if "order_items" in tables:
+            connection.execute("INSERT OR REPLACE INTO order_items "
+                               + LINE_ITEMS.format(name="COALESCE(i.order_item_name, ''),", type="shop_order"))
+        if "wcs_subscription_items" in tables:
+            connection.execute("INSERT OR REPLACE INTO wcs_subscription_items "
+                               + LINE_ITEMS.format(name="", type="shop_subscription"))
+
+# The columns build_orders() reads, for tables missing from the dump
+STAGING_COLUMNS = {
+    "posts": ["ID", "post_type", "post_status", "post_date_gmt", "post_parent"],
+    "postmeta": ["meta_id", "post_id", "meta_key", "meta_value"],
+    "wc_orders": ["id", "type", "status", "date_created_gmt", "parent_order_id", "customer_id", "billing_email"],
+    "wc_order_addresses": ["id", "order_id", "address_type", "first_name", "last_name"],
+    "wc_orders_meta": ["id", "order_id", "meta_key", "meta_value"],
+    "woocommerce_order_items": ["order_item_id", "order_item_name", "order_item_type", "order_id"],
+    "woocommerce_order_itemmeta": ["meta_id", "order_item_id", "meta_key", "meta_value"],
+    "term_relationships": ["object_id", "term_taxonomy_id"],
+    "term_taxonomy": ["term_taxonomy_id", "term_id", "taxonomy"],
+    "terms": ["term_id", "name", "slug"],
+    "commentmeta": ["meta_id", "comment_id", "meta_key", "meta_value"],
+}
+
+def ensure_staging(connection, staged, table):
+    """An empty dump_<table> for a table the dump does not have"""
+    if table not in staged:
+        connection.execute(f"CREATE TEMP TABLE [dump_{table}] ({', '.join(STAGING_COLUMNS[table])})")
+        staged[table] = 0
+
+# WC_Order::add_order_note() only adds is_customer_note for customer notes,
+# and wc_get_order_notes( 'type' => 'internal' ) asks for it NOT EXISTS
+CUSTOMER_NOTES = """
+UPDATE order_notes SET is_customer_note = 1
+WHERE note_id IN (SELECT comment_id FROM dump_commentmeta WHERE meta_key = 'is_customer_note')
+"""
+
+def load_dump(path, output, prefix="wp_", tables=None, jobs=1):
+    """Write the snapshot for the dump at `path` to the SQLite file `output`
+
+    The dump is staged in scratch databases next to the output, one per
+    job, and they are removed afterwards. Returns (rows per snapshot table,
+    rows per staged dump table, invalid datetimes replaced, bytes read).
+    """
+    tables = tables or list(SOURCES)
+    wanted = sorted({source for table in tables for source in SOURCES[table]})
+    scratch = [f"{output}.staging{number}" for number in range(max(jobs, 1))]
+    for leftover in [output + ".tmp"] + scratch:
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    try:
+        with open_dump(path) as dump:
+            staged, columns = stage(dump, prefix, wanted, scratch, jobs)
+            read = dump.tell() if dump is not sys.stdin.buffer else 0
+
+        connection = sqlite3.connect(output + ".tmp", isolation_level=None)
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        create_schema(connection)
+        attach_staging(connection, scratch, staged)
+        connection.execute("BEGIN")
+        invalid = {}
+        for table in tables:
+            if table in COPIED and SOURCES[table][0] in staged:
+                invalid[table] = int(copy_table(connection, table, columns[SOURCES[table][0]]))
+        if "order_notes" in tables:
+            ensure_staging(connection, staged, "commentmeta")
+            connection.execute(CUSTOMER_NOTES)
+        if any(table in tables for table in ("orders", "order_items", "wcs_subscriptions", "wcs_subscription_items")):
+            build_orders(connection, tables, staged)
+        connection.execute("COMMIT")
+        for number in range(len(scratch)):
+            connection.execute(f"DETACH DATABASE stage{number}")
+        for statement in INDEXES:
+            connection.execute(statement)
+        connection.execute("ANALYZE")
+        counts = {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in SCHEMA}
+        connection.close()
+    finally:
+        for path in scratch:
+            if os.path.exists(path):
+                os.remove(path)
+    os.replace(output + ".tmp", output)
+    return counts, staged, invalid, read
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indlæs en mysqldump som SQLite-snapshot til de offline værktøjer.")
+    parser.add_argument("dump", help="mysqldump-fil, evt. .gz (- for stdin)")
+    parser.add_argument("output", help="SQLite-fil der skrives (kan bruges som snapshot)")
+    parser.add_argument("--prefix", default="wp_", help="Tabelpræfiks i dumpet")
+    parser.add_argument("--table", action="append", choices=list(SOURCES),
+                        help="Snapshot-tabel der indlæses (kan gentages; standard: alle)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Antal processer der fortolker INSERT-sætningerne")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        counts, staged, invalid, read = load_dump(args.dump, args.output, args.prefix, args.table, args.jobs)
+    except (OSError, ValueError, sqlite3.Error) as error:
+        print(f"❌ {error}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print(f"{'='*60}\n📊 {args.dump} → {args.output}\n{'='*60}")
+    for table, rows in staged.items():
+        print(f"   {args.prefix}{table}: {rows} rækker")
+    print()
+    for table in args.table or SOURCES:
+        note = f" ({invalid[table]} ugyldige datoer normaliseret)" if invalid.get(table) else ""
+        print(f"   {table}: {counts[table]} rækker{note}")
+    missing = [f"{args.prefix}{table}" for table in ("membership_subscriptions", "membership_security_log")
+               if table in {s for t in (args.table or SOURCES) for s in SOURCES[t]} and table not in staged]
+    for table in missing:
+        print(f"   ⚠ {table} findes ikke i dumpet (forkert --prefix?)")
+    speed = f", {read / elapsed / (1024 * 1024):.0f} MB/s" if read else ""
+    print(f"\n✅ Indlæst på {elapsed:.1f} s{speed}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
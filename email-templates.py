@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Forudkompilerede påmindelses-e-mails for Membership Manager
+Oversætter templates/emails/*-reminder-*.php én gang pr. sprog til statisk tekst med kendte positioner
+for [user_name], [end_date] og [renewal_link], og fletter mange modtagere ind i ét gennemløb
+"""
+
+import argparse
+import csv
+import html
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from membership_snapshot import get_option, open_snapshot
+from php_i18n import (TEXT_DOMAIN, PRINTF_PLACEHOLDER, decode_double_quoted,
+                      decode_single_quoted, read_arguments, read_po, tokenize)
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(PLUGIN_DIR, "templates", "emails")
+LANGUAGES_DIR = os.path.join(PLUGIN_DIR, "languages")
+BUILD_DIR = os.path.join(PLUGIN_DIR, "build")
+COMPILED_VERSION = 1
+
+REMINDER_TYPES = ["30_days", "14_days", "7_days", "1_day"]
+
+# Template file prefix and the placeholders str_replace()d, in order, by
+# Membership_Emails::send_automatic/manual_renewal_reminders()
+RENEWAL_TYPES = {
+    "automatic": ("renewal-reminder-", ["[user_name]", "[end_date]"]),
+    "manual": ("manual-renewal-reminder-", ["[user_name]", "[end_date]", "[renewal_link]"]),
+}
+
+# Membership_Emails::get_reminder_subject() defaults
+SUBJECTS = {
+    "30_days": "Dit medlemskab udløber om 30 dage",
+    "14_days": "Dit medlemskab udløber om 14 dage",
+    "7_days": "Dit medlemskab udløber om 7 dage",
+    "1_day": "Dit medlemskab udløber i morgen",
+}
+
+# Options from the settings page that get_reminder_subject() reads before the defaults
+SUBJECT_OPTIONS = {
+    "30_days": "membership_reminder_30_subject",
+    "14_days": "membership_reminder_14_subject",
+    "7_days": "membership_reminder_7_subject",
+    "1_day": "membership_reminder_1_subject",
+}
+
+# Inline HTML and <?php ... ?> blocks; PHP swallows one newline right after ?>
+PHP_BLOCK = re.compile(r"<\?php\b(.*?)(?:\?>\n?|\Z)", re.S)
+
+MONTHS = {
+    "da": ["januar", "februar", "marts", "april", "maj", "juni", "juli", "august",
+           "september", "oktober", "november", "december"],
+    "en": ["January", "February", "March", "April", "May", "June", "July", "August",
+           "September", "October", "November", "December"],
+}
+WEEKDAYS = {
+    "da": ["mandag", "tirsdag", "onsdag", "torsdag", "fredag", "lørdag", "søndag"],
+    "en": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+}
+
+class UnsupportedTemplate(Exception):
+    """Raised for template PHP the compiler cannot evaluate ahead of time"""
+
+def template_path(renewal_type, reminder_type):
+    prefix, _ = RENEWAL_TYPES[renewal_type]
+    return os.path.join(TEMPLATE_DIR, prefix + reminder_type.replace("_", "-") + ".php")
+
+def load_catalogue(locale):
+    """msgid => msgstr for a locale from languages/membership-manager-<locale>.po, {} if there is none"""
+    path = os.path.join(LANGUAGES_DIR, f"{TEXT_DOMAIN}-{locale}.po")
+    if not os.path.exists(path):
+        return {}
+    _, messages, translations = read_po(path)
+    catalogue = {}
+    for key, translation in translations.items():
+        if "fuzzy" in messages[key].get("flags", ()) or key[0] is not None:
+            continue
+        catalogue[messages[key]["msgid"]] = translation[0] if isinstance(translation, list) else translation
+    return catalogue
+
+def php_sprintf(format_string, args):
+    """sprintf() for the %s/%d/%n$s conversions the templates use"""
+    position = iter(range(len(args)))
+
+    def replace(match):
+        spec = match.group(0)
+        if spec == "%%":
+            return "%"
+        numbered = re.match(r"%(\d+)\$", spec)
+        index = int(numbered.group(1)) - 1 if numbered else next(position)
+        value = args[index]
+        if spec.endswith("d"):
+            return str(int(value) if str(value).lstrip("-").isdigit() else 0)
+        if spec.endswith("s"):
+            return str(value)
+        raise UnsupportedTemplate(f"printf-format {spec}")
+
+    return re.sub(r"%%|" + PRINTF_PLACEHOLDER.pattern, replace, format_string)
+
+class TemplateEvaluator:
+    """Evaluates the echo/_e/printf statements of a template with a fixed catalogue"""
+
+    TRANSLATE = {"__": None, "esc_html__": html.escape, "esc_attr__": html.escape}
+    ECHO_TRANSLATE = {"_e": None, "esc_html_e": html.escape, "esc_attr_e": html.escape}
+
+    def __init__(self, catalogue):
+        self.catalogue = catalogue
+
+    def translate(self, text):
+        return self.catalogue.get(text) or text
+
+    def expression(self, tokens):
+        """Value of a concatenation of literals and translation calls"""
+        parts = []
+        expect_value = True
+        for kind, text, _ in tokens:
+            if not expect_value:
+                if text != ".":
+                    raise UnsupportedTemplate(text)
+            elif kind == "sq":
+                parts.append(decode_single_quoted(text))
+            elif kind == "dq":
+                parts.append(decode_double_quoted(text))
+            elif kind == "call":
+                parts.append(text)
+            else:
+                raise UnsupportedTemplate(text)
+            expect_value = not expect_value
+        if expect_value:
+            raise UnsupportedTemplate("tomt udtryk")
+        return "".join(parts)
+
+    def fold_calls(self, tokens):
+        """Replace translation and sprintf() calls by ("call", value) tokens"""
+        folded = []
+        tokens = iter(tokens)
+        for kind, text, line in tokens:
+            if kind == "name" and (text in self.TRANSLATE or text == "sprintf"):
+                opening = next(tokens, None)
+                if not opening or opening[1] != "(":
+                    raise UnsupportedTemplate(text)
+                args = [self.expression(self.fold_calls(arg)) for arg in read_arguments(tokens)]
+                if text == "sprintf":
+                    folded.append(("call", php_sprintf(args[0], args[1:]), line))
+                else:
+                    value = self.translate(args[0])
+                    escape = self.TRANSLATE[text]
+                    folded.append(("call", escape(value) if escape else value, line))
+            else:
+                folded.append((kind, text, line))
+        return folded
+
+    def statements(self, tokens):
+        statement = []
+        for token in tokens:
+            if token[0] == "other" and token[1] == ";":
+                yield statement
+                statement = []
+            elif token[0] not in ("comment", "close"):
+                statement.append(token)
+        if statement:
+            yield statement
+
+    def block(self, code):
+        """Output of one <?php ... ?> block"""
+        tokens = list(tokenize("<?php " + code + " ?>"))
+        if tokens and tokens[0][1] == "if" and any(text.strip("'\"") == "ABSPATH" for _, text, _ in tokens):
+            return ""  # Direct access guard; ABSPATH is always defined inside WordPress
+        output = []
+        for statement in self.statements(tokens):
+            kind, name, _ = statement[0]
+            rest = iter(statement[1:])
+            if name == "echo":
+                output.append(self.expression(self.fold_calls(list(rest))))
+                continue
+            if kind != "name" or next(rest, (None, None))[1] != "(":
+                raise UnsupportedTemplate(name)
+            args = [self.expression(self.fold_calls(arg)) for arg in read_arguments(rest)]
+            if name in self.ECHO_TRANSLATE:
+                value = self.translate(args[0])
+                escape = self.ECHO_TRANSLATE[name]
+                output.append(escape(value) if escape else value)
+            elif name == "printf":
+                output.append(php_sprintf(args[0], args[1:]))
+            else:
+                raise UnsupportedTemplate(name)
+        return "".join(output)
+
+    def render(self, content):
+        output = []
+        position = 0
+        for match in PHP_BLOCK.finditer(content):
+            output.append(content[position:match.start()])
+            output.append(self.block(match.group(1)))
+            position = match.end()
+        output.append(content[position:])
+        return "".join(output)
+
+class CompiledTemplate:
+    """A rendered template body split at its placeholders
+
+    render() joins the static segments with the recipient's values, which
+    gives the same result as the chain of str_replace() calls in
+    Membership_Emails as long as no value itself contains a placeholder;
+    values with "[" fall back to the sequential replacement.
+    """
+
+    def __init__(self, body, slots, placeholders, subject):
+        self.body = body
+        self.slots = slots
+        self.placeholders = placeholders
+        self.subject = subject
+        self.segments = []
+        self.names = []
+        position = 0
+        for offset, placeholder in slots:
+            self.segments.append(body[position:offset])
+            self.names.append(placeholder)
+            position = offset + len(placeholder)
+        self.tail = body[position:]
+
+    @classmethod
+    def build(cls, body, placeholders, subject):
+        pattern = re.compile("|".join(re.escape(p) for p in placeholders))
+        slots = [(match.start(), match.group(0)) for match in pattern.finditer(body)]
+        return cls(body, slots, placeholders, subject)
+
+    def render(self, values):
+        if any("[" in values.get(name, "") for name in self.placeholders):
+            message = self.body
+            for placeholder in self.placeholders:
+                message = message.replace(placeholder, values.get(placeholder, ""))
+            return message
+        parts = []
+        for segment, name in zip(self.segments, self.names):
+            parts.append(segment)
+            parts.append(values.get(name, ""))
+        parts.append(self.tail)
+        return "".join(parts)
+
+    def to_json(self):
+        return {"body": self.body, "slots": self.slots, "placeholders": self.placeholders, "subject": self.subject}
+
+def source_files(locale):
+    files = [template_path(renewal, reminder) for renewal in RENEWAL_TYPES for reminder in REMINDER_TYPES]
+    files.append(os.path.join(LANGUAGES_DIR, f"{TEXT_DOMAIN}-{locale}.po"))
+    return files
+
+def compile_templates(locale):
+    """{(renewal_type, reminder_type): CompiledTemplate} for one locale"""
+    evaluator = TemplateEvaluator(load_catalogue(locale))
+    compiled = {}
+    for renewal_type, (_, placeholders) in RENEWAL_TYPES.items():
+        for reminder_type in REMINDER_TYPES:
+            with open(template_path(renewal_type, reminder_type), encoding="utf-8") as f:
+                body = evaluator.render(f.read())
+            compiled[(renewal_type, reminder_type)] = CompiledTemplate.build(
+                body, placeholders, evaluator.translate(SUBJECTS[reminder_type]))
+    return compiled
+
+def compiled_path(locale):
+    return os.path.join(BUILD_DIR, f"emails-{locale}.json")
+
+def save_compiled(locale, compiled):
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    data = {
+        "version": COMPILED_VERSION,
+        "locale": locale,
+        "templates": {f"{renewal}/{reminder}": template.to_json() for (renewal, reminder), template in compiled.items()},
+    }
+    path = compiled_path(locale)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return path
+
+def load_compiled(locale):
+    """Compiled templates from build/, recompiled when a template or the .po file is newer"""
+    path = compiled_path(locale)
+    if os.path.exists(path):
+        built = os.path.getmtime(path)
+        if all(not os.path.exists(source) or os.path.getmtime(source) <= built for source in source_files(locale)):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == COMPILED_VERSION:
+                compiled = {}
+                for key, entry in data["templates"].items():
+                    renewal, reminder = key.split("/")
+                    slots = [tuple(slot) for slot in entry["slots"]]
+                    compiled[(renewal, reminder)] = CompiledTemplate(
+                        entry["body"], slots, entry["placeholders"], entry["subject"])
+                return compiled
+    compiled = compile_templates(locale)
+    save_compiled(locale, compiled)
+    return compiled
+
+def php_date(format_string, moment, language="en"):
+    """date_i18n() for the common date_format characters"""
+    months = MONTHS.get(language, MONTHS["en"])
+    weekdays = WEEKDAYS.get(language, WEEKDAYS["en"])
+    output = []
+    escaped = False
+    for char in format_string:
+        if escaped:
+            output.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "d":
+            output.append(f"{moment.day:02d}")
+        elif char == "j":
+            output.append(str(moment.day))
+        elif char == "m":
+            output.append(f"{moment.month:02d}")
+        elif char == "n":
+            output.append(str(moment.month))
+        elif char == "F":
+            output.append(months[moment.month - 1])
+        elif char == "M":
+            output.append(months[moment.month - 1][:3])
+        elif char == "Y":
+            output.append(str(moment.year))
+        elif char == "y":
+            output.append(f"{moment.year % 100:02d}")
+        elif char == "l":
+            output.append(weekdays[moment.weekday()])
+        elif char == "D":
+            output.append(weekdays[moment.weekday()][:3])
+        else:
+            output.append(char)
+    return "".join(output)
+
+def reminder_subjects(connection):
+    """{reminder_type: subject} for the subject options set in a snapshot
+
+    get_option() returns a stored value as is, even an empty one, so only
+    missing options fall back to the compiled (translated) default.
+    """
+    subjects = {}
+    for reminder_type, option in SUBJECT_OPTIONS.items():
+        value = get_option(connection, option)
+        if value is not None:
+            subjects[reminder_type] = value
+    return subjects
+
+def read_recipients(path):
+    """Rows of a recipients CSV: email, display_name, end_date, renewal_type, reminder_type,
+    renewal_token or renewal_link"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+def render_messages(compiled, recipients, date_format, language, site_url, subjects=None):
+    """Yield one message dict per recipient, grouped by nothing but the compiled template lookup"""
+    subjects = subjects or {}
+    dates = {}
+    for row in recipients:
+        template = compiled[(row["renewal_type"], row["reminder_type"])]
+        end_date = row["end_date"]
+        formatted = dates.get(end_date)
+        if formatted is None:
+            formatted = dates[end_date] = php_date(date_format, datetime.fromisoformat(end_date), language)
+        link = row.get("renewal_link") or f"{site_url.rstrip('/')}/membership-renewal/{row.get('renewal_token', '')}/"
+        values = {"[user_name]": row.get("display_name", ""), "[end_date]": formatted, "[renewal_link]": link}
+        yield {
+            "to": row["email"],
+            "subject": subjects.get(row["reminder_type"], template.subject),
+            "body": template.render(values),
+            "renewal_type": row["renewal_type"],
+            "reminder_type": row["reminder_type"],
+            "subscription_id": row.get("subscription_id") or None,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kompilér og flet påmindelses-e-mails.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_parser = sub.add_parser("compile", help="Kompilér skabelonerne til build/emails-<sprog>.json")
+    compile_parser.add_argument("--locale", action="append", help="Sprogkode (kan gentages, standard: da_DK)")
+    render_parser = sub.add_parser("render", help="Flet modtagere ind i de kompilerede skabeloner")
+    render_parser.add_argument("recipients", help="CSV med email, display_name, end_date, renewal_type, reminder_type, renewal_token")
+    render_parser.add_argument("--locale", default="da_DK", help="Sprogkode")
+    render_parser.add_argument("--date-format", default="F j, Y", help="PHP datoformat (WordPress' date_format)")
+    render_parser.add_argument("--site-url", default="", help="home_url() til fornyelseslinks")
+    render_parser.add_argument("--snapshot", help="SQLite-fil eller CSV-mappe med options; emnerne fra indstillingerne bruges")
+    render_parser.add_argument("--output", help="JSONL-fil med beskederne (standard: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        for locale in args.locale or ["da_DK"]:
+            compiled = compile_templates(locale)
+            print(f"✓ {save_compiled(locale, compiled)}: {len(compiled)} skabeloner")
+        return 0
+
+    started = time.perf_counter()
+    compiled = load_compiled(args.locale)
+    subjects = reminder_subjects(open_snapshot(args.snapshot)) if args.snapshot else {}
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        for message in render_messages(compiled, read_recipients(args.recipients), args.date_format,
+                                       args.locale.split("_")[0], args.site_url, subjects):
+            output.write(json.dumps(message, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {count} beskeder flettet på {elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmark af forespørgslerne bag medlemslisten (filter_memberships)
+Genererer realistiske wp_membership_subscriptions-tabeller med skema og indekser fra Membership_Manager::activate()
+i SQLite og måler den nuværende LIMIT/OFFSET-sidning mod udskudt join og keyset-sidning ved stigende sidedybde
+"""
+
+import argparse
+import json
+import os
+import random
+import secrets
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from membership_snapshot import SCHEMA
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(PLUGIN_DIR, "build", "filter-benchmark")
+PER_PAGE = 25
+SIZES = [10_000, 100_000, 1_000_000]
+DEPTHS = [1, 10, 100, 1000, 10_000, 40_000]
+SORTS = ["end_date", "start_date", "user_id", "status"]
+
+# KEY user_id, renewal_token, status and end_date from activate()
+CURRENT_INDEXES = [
+    "CREATE INDEX user_id ON membership_subscriptions (user_id)",
+    "CREATE INDEX renewal_token ON membership_subscriptions (renewal_token)",
+    "CREATE INDEX status ON membership_subscriptions (status)",
+    "CREATE INDEX end_date ON membership_subscriptions (end_date)",
+]
+# Candidates for the list screen: every sort column with the status filter
+# in front, and start_date, which has no index today. InnoDB secondary
+# indexes end in the primary key like SQLite's end in the rowid, so
+# (status, end_date) also orders by id within equal dates.
+COMPOSITE_INDEXES = [
+    "CREATE INDEX status_end_date ON membership_subscriptions (status, end_date)",
+    "CREATE INDEX status_start_date ON membership_subscriptions (status, start_date)",
+    "CREATE INDEX status_user_id ON membership_subscriptions (status, user_id)",
+    "CREATE INDEX start_date ON membership_subscriptions (start_date)",
+]
+
+# filter_memberships() filters: none, the status dropdown, and the renewal
+# date picker. `current` is the WHERE clause as written in PHP; `sargable`
+# is the same filter in a form an index on end_date can serve.
+FILTERS = {
+    "alle": {"current": "", "sargable": "", "params": {}},
+    "active": {"current": "WHERE status = :status", "sargable": "WHERE status = :status",
+               "params": {"status": "active"}},
+    "fornyelsesdato": {"current": "WHERE DATE(end_date) = :day",
+                       "sargable": "WHERE end_date >= :day AND end_date < :next_day",
+                       "params": {}},
+}
+
+STATUS_COUNTS = "SELECT status, COUNT(*) AS count FROM membership_subscriptions GROUP BY status"
+
+def generate(path, rows, now, seed=1):
+    """A table shaped like a live site: five years of yearly memberships, most renewed on time
+
+    Statuses follow end_date the way the cron leaves them; a tail of
+    on-hold, pending-cancel and cancelled rows and repeat members make the
+    status and user_id columns as skewed as they are in practice.
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    connection.execute(f"CREATE TABLE membership_subscriptions ({SCHEMA['membership_subscriptions']})")
+    users = max(rows * 4 // 5, 1)
+    span = 5 * 365 * 86400
+
+    def row(number):
+        start = now - timedelta(seconds=rng.randrange(span))
+        end = start + timedelta(days=365)
+        automatic = rng.random() < 0.45
+        roll = rng.random()
+        if end > now:
+            status = "on-hold" if roll < 0.03 else "pending-cancel" if roll < 0.06 else "active"
+        else:
+            status = "cancelled" if roll < 0.15 else "expired"
+        changed = None if status == "active" else min(end, now).strftime("%Y-%m-%d %H:%M:%S")
+        paused = changed if status == "on-hold" else None
+        return (number, rng.randrange(1, users + 1), start.strftime("%Y-%m-%d %H:%M:%S"),
+                end.strftime("%Y-%m-%d %H:%M:%S"), status, "automatic" if automatic else "manual",
+                secrets.token_hex(32) if automatic else "", paused, changed)
+
+    with connection:
+        connection.executemany("INSERT INTO membership_subscriptions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               (row(number) for number in range(1, rows + 1)))
+        for statement in CURRENT_INDEXES:
+            connection.execute(statement)
+    connection.execute("ANALYZE")
+    connection.close()
+
+def dataset(rows, now, regenerate=False):
+    path = os.path.join(DATA_DIR, f"subscriptions-{rows}.sqlite")
+    if regenerate or not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        started = time.perf_counter()
+        generate(path + ".tmp", rows, now)
+        os.replace(path + ".tmp", path)
+        print(f"✓ {rows} rækker genereret på {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return path
+
+def page_queries(filter_name, sort, order, seek=True):
+    """{variant: SQL} for one page; with `seek` the keyset query takes :last_value and :last_id"""
+    spec = FILTERS[filter_name]
+    where = spec["sargable"]
+    if seek:
+        condition = f"({sort}, id) {'<' if order == 'DESC' else '>'} (:last_value, :last_id)"
+        keyset_where = f"{where} AND {condition}" if where else f"WHERE {condition}"
+    else:
+        keyset_where = where
+    return {
+        # filter_memberships() as written: no tie-breaker, so rows with the
+        # same sort value may move between pages
+        "offset": f"SELECT * FROM membership_subscriptions {spec['current']} "
+                  f"ORDER BY {sort} {order} LIMIT {PER_PAGE} OFFSET :offset",
+        # Skip the offset over index entries only, then fetch 25 full rows
+        "deferred": f"SELECT s.* FROM membership_subscriptions s JOIN ("
+                    f"SELECT id FROM membership_subscriptions {where} ORDER BY {sort} {order}, id {order} "
+                    f"LIMIT {PER_PAGE} OFFSET :offset) page ON page.id = s.id ORDER BY s.{sort} {order}, s.id {order}",
+        # Continue after the last row of the previous page
+        "keyset": f"SELECT * FROM membership_subscriptions {keyset_where} "
+                  f"ORDER BY {sort} {order}, id {order} LIMIT {PER_PAGE}",
+    }
+
+def count_query(filter_name):
+    return f"SELECT COUNT(*) FROM membership_subscriptions {FILTERS[filter_name]['current']}"
+
+def time_query(connection, sql, params, repeat):
+    """Median wall time in ms of running the query and fetching every row"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        connection.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def query_plan(connection, sql, params):
+    return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+def filter_params(connection, filter_name):
+    params = dict(FILTERS[filter_name]["params"])
+    if filter_name == "fornyelsesdato":
+        # The busiest renewal day, as an admin checking a campaign would pick
+        day = connection.execute("SELECT DATE(end_date) FROM membership_subscriptions GROUP BY 1 "
+                                 "ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        params["day"] = day
+        params["next_day"] = (datetime.fromisoformat(day) + timedelta(days=1)).strftime("%Y-%m-%d")
+    return params
+
+def run_scenario(connection, filter_name, sort, order, depths, repeat):
+    params = filter_params(connection, filter_name)
+    total = connection.execute(count_query(filter_name), params).fetchone()[0]
+    pages = max((total + PER_PAGE - 1) // PER_PAGE, 1)
+    where = FILTERS[filter_name]["sargable"]
+    cursor_sql = (f"SELECT {sort}, id FROM membership_subscriptions {where} "
+                  f"ORDER BY {sort} {order}, id {order} LIMIT 1 OFFSET :offset")
+    result = {
+        "filter": filter_name,
+        "sort": sort,
+        "order": order,
+        "rows": total,
+        "pages": pages,
+        "count_ms": time_query(connection, count_query(filter_name), params, repeat),
+        "depths": [],
+        "plans": {},
+    }
+    for page in sorted({min(depth, pages) for depth in depths}):
+        offset = (page - 1) * PER_PAGE
+        page_params = {**params, "offset": offset}
+        if page > 1:
+            # The last row of the previous page, as the list screen would pass it back
+            page_params["last_value"], page_params["last_id"] = connection.execute(
+                cursor_sql, {**params, "offset": offset - 1}).fetchone()
+        queries = page_queries(filter_name, sort, order, seek=page > 1)
+        timings = {variant: time_query(connection, sql, page_params, repeat) for variant, sql in queries.items()}
+        result["depths"].append({"page": page, "offset": offset, **timings})
+        # Plans of the deepest page measured
+        result["plans"] = {variant: query_plan(connection, sql, page_params) for variant, sql in queries.items()}
+    return result
+
+def benchmark(path, index_set, filters, sorts, orders, depths, repeat):
+    connection = sqlite3.connect(path)
+    existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    if index_set == "composite":
+        for statement in COMPOSITE_INDEXES:
+            if statement.split()[2] not in existing:
+                connection.execute(statement)
+        connection.execute("ANALYZE")
+    else:
+        for statement in COMPOSITE_INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {statement.split()[2]}")
+        connection.execute("ANALYZE")
+    connection.commit()
+    results = {
+        "index_set": index_set,
+        "status_counts_ms": time_query(connection, STATUS_COUNTS, {}, repeat),
+        "status_counts_plan": query_plan(connection, STATUS_COUNTS, {}),
+        "scenarios": [run_scenario(connection, filter_name, sort, order, depths, repeat)
+                      for filter_name in filters for sort in sorts for order in orders],
+    }
+    connection.close()
+    return results
+
+def print_report(report, show_plans=False):
+    for size in report["sizes"]:
+        for run in size["runs"]:
+            print(f"\n{'='*60}\n📊 {size['rows']} rækker, indekser: {run['index_set']}\n{'='*60}")
+            print(f"   Statustal (GROUP BY status ved hvert kald): {run['status_counts_ms']:.2f} ms")
+            for scenario in run["scenarios"]:
+                print(f"\n   {scenario['filter']}, ORDER BY {scenario['sort']} {scenario['order']} "
+                      f"({scenario['rows']} rækker, {scenario['pages']} sider, COUNT(*) {scenario['count_ms']:.2f} ms)")
+                print(f"   {'side':>8}{'offset':>10}{'udskudt':>10}{'keyset':>10}   (ms)")
+                for depth in scenario["depths"]:
+                    print(f"   {depth['page']:>8}{depth['offset']:>10.2f}{depth['deferred']:>10.2f}{depth['keyset']:>10.2f}")
+                if show_plans:
+                    for variant, plan in scenario["plans"].items():
+                        print(f"      {variant}: {' | '.join(plan)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mål sidning og sortering i filter_memberships() på genererede tabeller.")
+    parser.add_argument("--rows", type=int, action="append", help="Tabelstørrelse (kan gentages; standard: 10k, 100k og 1M)")
+    parser.add_argument("--depth", type=int, action="append", help="Sidenummer der måles (kan gentages)")
+    parser.add_argument("--sort", action="append", choices=SORTS, help="Sorteringskolonne (standard: alle)")
+    parser.add_argument("--order", action="append", choices=["ASC", "DESC"], help="Sorteringsretning (standard: ASC)")
+    parser.add_argument("--filter", action="append", choices=sorted(FILTERS), help="Filter (standard: alle)")
+    parser.add_argument("--indexes", choices=["current", "composite", "both"], default="both",
+                        help="Indekser fra activate(), med ekstra sammensatte indekser, eller begge")
+    parser.add_argument("--repeat", type=int, default=3, help="Gentagelser pr. måling (medianen bruges)")
+    parser.add_argument("--regenerate", action="store_true", help="Generér tabellerne igen")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=datetime(2026, 1, 1),
+                        help="Dato datasættet genereres omkring")
+    parser.add_argument("--plans", action="store_true", help="Vis forespørgselsplaner")
+    parser.add_argument("--output", help="Gem hele rapporten (inkl. planer) som JSON")
+    args = parser.parse_args(argv)
+
+    index_sets = ["current", "composite"] if args.indexes == "both" else [args.indexes]
+    report = {
+        "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        "sqlite_version": sqlite3.sqlite_version,
+        "per_page": PER_PAGE,
+        "sizes": [],
+    }
+    for rows in args.rows or SIZES:
+        path = dataset(rows, args.now, args.regenerate)
+        report["sizes"].append({
+            "rows": rows,
+            "runs": [benchmark(path, index_set, args.filter or list(FILTERS), args.sort or SORTS, args.order or ["ASC"],
+                               args.depth or DEPTHS, args.repeat) for index_set in index_sets],
+        })
+
+    print_report(report, args.plans)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"\n📄 Rapport gemt i {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
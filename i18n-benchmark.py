@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Benchmark af oversættelsesværktøjerne på syntetiske PHP-træer
+Genererer deterministiske træer med valgfrit antal filer, kald pr. fil, anførselstegn, escapede citater og
+ordbogsstørrelse, kører auto-translate.py og udtrækkerne over dem og sammenligner med en gemt baseline
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from php_i18n import TEXT_DOMAIN, extract_calls
+from translation_catalogue import Catalogue, compile_catalogue
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(PLUGIN_DIR, "build", "i18n-benchmark")
+DEFAULT_BASELINE = os.path.join(PLUGIN_DIR, "benchmarks", "i18n-baseline.json")
+FORMAT_VERSION = 2
+# Small trees are run again until this much time has passed, so every phase
+# adds up to hundreds of milliseconds instead of one noisy 10 ms sample
+MIN_SECONDS = 2.0
+
+# The hyphenated script cannot be imported by name
+_spec = importlib.util.spec_from_file_location("auto_translate", os.path.join(PLUGIN_DIR, "auto-translate.py"))
+auto_translate = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(auto_translate)
+
+# "plugin" is about the size of includes/ and admin/views today, "fork" the
+# plugin with add-ons, "dictionary" a small tree against a large catalogue
+SCENARIOS = {
+    "plugin": {"files": 40, "calls": 15, "dictionary": 310, "quotes": "mixed", "escaped": 0.05, "hit_rate": 0.8},
+    "fork": {"files": 2000, "calls": 40, "dictionary": 5000, "quotes": "mixed", "escaped": 0.05, "hit_rate": 0.8},
+    "dictionary": {"files": 200, "calls": 40, "dictionary": 50000, "quotes": "single", "escaped": 0.02, "hit_rate": 0.5},
+}
+PARAMETERS = ["files", "calls", "dictionary", "quotes", "escaped", "hit_rate"]
+
+# metric: True when higher is better. The counts must match exactly; any
+# difference means the matching engine now finds other strings.
+METRICS = {
+    "translate_files_per_s": True,
+    "translate_mb_per_s": True,
+    "extract_mb_per_s": True,
+    "tokenize_mb_per_s": True,
+    "peak_rss_mb": False,
+}
+COUNTS = ["translations", "found_strings", "extracted_calls"]
+OTHER_DOMAINS = ["woocommerce", "default"]
+REFERENCE_WORD = re.compile(r"[A-Za-z_]\w*")
+
+WORDS = ("member membership renewal order payment subscription account status expired active cancelled "
+         "reminder email date product user role settings export import token automatic manual days "
+         "page filter search validate repair report failed sent queue").split()
+DANISH = ("medlem medlemskab fornyelse ordre betaling abonnement konto status udløbet aktiv annulleret "
+          "påmindelse e-mail dato produkt bruger rolle indstillinger eksport import token automatisk manuel dage "
+          "side filter søg valider reparer rapport mislykkedes sendt kø").split()
+
+def synthetic_dictionary(size, seed):
+    """{source: translation} with unique sources; every tenth entry carries a %s or %d placeholder"""
+    rng = random.Random(seed)
+    entries = {}
+    number = 0
+    while len(entries) < size:
+        count = rng.randint(1, 6)
+        picks = [rng.randrange(len(WORDS)) for _ in range(count)]
+        source = " ".join(WORDS[i] for i in picks).capitalize() + f" {number}"
+        translation = " ".join(DANISH[i] for i in picks).capitalize() + f" {number}"
+        if number % 10 == 0:
+            placeholder = rng.choice(["%s", "%d"])
+            source += f": {placeholder}"
+            translation += f": {placeholder}"
+        entries[source] = translation
+        number += 1
+    return entries
+
+def php_literal(text, quote, escaped):
+    if escaped:
+        # An apostrophe the engine has to get past, as in "Don't" or "Members' area"
+        text = text.replace(" ", "'s ", 1)
+    if quote == "'":
+        return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$") + '"'
+
+def synthetic_file(rng, sources, params, index):
+    """A PHP class whose methods echo, return and concatenate i18n calls"""
+    lines = ["<?php", "/**", f" * Generated benchmark file {index}", " */", "",
+             "if (!defined('ABSPATH')) {", "    exit;", "}", "",
+             f"class Membership_Benchmark_{index} {{"]
+    for call in range(params["calls"]):
+        if rng.random() < params["hit_rate"]:
+            text = rng.choice(sources)
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))).capitalize() + f" miss {index}.{call}"
+        quotes = {"single": "'", "double": '"'}.get(params["quotes"]) or rng.choice("'\"")
+        literal = php_literal(text, quotes, rng.random() < params["escaped"])
+        domain = php_literal(TEXT_DOMAIN, quotes, False)
+        function = rng.choice(["__", "__", "_e", "esc_html__"])
+        lines.append(f"    public function method_{call}($subscription) {{")
+        if rng.random() < 0.2:
+            lines.append("        // translators: %s is the member's name")
+        shape = rng.random()
+        if shape < 0.1:
+            # Another text domain first on the line, as with WooCommerce strings
+            other = php_literal(rng.choice(OTHER_DOMAINS), quotes, False)
+            lines.append(f"        return __({php_literal(rng.choice(sources), quotes, False)}, {other}) . ' ' . "
+                         f"{function}({literal}, {domain});")
+        elif shape < 0.2:
+            # Two plugin calls on one line
+            second = php_literal(rng.choice(sources), quotes, False)
+            lines.append(f"        return sprintf({function}({literal}, {domain}), __({second}, {domain}));")
+        elif function == "_e":
+            lines.append(f"        {function}({literal}, {domain});")
+        elif call % 3 == 0:
+            lines.append(f"        echo '<div class=\"notice\"><p>' . esc_html({function}({literal}, {domain})) . '</p></div>';")
+        else:
+            lines.append(f"        return {function}({literal}, {domain});")
+        lines.append("    }")
+        lines.append("")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def generate(directory, params, seed):
+    """Write the dictionary and tree for `params` under `directory`; returns the catalogue source path"""
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    tree = os.path.join(directory, "tree")
+    os.makedirs(tree)
+    dictionary = synthetic_dictionary(params["dictionary"], seed)
+    source = os.path.join(directory, "translations.tsv")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write("# Syntetisk ordbog til i18n-benchmark.py\n")
+        for english, danish in dictionary.items():
+            f.write(f"{english}\t{danish}\n")
+    sources = list(dictionary)
+    rng = random.Random(seed)
+    for index in range(params["files"]):
+        folder = os.path.join(tree, f"module-{index // 50:03d}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"class-benchmark-{index}.php"), "w", encoding="utf-8") as f:
+            f.write(synthetic_file(rng, sources, params, index))
+    return source
+
+def scenario_key(params, seed):
+    return hashlib.sha256(json.dumps([params, seed, FORMAT_VERSION], sort_keys=True).encode()).hexdigest()[:12]
+
+def prepare(name, params, seed, regenerate=False):
+    """The generated directory for a scenario, reused while its parameters are unchanged"""
+    directory = os.path.join(DATA_DIR, f"{name}-{scenario_key(params, seed)}")
+    if regenerate or not os.path.exists(os.path.join(directory, "tree")):
+        started = time.perf_counter()
+        generate(directory + ".tmp", params, seed)
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.replace(directory + ".tmp", directory)
+        print(f"✓ {name}: {params['files']} filer genereret på {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return directory
+
+def reference_pass(contents):
+    """A fixed regex and dict workload over the tree that no tool change affects
+
+    Timed in the same process as the tools, it stands for the speed of the
+    host at that moment; metrics are compared relative to it.
+    """
+    words = {}
+    for content in contents:
+        for word in REFERENCE_WORD.findall(content):
+            words[word] = words.get(word, 0) + 1
+    return len(words)
+
+def run_once(directory):
+    """One pass of every tool over a fresh copy of the tree; phase times in seconds"""
+    work = os.path.join(directory, "work")
+    if os.path.exists(work):
+        shutil.rmtree(work)
+    shutil.copytree(os.path.join(directory, "tree"), work)
+    clock = time.perf_counter
+
+    mark = clock()
+    catalogue_path = os.path.join(directory, "translations.cat")
+    compile_catalogue(os.path.join(directory, "translations.tsv"), catalogue_path)
+    catalogue = Catalogue(catalogue_path)
+    len(catalogue)
+    phases = {"compile": clock() - mark}
+
+    files = auto_translate.collect_php_files([work])
+    contents = []
+    mark = clock()
+    for filepath in files:
+        with open(filepath, encoding="utf-8") as f:
+            contents.append(f.read())
+    phases["read"] = clock() - mark
+    size = sum(len(content.encode("utf-8")) for content in contents)
+
+    mark = clock()
+    reference_pass(contents)
+    phases["reference"] = clock() - mark
+
+    mark = clock()
+    found = sum(len(auto_translate.find_translatable_strings(content)) for content in contents)
+    phases["find_translatable_strings"] = clock() - mark
+
+    mark = clock()
+    extracted = sum(sum(1 for _ in extract_calls(content)) for content in contents)
+    phases["extract_calls"] = clock() - mark
+
+    # translate_file() as auto-translate.py runs it: read, match, write,
+    # rematch the written file and hash it for the cache
+    translations = 0
+    totals = dict.fromkeys(("read", "match", "write"), 0.0)
+    mark = clock()
+    for filepath in files:
+        metrics = {}
+        changes, _ = auto_translate.translate_file(filepath, metrics, catalogue=catalogue)
+        translations += changes
+        for phase in totals:
+            totals[phase] += metrics[phase]
+    phases["translate"] = clock() - mark
+    phases.update({f"translate_{phase}": elapsed for phase, elapsed in totals.items()})
+    catalogue.close()
+    shutil.rmtree(work)
+    return {"files": len(files), "bytes": size, "translations": translations, "found_strings": found,
+            "extracted_calls": extracted, "phases": phases}
+
+def measure(directory, repeat):
+    """Phase times over at least `repeat` passes and the peak RSS of the process running them
+
+    Called in a process of its own, so the peak belongs to this scenario.
+    Large trees use the median pass; small trees run for MIN_SECONDS and
+    use the mean, whose total covers enough time to be stable.
+    """
+    runs = []
+    started = time.perf_counter()
+    while len(runs) < repeat or (time.perf_counter() - started < MIN_SECONDS and len(runs) < 500):
+        runs.append(run_once(directory))
+    average = statistics.median if len(runs) <= repeat else statistics.fmean
+    phases = {phase: average([run["phases"][phase] for run in runs]) for phase in runs[0]["phases"]}
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    first = runs[0]
+    megabytes = first["bytes"] / (1024 * 1024)
+    return {
+        "files": first["files"],
+        "bytes": first["bytes"],
+        **{count: first[count] for count in COUNTS},
+        "phases_ms": {phase: round(elapsed * 1000, 3) for phase, elapsed in phases.items()},
+        "translate_files_per_s": round(first["files"] / phases["translate"], 1),
+        "translate_mb_per_s": round(megabytes / phases["translate"], 3),
+        "extract_mb_per_s": round(megabytes / phases["find_translatable_strings"], 3),
+        "tokenize_mb_per_s": round(megabytes / phases["extract_calls"], 3),
+        "peak_rss_mb": round(peak, 1),
+        "passes": len(runs),
+    }
+
+def run_scenario(name, params, seed, repeat, regenerate=False):
+    directory = prepare(name, params, seed, regenerate)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        result = executor.submit(measure, directory, repeat).result()
+    return {"parameters": params, "seed": seed, **result}
+
+def same_host(report, baseline):
+    """Absolute timings only compare between runs on the same interpreter, architecture and host"""
+    return all(report.get(key) == baseline.get(key) for key in ("python", "machine", "host"))
+
+def compare(results, baseline, tolerance):
+    """[(scenario, metric, baseline, current, change)] for metrics worse than baseline by more than tolerance
+
+    Throughput is taken relative to the reference pass of the same run, so
+    a busier or slower moment on the host does not count as a regression.
+    Counts that differ at all are reported with a change of None.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or before.get("parameters") != result["parameters"] or before.get("seed") != result["seed"]:
+            continue
+        for count in COUNTS:
+            if before.get(count) is not None and before[count] != result[count]:
+                regressions.append((name, count, before[count], result[count], None))
+        old_reference = before.get("phases_ms", {}).get("reference")
+        new_reference = result["phases_ms"].get("reference")
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            if higher_is_better and old_reference and new_reference:
+                change = (new * new_reference) / (old * old_reference) - 1
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+def print_report(results):
+    for name, result in results.items():
+        params = result["parameters"]
+        phases = result["phases_ms"]
+        print(f"\n{'='*60}\n📊 {name}: {result['files']} filer à {params['calls']} kald, "
+              f"{params['dictionary']} indgange ({result['bytes'] / 1024:.0f} KB)\n{'='*60}")
+        print(f"   auto-translate: {result['translate_files_per_s']:.0f} filer/s, {result['translate_mb_per_s']:.2f} MB/s "
+              f"({result['translations']} oversættelser)")
+        print(f"      læs {phases['translate_read']:.1f} ms, match {phases['translate_match']:.1f} ms, "
+              f"skriv {phases['translate_write']:.1f} ms, i alt {phases['translate']:.1f} ms")
+        print(f"   find_translatable_strings: {result['extract_mb_per_s']:.2f} MB/s ({result['found_strings']} strenge)")
+        print(f"   extract_calls (make-pot): {result['tokenize_mb_per_s']:.2f} MB/s ({result['extracted_calls']} kald)")
+        print(f"   Kompilering af ordbog: {phases['compile']:.1f} ms, højeste RSS: {result['peak_rss_mb']:.1f} MB")
+        print(f"   Referencegennemløb: {phases['reference']:.1f} ms ({result['passes']} gennemløb)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mål auto-translate.py og udtrækkerne på syntetiske PHP-træer.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenarie (standard: alle)")
+    parser.add_argument("--files", type=int, help="Antal PHP-filer (overskriver scenariet)")
+    parser.add_argument("--calls", type=int, help="i18n-kald pr. fil")
+    parser.add_argument("--dictionary", type=int, help="Antal indgange i ordbogen")
+    parser.add_argument("--quotes", choices=["single", "double", "mixed"], help="Anførselstegn om strengene")
+    parser.add_argument("--escaped", type=float, help="Andel af strenge med escapede citationstegn (0-1)")
+    parser.add_argument("--hit-rate", type=float, help="Andel af kald der findes i ordbogen (0-1)")
+    parser.add_argument("--seed", type=int, default=1, help="Frø til generatoren")
+    parser.add_argument("--repeat", type=int, default=3, help="Gentagelser pr. scenarie (medianen bruges)")
+    parser.add_argument("--regenerate", action="store_true", help="Generér træerne igen")
+    parser.add_argument("--output", help="Gem resultatet som JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON-fil med baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Gem resultatet som ny baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tilladt forværring før regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    overrides = {name: getattr(args, name) for name in PARAMETERS if getattr(args, name) is not None}
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        params = {**SCENARIOS[name], **overrides}
+        results[name] = run_scenario(name, params, args.seed, args.repeat, args.regenerate)
+    report = {
+        "version": FORMAT_VERSION,
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "host": platform.node(),
+        "scenarios": results,
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"\n📄 Resultat gemt i {args.output}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        # Scenarios that were not run keep their old numbers
+        report["scenarios"] = {**baseline.get("scenarios", {}), **results}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n✓ Baseline gemt i {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != FORMAT_VERSION:
+        print(f"\n⚠ Baseline har format {baseline.get('version')}, ikke {FORMAT_VERSION}; gem en ny med --save-baseline")
+        return 0
+    if not same_host(report, baseline):
+        print(f"\n⚠ Baseline er fra Python {baseline.get('python')} på {baseline.get('host')} ({baseline.get('machine')}), "
+              f"denne kørsel Python {report['python']} på {report['host']} ({report['machine']}); "
+              f"sammenligning springes over (brug --save-baseline)")
+        return 0
+    comparable = [name for name, result in results.items()
+                  if baseline.get("scenarios", {}).get(name, {}).get("parameters") == result["parameters"]]
+    if not comparable:
+        print("\n⚠ Ingen scenarier med samme parametre i baseline")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for name, metric, before, after, change in regressions:
+        if change is None:
+            print(f"\n❌ {name}: {metric} ændret fra {before} til {after}")
+        else:
+            print(f"\n⚠ Regression i {name} {metric}: {before} → {after} ({change:+.0%})")
+    if not regressions:
+        print(f"\n✅ Inden for {args.tolerance:.0%} af baseline ({', '.join(comparable)})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+<?php
+return ['project-id-version'=>'JW Membership Manager','mime-version'=>'1.0','content-type'=>'text/plain; charset=UTF-8','content-transfer-encoding'=>'8bit','language'=>'da_DK','plural-forms'=>'nplurals=2; plural=(n != 1);','x-generator'=>'make-mo.py','x-domain'=>'membership-manager','messages'=>['%d days until expiry'=>'%d dage til udløb','1 Day Before Expiration'=>'1 dag før udløb','1-Day Reminder Subject'=>'1-dages påmindelse emne','14 Days Before Expiration'=>'14 dage før udløb','14-Day Reminder Subject'=>'14-dages påmindelse emne','30 Days Before Expiration'=>'30 dage før udløb','30-Day Reminder Subject'=>'30-dages påmindelse emne','7 Days Before Expiration'=>'7 dage før udløb','7-Day Reminder Subject'=>'7-dages påmindelse emne','A membership renewal has failed.<br><br>Subscription ID: %d<br>User: %s (ID: %d)<br>Email: %s<br>Order ID: %s<br>Reason: %s<br><br>Please take appropriate action.'=>'En medlemskabsfornyelse er mislykkedes.<br><br>Abonnements-ID: %d<br>Bruger: %s (ID: %d)<br>E-mail: %s<br>Ordre-ID: %s<br>Årsag: %s<br><br>Tag venligst passende handling.','Action Required: Membership Renewal Failed'=>'Handling påkrævet: Medlemskabsfornyelse mislykkedes','Actions'=>'Handlinger','Active'=>'Aktiv','Add Membership'=>'Tilføj medlemskab','Add New'=>'Tilføj ny','Add New Membership'=>'Tilføj nyt medlemskab','Add Product'=>'Tilføj produkt','Add membership'=>'Tilføj medlemskab','Added product ID %d to automatic renewal products list'=>'Tilføjede produkt-ID %d til automatisk fornyelsesproduktliste','Added product ID %d to manual renewal products list'=>'Tilføjede produkt-ID %d til manuel fornyelsesproduktliste','Added role "%s" to user ID: %d'=>'Tilføjede rolle "%s" til bruger-ID: %d','All Statuses'=>'Alle statusser','Are you sure you want to delete this membership? This cannot be undone.'=>'Er du sikker på, at du vil slette dette medlemskab? Dette kan ikke fortrydes.','Are you sure you want to pause this membership?'=>'Er du sikker på, at du vil pause dette medlemskab?','Are you sure you want to resume this membership?'=>'Er du sikker på, at du vil genoptage dette medlemskab?','Are you sure?'=>'Er du sikker?','Attempt automatic payment on renewal'=>'Forsøg automatisk betaling ved fornyelse','Attempting to create renewal order for subscription ID: %d (User: %d)'=>'Forsøger at oprette fornyelsesordre for abonnements-ID: %d (Bruger: %d)','Automatic'=>'Automatisk','Automatic - Will renew automatically'=>'Automatisk - Fornyes automatisk','Automatic Renewal'=>'Automatisk fornyelse','Automatic Renewal - %s'=>'Automatisk fornyelse - %s','Automatic renewal order for membership subscription ID: %d'=>'Automatisk fornyelsesordre for medlemskabsabonnement ID: %d','Automatically remove member role when membership expires'=>'Fjern automatisk medlemsrolle når medlemskabet udløber','Awaiting automatic payment processing.'=>'Afventer automatisk betalingsbehandling.','Back to List'=>'Tilbage til liste','Billing Address'=>'Faktureringsadresse','Billing Information'=>'Faktureringsinformation','Cancelled'=>'Annulleret','Checking memberships against order map...'=>'Tjekker medlemskaber mod ordre kort...','Cleanup failed. Please check the logs for more details.'=>'Oprydning mislykkedes. Tjek venligst logs for flere detaljer.','Click here to renew'=>'Klik her for at forny','Copy Renewal Link'=>'Kopier fornyelseslink','Count'=>'Antal','Created new membership ID: %d for user ID: %d by admin.'=>'Oprettede nyt medlemskabs-ID: %d for bruger-ID: %d af admin.','Created new membership for user ID: %d'=>'Oprettede nyt medlemskab for bruger-ID: %d','Created renewal order #%d for subscription ID: %d'=>'Oprettede fornyelsesordre #%d for abonnements-ID: %d','Creating or extending membership for order ID: %d'=>'Opretter eller forlænger medlemskab for ordre-ID: %d','Data Mismatches'=>'Data uoverensstemmelser','Database error creating membership: %s'=>'Database fejl ved oprettelse af medlemskab: %s','Database error occurred. Please check the logs.'=>'Database fejl opstod. Tjek venligst logs.','Database error updating membership ID %d: %s'=>'Database fejl ved opdatering af medlemskabs-ID %d: %s','Date'=>'Dato','Delete'=>'Slet','Delete Membership'=>'Slet medlemskab','Deleted membership ID: %d by user ID: %d'=>'Slettede medlemskabs-ID: %d af bruger-ID: %d','Detected subscription product (ID: %d) in order %d - setting as automatic renewal.'=>'Fandt abonnementsprodukt (ID: %d) i ordre %d - indstiller som automatisk fornyelse.','Edit'=>'Rediger','Email'=>'E-mail','Email Settings'=>'E-mailindstillinger','Email Subject Lines'=>'E-mail emnelinjer','Email template not found: %s'=>'E-mail skabelon ikke fundet: %s','Emails will be sent 30, 14, 7, and 1 day before expiration.'=>'E-mails sendes 30, 14, 7 og 1 dag før udløb.','Empty subject or message in email'=>'Tomt emne eller besked i e-mail','Enable Email Reminders'=>'Aktiver e-mailpåmindelser','End Date'=>'Slutdato','End date:'=>'Slutdato:','Enter the WordPress User ID for the member.'=>'Indtast WordPress bruger-ID for medlemmet.','Exception creating renewal order: %s'=>'Undtagelse ved oprettelse af fornyelsesordre: %s','Expiration Date'=>'Udløbsdato','Expired'=>'Udløbet','Expires'=>'Udløber','Expiring This Week'=>'Udløber denne uge','Expiry Date'=>'Udløbsdato','Expiry Date:'=>'Udløbsdato:','Extended membership for user ID: %d'=>'Forlængede medlemskab for bruger-ID: %d','Failed Membership Renewal - Admin Notification'=>'Mislykket medlemskabsfornyelse - Admin notifikation','Failed automatic renewal for subscription ID: %d. Reason: %s. Status set to pending-cancel.'=>'Automatisk fornyelse mislykkedes for abonnements-ID: %d. Årsag: %s. Status sat til afventer-annullering.','Failed to create automatic renewal order for subscription ID: %d'=>'Kunne ikke oprette automatisk fornyelsesordre for abonnements-ID: %d','Failed to create order: %s'=>'Kunne ikke oprette ordre: %s','Failed to create renewal order for subscription ID %d. Check the logs below for details.'=>'Kunne ikke oprette fornyelsesordre for abonnements-ID %d. Tjek logs nedenfor for detaljer.','Failed to migrate subscription for user ID: %d'=>'Kunne ikke migrere abonnement for bruger-ID: %d','Failed to send automatic renewal reminder (%s) to: %s. Missing to, subject, or message.'=>'Kunne ikke sende automatisk fornyelsespåmindelse (%s) til: %s. Mangler modtager, emne eller besked.','Failed to send email to: %s with subject: %s'=>'Kunne ikke sende e-mail til: %s med emne: %s','Failed to send manual renewal reminder (%s) to: %s. Missing to, subject, or message.'=>'Kunne ikke sende manuel fornyelsespåmindelse (%s) til: %s. Mangler modtager, emne eller besked.','Filter'=>'Filtrer','Finished WooCommerce subscription migration. Migrated %d subscriptions, skipped %d.'=>'Afsluttede WooCommerce abonnements migration. Migrerede %d abonnementer, sprang %d over.','Finished renewal process.'=>'Fornyelsesproces afsluttet.','Fix Invalid Dates'=>'Ret ugyldige datoer','From Email Address'=>'Afsender e-mailadresse','From Name'=>'Afsendernavn','Full Name'=>'Fulde navn','Generate Missing Tokens'=>'Generer manglende tokens','Generated end_date for subscription user ID %d: %s'=>'Genererede slutdato for abonnement bruger-ID %d: %s','Generated renewal tokens for %d memberships.'=>'Genererede fornyelsestokens for %d medlemskaber.','Handling activation for user ID: %d, subscription ID: %d'=>'Håndterer aktivering for bruger-ID: %d, abonnements-ID: %d','Handling expiration for user ID: %d, subscription ID: %d'=>'Håndterer udløb for bruger-ID: %d, abonnements-ID: %d','Hi %s,<br><br>We were unable to automatically renew your membership.<br><br>Please update your payment method and complete the renewal here: %s<br><br>If you have any questions, please contact us.<br><br>Thank you!'=>'Hej %s,<br><br>Vi kunne ikke automatisk forny dit medlemskab.<br><br>Venligst opdater din betalingsmetode og gennemfør fornyelsen her: %s<br><br>Hvis du har spørgsmål, kontakt os venligst.<br><br>Tak!','Hi %s,<br><br>Your membership renewal order has been created but requires payment.<br><br>Please complete the payment here: %s<br><br>Order Details:<br>Order #%d<br>Amount: %s<br><br>Thank you!'=>'Hej %s,<br><br>Din medlemskabsfornyelsesordre er oprettet, men kræver betaling.<br><br>Venligst gennemfør betalingen her: %s<br><br>Ordredetaljer:<br>Ordre #%d<br>Beløb: %s<br><br>Tak!','Hi %s,\\n\\nWelcome! Your membership is now active.\\n\\nStart Date: %s\\nExpiry Date: %s\\nRenewal Type: %s\\n\\n'=>'Hej %s,\\n\\nVelkommen! Dit medlemskab er nu aktivt.\\n\\nStartdato: %s\\nUdløbsdato: %s\\nFornyelsestype: %s\\n\\n','If enabled, the member role will be removed when the membership expires. Users will revert to the default WordPress role.'=>'Hvis aktiveret, vil medlemsrollen blive fjernet når medlemskabet udløber. Brugere vil vende tilbage til standard WordPress-rollen.','If enabled, the system will attempt to charge the customer\'s saved payment method on renewal.'=>'Hvis aktiveret, vil systemet forsøge at debitere kundens gemte betalingsmetode ved fornyelse.','Invalid date'=>'Ugyldig dato','Invalid date format provided. Please use a valid date format.'=>'Ugyldigt datoformat angivet. Brug venligst et gyldigt datoformat.','Invalid date format. Please use a valid date.'=>'Ugyldigt datoformat. Brug venligst en gyldig dato.','Invalid dates cleanup completed successfully!'=>'Oprydning af ugyldige datoer fuldført succesfuldt!','Invalid email address.'=>'Ugyldig e-mailadresse.','Invalid email address: %s'=>'Ugyldig e-mailadresse: %s','Invalid membership ID.'=>'Ugyldigt medlemskabs-ID.','Invalid renewal link. Please contact support.'=>'Ugyldigt fornyelseslink. Kontakt venligst support.','Invalid renewal type value.'=>'Ugyldig fornyelsestypeværdi.','Invalid status value.'=>'Ugyldig statusværdi.','Leave empty for no expiration.'=>'Lad stå tomt for ingen udløbsdato.','Manual'=>'Manuel','Manual - You will receive renewal reminders'=>'Manuel - Du vil modtage fornyelsespåmindelser','Manual Renewal'=>'Manuel fornyelse','Member Role'=>'Medlemsrolle','Membership'=>'Medlemskab','Membership #%d (user %d) has no associated completed order with membership products. May be manually created or migrated.'=>'Medlemskab #%d (bruger %d) har ingen tilknyttet fuldført ordre med medlemskabsprodukter. Kan være manuelt oprettet eller migreret.','Membership (Auto-Renewal)'=>'Medlemskab (Auto-fornyelse)','Membership (Manual)'=>'Medlemskab (Manuel)','Membership Description'=>'Medlemskabsbeskrivelse','Membership Details'=>'Medlemskabsdetaljer','Membership Duration'=>'Medlemskabsvarighed','Membership ID'=>'Medlemskabs-ID','Membership Information'=>'Medlemskabsinformation','Membership Issues & Alerts'=>'Medlemskabsproblemer og advarsler','Membership Manager'=>'Medlemskabsstyring','Membership Renewal Reminder'=>'Medlemskabsfornyelsespåmindelse','Membership Settings'=>'Medlemskabsindstillinger','Membership Status'=>'Medlemskabsstatus','Membership created successfully!'=>'Medlemskab oprettet!','Membership not found.'=>'Medlemskab ikke fundet.','Membership paused successfully!'=>'Medlemskab pauseret!','Membership resumed successfully!'=>'Medlemskab genoptaget!','Membership updated successfully!'=>'Medlemskab opdateret!','Memberships'=>'Medlemskaber','Migrated subscription for user ID: %d with renewal type: %s'=>'Migrerede abonnement for bruger-ID: %d med fornyelsestype: %s','Migration completed successfully! %d subscriptions migrated.'=>'Migration fuldført succesfuldt! %d abonnementer migreret.','Migration failed with error: %s'=>'Migration mislykkedes med fejl: %s','Migration failed. Please check the logs for more details.'=>'Migration mislykkedes. Tjek venligst logs for flere detaljer.','My Membership'=>'Mit medlemskab','Name'=>'Navn','No active membership found.'=>'Intet aktivt medlemskab fundet.','No automatic renewal products configured. Cannot create renewal order for subscription ID: %d'=>'Ingen automatiske fornyelsesprodukter konfigureret. Kan ikke oprette fornyelsesordre for abonnements-ID: %d','No date set'=>'Ingen dato angivet','No issues found! All membership data is consistent with WooCommerce orders.'=>'Ingen problemer fundet! Alle medlemskabsdata er konsistente med WooCommerce-ordrer.','No membership products configured. Please configure membership products in settings first.'=>'Ingen medlemskabsprodukter konfigureret. Konfigurer venligst medlemskabsprodukter i indstillinger først.','No memberships found.'=>'Ingen medlemskaber fundet.','No payment token found for user %d. Manual payment required for order #%d'=>'Intet betalingstoken fundet for bruger %d. Manuel betaling påkrævet for ordre #%d','No products selected for migration.'=>'Ingen produkter valgt til migration.','No renewal product configured. Please contact support.'=>'Intet fornyelsesprodukt konfigureret. Kontakt venligst support.','No saved payment methods for user %d. Manual payment required for order #%d'=>'Ingen gemte betalingsmetoder for bruger %d. Manuel betaling påkrævet for ordre #%d','No user ID found for order ID: %d. Aborting.'=>'Intet bruger-ID fundet for ordre-ID: %d. Afbryder.','Nonce verification failed for migration.'=>'Nonce verificering mislykkedes for migration.','Nonce verification failed for validation.'=>'Nonce verificering mislykkedes for validering.','On Hold'=>'På hold','Optional description shown on the product page about what this membership includes.'=>'Valgfri beskrivelse vist på produktsiden om hvad dette medlemskab inkluderer.','Order #'=>'Ordre #','Order #%d (user %d) has membership #%d but membership belongs to user %d.'=>'Ordre #%d (bruger %d) har medlemskab #%d men medlemskabet tilhører bruger %d.','Order #%d (user %d) should have membership but meta is not set. User has membership #%d.'=>'Ordre #%d (bruger %d) burde have medlemskab men meta er ikke sat. Bruger har medlemskab #%d.','Order #%d (user %d) should have membership but none exists for this user.'=>'Ordre #%d (bruger %d) burde have medlemskab men der eksisterer ikke noget for denne bruger.','Order #%d has membership product but no user ID (guest order).'=>'Ordre #%d har medlemskabsprodukt men intet bruger-ID (gæsteordre).','Order #%d references membership #%d which no longer exists in database.'=>'Ordre #%d refererer til medlemskab #%d som ikke længere findes i databasen.','Order History'=>'Ordrehistorik','Order ID: %d does not contain any membership products. Skipping.'=>'Ordre-ID: %d indeholder ikke nogen medlemskabsprodukter. Springer over.','Pause Membership'=>'Pause medlemskab','Paused Date'=>'Pausedato','Paused membership ID: %d by user ID: %d'=>'Pausede medlemskabs-ID: %d af bruger-ID: %d','Payment Method'=>'Betalingsmetode','Pending Cancel'=>'Afventer annullering','Please select at least one product to migrate.'=>'Vælg venligst mindst ét produkt at migrere.','Plugin activated. Database result: %s'=>'Plugin aktiveret. Database resultat: %s','Product ID %d is a WooCommerce subscription - converting to membership_auto'=>'Produkt-ID %d er et WooCommerce abonnement - konverterer til membership_auto','Product ID %d is a subscription product - setting as automatic renewal.'=>'Produkt-ID %d er et abonnementsprodukt - indstiller som automatisk fornyelse.','Product ID %d is already a membership product type. Skipping.'=>'Produkt-ID %d er allerede en medlemskabsprodukttype. Springer over.','Product ID %d is not a subscription - converting to membership_manual'=>'Produkt-ID %d er ikke et abonnement - konverterer til membership_manual','Product ID %d not found. Cannot create renewal order for subscription ID: %d'=>'Produkt-ID %d ikke fundet. Kan ikke oprette fornyelsesordre for abonnements-ID: %d','Product ID %d not found. Skipping.'=>'Produkt-ID %d ikke fundet. Springer over.','Product migration completed: %d products converted'=>'Produkt migration fuldført: %d produkter konverteret','Product migration summary: %d converted, %d already migrated, %d skipped'=>'Produkt migrations oversigt: %d konverteret, %d allerede migreret, %d sprunget over','Products'=>'Produkter','Products that require manual renewal by members.'=>'Produkter der kræver manuel fornyelse af medlemmer.','Products that will automatically renew memberships on expiration.'=>'Produkter der automatisk fornyer medlemskaber ved udløb.','Purchase membership'=>'Køb medlemskab','Regenerated renewal token for subscription ID: %d'=>'Regenererede fornyelsestoken for abonnements-ID: %d','Registration Date'=>'Registreringsdato','Remove'=>'Fjern','Remove Role on Expiration'=>'Fjern rolle ved udløb','Removed role "%s" from user ID: %d'=>'Fjernede rolle "%s" fra bruger-ID: %d','Renew Membership'=>'Forny medlemskab','Renew Now'=>'Forny nu','Renew now'=>'Forny nu','Renewal Link'=>'Fornyelseslink','Renewal Link:'=>'Fornyelseslink:','Renewal Type'=>'Fornyelsestype','Renewal Type:'=>'Fornyelsestype:','Renewal link copied to clipboard!'=>'Fornyelseslink kopieret til udklipsholder!','Renewal order already exists for subscription ID: %d today (Order #%d)'=>'Fornyelsesordre eksisterer allerede for abonnements-ID: %d i dag (Ordre #%d)','Resume Membership'=>'Genoptag medlemskab','Resumed membership ID: %d by user ID: %d'=>'Genoptog medlemskabs-ID: %d af bruger-ID: %d','Role removal disabled. Role "%s" retained for user ID: %d'=>'Rolle fjernelse deaktiveret. Rolle "%s" beholdt for bruger-ID: %d','Run Validation Check'=>'Kør valideringstjek','Security check failed. Please try again.'=>'Sikkerhedstjek mislykkedes. Prøv venligst igen.','Send Test Email'=>'Send test e-mail','Send a test reminder email to verify your settings.'=>'Send en test påmindelses-e-mail for at verificere dine indstillinger.','Send automatic email reminders before membership expiration'=>'Send automatiske e-mailpåmindelser før medlemskabet udløber','Sending...'=>'Sender...','Sent automatic renewal reminder (%s) to: %s'=>'Sendte automatisk fornyelsespåmindelse (%s) til: %s','Sent failed renewal email to: %s'=>'Sendte mislykket fornyelsese-mail til: %s','Sent manual renewal reminder (%s) to: %s'=>'Sendte manuel fornyelsespåmindelse (%s) til: %s','Sent payment required email to: %s for order #%d'=>'Sendte betaling påkrævet e-mail til: %s for ordre #%d','Sent test email: %s to %s'=>'Sendte test e-mail: %s til %s','Set default renewal period (1 year) for product ID %d'=>'Indstil standard fornyelsesperiode (1 år) for produkt-ID %d','Settings'=>'Indstillinger','Showing 10 of %d orders'=>'Viser 10 af %d ordrer','Skipped subscription for user ID %d - does not contain selected products.'=>'Sprang abonnement over for bruger-ID: %d - indeholder ikke valgte produkter.','Start Date'=>'Startdato','Start Date:'=>'Startdato:','Start date:'=>'Startdato:','Starting WooCommerce subscription migration with products: %s'=>'Starter WooCommerce abonnements migration med produkter: %s','Starting membership data validation.'=>'Starter medlemskabsdata validering.','Starting renewal process.'=>'Starter fornyelsesproces.','Starting test reminder email process. Target: %s, Type: %s, Renewal: %s'=>'Starter test påmindelses-e-mail proces. Mål: %s, Type: %s, Fornyelse: %s','Status Changed'=>'Status ændret','Status changed for subscription ID: %d (User: %d) from "%s" to "%s"'=>'Status ændret for abonnements-ID: %d (Bruger: %d) fra "%s" til "%s"','Subscription already exists for user ID: %d. Skipping.'=>'Abonnement findes allerede for bruger-ID: %d. Springer over.','Successfully converted product ID %d from %s to %s'=>'Konverterede succesfuldt produkt-ID %d fra %s til %s','Successfully created automatic renewal order #%d for subscription ID: %d'=>'Oprettede succesfuldt automatisk fornyelsesordre #%d for abonnements-ID: %d','Successfully created test renewal order #%d for subscription ID %d. <a href="%s" target="_blank">View Order</a>'=>'Oprettede succesfuldt test fornyelsesordre #%d for abonnements-ID %d. <a href="%s" target="_blank">Se ordre</a>','Successfully ran the full renewal process. Check the logs below for details.'=>'Kørte succesfuldt den fulde fornyelsesproces. Tjek logs nedenfor for detaljer.','Successfully sent %d test reminder email(s) to %s. Check your inbox and spam folder.'=>'Sendte succesfuldt %d test påmindelses-e-mail(s) til %s. Tjek din indbakke og spam-mappe.','Test Email'=>'Test e-mail','Test automatic renewal failed for subscription ID: %d'=>'Test automatisk fornyelse mislykkedes for abonnements-ID: %d','Test automatic renewal successful. Created order #%d'=>'Test automatisk fornyelse vellykket. Oprettede ordre #%d','Test reminder email process completed. Sent %d emails.'=>'Test påmindelses-e-mail proces fuldført. Sendte %d e-mails.','Thank you for being a member!\\n'=>'Tak for at være medlem!\\n','The email address that appears in the "From" field.'=>'E-mailadressen der vises i "Fra" feltet.','The name that appears in the "From" field of emails.'=>'Navnet der vises i "Fra" feltet i e-mails.','This content is restricted to active members.'=>'Dette indhold er forbeholdt aktive medlemmer.','This membership is not set for automatic renewal. Check "Force Renewal" to test anyway.'=>'Dette medlemskab er ikke sat til automatisk fornyelse. Marker "Gennemtving fornyelse" for at teste alligevel.','This membership will be valid for 1 year from purchase date.'=>'Dette medlemskab er gyldigt i 1 år fra købsdatoen.','This will process all active memberships and send reminder emails where applicable. Continue?'=>'Dette vil behandle alle aktive medlemskaber og sende påmindelses-e-mails hvor relevant. Fortsæt?','Total'=>'I alt','Update Membership'=>'Opdater medlemskab','Updated membership ID: %d by user ID: %d'=>'Opdaterede medlemskabs-ID: %d af bruger-ID: %d','User'=>'Bruger','User ID'=>'Bruger-ID','User ID %d already has a membership (ID: %d). Please edit the existing membership instead.'=>'Bruger-ID %d har allerede et medlemskab (ID: %d). Rediger venligst det eksisterende medlemskab i stedet.','User ID %d not found'=>'Bruger-ID %d ikke fundet','User Information'=>'Brugerinformation','User Roles & Capabilities'=>'Brugerroller og rettigheder','User accessed renewal link for subscription ID: %d, redirecting to checkout'=>'Bruger tilgik fornyelseslink for abonnements-ID: %d, omdirigerer til checkout','User not found.'=>'Bruger ikke fundet.','Username'=>'Brugernavn','Validation completed successfully!'=>'Validering fuldført succesfuldt!','Validation completed: %d orders checked, %d memberships checked, %d issues found.'=>'Validering fuldført: %d ordrer tjekket, %d medlemskaber tjekket, %d problemer fundet.','Validation errors:<br>%s'=>'Valideringsfejl:<br>%s','Validation failed with error: %s'=>'Validering mislykkedes med fejl: %s','Validation failed: No membership products configured.'=>'Validering mislykkedes: Ingen medlemskabsprodukter konfigureret.','View'=>'Vis','View customer membership page'=>'Vis kundens medlemskabsside','Viewing membership for %s (User ID: %d)'=>'Viser medlemskab for %s (Bruger-ID: %d)','Warning: Failed to create .htaccess file in logs directory (%s). Please check directory permissions.'=>'Advarsel: Kunne ikke oprette .htaccess fil i logs mappen (%s). Tjek venligst mappe rettigheder.','Welcome to Your Membership!'=>'Velkommen til dit medlemskab!','WooCommerce Subscriptions not active for migration.'=>'WooCommerce Subscriptions er ikke aktiv for migration.','WordPress role to assign to members with active memberships.'=>'WordPress rolle der tildeles medlemmer med aktive medlemskaber.','YOUR MEMBERSHIP'=>'DIT MEDLEMSKAB','You can renew your membership at any time using this link:\\n%s\\n\\n'=>'Du kan forny dit medlemskab når som helst ved at bruge dette link:\\n%s\\n\\n','You do not have sufficient permissions to access this page.'=>'Du har ikke tilstrækkelige rettigheder til at tilgå denne side.','You must be logged in to view this content.'=>'Du skal være logget ind for at se dette indhold.','Your Membership'=>'Dit medlemskab','Your membership will expire in 14 days'=>'Dit medlemskab udløber om 14 dage','Your membership will expire in 30 days'=>'Dit medlemskab udløber om 30 dage','Your membership will expire in 7 days'=>'Dit medlemskab udløber om 7 dage','Your membership will expire tomorrow'=>'Dit medlemskab udløber i morgen','[STAGING MODE] Email blocked - To: %s, Subject: %s'=>'[STAGING MODE] E-mail blokeret - Til: %s, Emne: %s','[STAGING MODE] Renewal blocked for subscription ID: %d (User: %d)'=>'[STAGING MODE] Fornyelse blokeret for abonnements-ID: %d (Bruger: %d)','[STAGING MODE] Renewal process skipped - staging mode is active'=>'[STAGING MODE] Fornyelsesproces sprunget over - staging mode er aktiv']];
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Analyse af Membership Manager logfiler
+Læser membership.log og roterede .bak-filer i tidsrækkefølge uden at indlæse dem i hukommelsen,
+grupperer beskeder efter log-skabelon og rapporterer antal, fejlrater og varighed af kørsler
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from membership_log import (DIGIT_BYTES, LOG_DIR, RunTracker, TemplateMatcher,
+                            load_templates, log_files, parse_timestamp, scan_files)
+
+ERROR_LEVELS = {"ERROR", "CRITICAL"}
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def analyze(paths, matcher, since=None, until=None):
+    """Stream the logs once and return the report as a dict
+
+    Lines are aggregated on raw bytes keyed by message-without-digits, so the
+    template regexes and all decoding run once per distinct message shape,
+    not once per line.
+    """
+    since = since.isoformat(sep=" ").encode() if since else None
+    until = until.isoformat(sep=" ").encode() if until else None
+    shapes = {}
+    key_templates = {}
+    tracker = RunTracker()
+    durations = defaultdict(list)
+
+    for timestamp, level, message, _ in scan_files(paths):
+        if since and timestamp < since:
+            continue
+        if until and timestamp > until:
+            break
+        key = message.translate(None, DIGIT_BYTES)
+        stats = shapes.get((key, level))
+        if stats is None:
+            shapes[(key, level)] = [1, timestamp, timestamp]
+        else:
+            stats[0] += 1
+            stats[2] = timestamp
+
+        template = key_templates.get(key)
+        if template is None:
+            template = key_templates[key] = matcher.classify(message.decode("utf-8", "replace"))
+        if template in tracker.templates:
+            run = tracker.feed(template, parse_timestamp(timestamp))
+            if run:
+                name, started, finished = run
+                durations[name].append((finished - started).total_seconds())
+
+    templates = defaultdict(lambda: {"count": 0, "levels": Counter(), "first": None, "last": None})
+    levels = Counter()
+    for (key, raw_level), (count, first_seen, last_seen) in shapes.items():
+        level = raw_level.decode("ascii", "replace").upper()
+        levels[level] += count
+        stats = templates[key_templates[key]]
+        stats["count"] += count
+        stats["levels"][level] += count
+        stats["first"] = min(stats["first"] or first_seen, first_seen)
+        stats["last"] = max(stats["last"] or last_seen, last_seen)
+    total = sum(levels.values())
+    first = min((stats["first"] for stats in templates.values()), default=None)
+    last = max((stats["last"] for stats in templates.values()), default=None)
+
+    errors = sum(levels[level] for level in ERROR_LEVELS)
+    report = {
+        "files": paths,
+        "bytes": sum(os.path.getsize(path) for path in paths),
+        "records": total,
+        "first": first.decode() if first else None,
+        "last": last.decode() if last else None,
+        "levels": dict(levels),
+        "error_rate": errors / total if total else 0.0,
+        "templates": [],
+        "runs": [],
+    }
+    for template, stats in sorted(templates.items(), key=lambda item: -item[1]["count"]):
+        template_errors = sum(stats["levels"][level] for level in ERROR_LEVELS)
+        report["templates"].append({
+            "template": template,
+            "count": stats["count"],
+            "levels": dict(stats["levels"]),
+            "error_rate": template_errors / stats["count"],
+            "first": stats["first"].decode(),
+            "last": stats["last"].decode(),
+        })
+    for name, values in durations.items():
+        report["runs"].append({
+            "name": name,
+            "count": len(values),
+            "abandoned": tracker.abandoned.get(name, 0),
+            "unfinished": int(name in tracker.open),
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 0.5),
+            "p95": percentile(values, 0.95),
+            "max": max(values),
+        })
+    return report
+
+def print_report(report, top):
+    print(f"📄 {len(report['files'])} filer, {report['bytes'] / 1024 / 1024:.1f} MB, {report['records']} poster")
+    if report["first"]:
+        print(f"   Periode: {report['first']} → {report['last']}")
+    levels = ", ".join(f"{level}: {count}" for level, count in sorted(report["levels"].items()))
+    print(f"   Niveauer: {levels}")
+    print(f"   Fejlrate: {report['error_rate']:.2%}")
+
+    print(f"\n{'='*60}\n📊 Top {top} skabeloner\n{'='*60}")
+    for entry in report["templates"][:top]:
+        print(f"{entry['count']:>9}  {entry['error_rate']:>6.1%}  {entry['template']}")
+
+    if report["runs"]:
+        print(f"\n{'='*60}\n⏱  Kørsler (sekunder)\n{'='*60}")
+        print(f"{'kørsel':<20}{'antal':>7}{'gns':>9}{'p50':>9}{'p95':>9}{'max':>9}")
+        for run in report["runs"]:
+            print(f"{run['name']:<20}{run['count']:>7}{run['mean']:>9.1f}{run['p50']:>9.1f}"
+                  f"{run['p95']:>9.1f}{run['max']:>9.1f}")
+
+def parse_date(value):
+    return datetime.fromisoformat(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyser membership.log og roterede backups.")
+    parser.add_argument("files", nargs="*", help="Logfiler (standard: logs/membership.log og alle .bak-filer)")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Mappe med logfiler")
+    parser.add_argument("--since", type=parse_date, help="Kun poster fra dette tidspunkt (YYYY-mm-dd[ HH:MM:SS])")
+    parser.add_argument("--until", type=parse_date, help="Kun poster til dette tidspunkt")
+    parser.add_argument("--top", type=int, default=25, help="Antal skabeloner i rapporten")
+    parser.add_argument("--json", action="store_true", help="Skriv rapporten som JSON")
+    args = parser.parse_args(argv)
+
+    paths = args.files or log_files(args.log_dir)
+    if not paths:
+        print(f"⚠ Ingen logfiler fundet i {args.log_dir}")
+        return 1
+
+    started = time.perf_counter()
+    report = analyze(paths, TemplateMatcher(load_templates()), args.since, args.until)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, args.top)
+        print(f"\n✅ Færdig på {report['seconds']:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
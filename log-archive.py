@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Komprimeret arkiv for roterede Membership Manager logfiler
+Pakker membership.log.*.bak ind i komprimerede segmenter (gzip eller xz) med et tidsindeks pr. blok,
+så et tidsinterval kan læses ved kun at dekomprimere de blokke der dækker det
+"""
+
+import argparse
+import gzip
+import json
+import lzma
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime
+
+from membership_log import LINE, LOG_DIR, LOG_FILE, log_files
+
+ARCHIVE_DIR = os.path.join(LOG_DIR, "archive")
+CATALOG = "catalog.json"
+BLOCK_SIZE = 1024 * 1024
+FORMATS = {
+    "gz": (lambda data: gzip.compress(data, compresslevel=9, mtime=0), gzip.decompress),
+    "xz": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+LOG_START = re.compile(rb"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\] ", re.M)
+
+def load_catalog(archive_dir):
+    path = os.path.join(archive_dir, CATALOG)
+    if not os.path.exists(path):
+        return {"segments": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_catalog(archive_dir, catalog):
+    path = os.path.join(archive_dir, CATALOG)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def split_blocks(data, block_size=BLOCK_SIZE):
+    """Cut a log into chunks of about block_size bytes, only where a log line starts
+
+    Continuation lines of a multi-line message stay in the block of their
+    record, so every block can be read on its own.
+    """
+    start = 0
+    while start < len(data):
+        end = start + block_size
+        if end >= len(data):
+            yield start, len(data)
+            return
+        match = LOG_START.search(data, end)
+        end = match.start() if match else len(data)
+        yield start, end
+        start = end
+
+def block_span(chunk):
+    """First and last timestamp in a block, as 'Y-m-d H:i:s' strings"""
+    stamps = [match.group(1) for match in LINE.finditer(chunk)]
+    if not stamps:
+        return None, None
+    return min(stamps).decode("ascii"), max(stamps).decode("ascii")
+
+def archive_file(path, archive_dir, fmt="xz", block_size=BLOCK_SIZE):
+    """Write one rotated log as a segment of independently compressed blocks plus its index
+
+    The blocks are complete gzip members / xz streams one after another,
+    so the segment is also a normal file for zcat/xzcat.
+    """
+    compress, _ = FORMATS[fmt]
+    with open(path, "rb") as f:
+        data = f.read()
+    name = os.path.basename(path)
+    segment = f"{name}.{fmt}"
+    blocks = []
+    offset = 0
+    with open(os.path.join(archive_dir, segment + ".tmp"), "wb") as out:
+        for start, end in split_blocks(data, block_size):
+            chunk = data[start:end]
+            packed = compress(chunk)
+            first, last = block_span(chunk)
+            blocks.append({"first": first, "last": last, "offset": offset, "length": len(packed),
+                           "raw_length": len(chunk), "crc32": zlib.crc32(chunk)})
+            out.write(packed)
+            offset += len(packed)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(os.path.join(archive_dir, segment + ".tmp"), os.path.join(archive_dir, segment))
+    with open(os.path.join(archive_dir, segment + ".idx.json"), "w", encoding="utf-8") as f:
+        json.dump({"source": name, "format": fmt, "blocks": blocks}, f)
+    spans = [block for block in blocks if block["first"]]
+    return {
+        "segment": segment,
+        "source": name,
+        "format": fmt,
+        "first": min((block["first"] for block in spans), default=None),
+        "last": max((block["last"] for block in spans), default=None),
+        "raw_bytes": len(data),
+        "bytes": offset,
+        "blocks": len(blocks),
+    }
+
+def archive(log_dir=LOG_DIR, archive_dir=None, fmt="xz", block_size=BLOCK_SIZE, keep=False):
+    """Archive every rotated .bak not in the catalog yet; the active log is left alone
+
+    A .bak is removed once its segment is written and its catalog entry
+    saved, unless `keep` is set. Safe to run again at any time.
+    """
+    archive_dir = archive_dir or os.path.join(log_dir, "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    catalog = load_catalog(archive_dir)
+    done = {entry["source"] for entry in catalog["segments"]}
+    added = []
+    for path in log_files(log_dir):
+        name = os.path.basename(path)
+        if name == LOG_FILE:
+            continue
+        if name not in done:
+            entry = archive_file(path, archive_dir, fmt, block_size)
+            catalog["segments"].append(entry)
+            catalog["segments"].sort(key=lambda item: (item["first"] or "", item["source"]))
+            save_catalog(archive_dir, catalog)
+            added.append(entry)
+        if not keep:
+            os.remove(path)
+    return added
+
+def read_block(handle, block, fmt):
+    _, decompress = FORMATS[fmt]
+    handle.seek(block["offset"])
+    chunk = decompress(handle.read(block["length"]))
+    if zlib.crc32(chunk) != block["crc32"]:
+        raise ValueError(f"CRC-fejl i blok ved offset {block['offset']} i {handle.name}")
+    return chunk
+
+def filter_records(chunk, since, until):
+    """Records (with continuation lines) of a block whose timestamp is within [since, until]"""
+    matches = list(LINE.finditer(chunk))
+    for index, match in enumerate(matches):
+        stamp = match.group(1).decode("ascii")
+        if (since and stamp < since) or (until and stamp > until):
+            continue
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(chunk)
+        yield chunk[match.start():end]
+
+def read_range(archive_dir, since=None, until=None, stats=None):
+    """Archived log records between since and until ('Y-m-d H:i:s' strings, inclusive), oldest first
+
+    Only segments and blocks whose time span overlaps the range are opened
+    and decompressed.
+    """
+    catalog = load_catalog(archive_dir)
+    for entry in catalog["segments"]:
+        if entry["first"] is None or (until and entry["first"] > until) or (since and entry["last"] < since):
+            continue
+        with open(os.path.join(archive_dir, entry["segment"] + ".idx.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        with open(os.path.join(archive_dir, entry["segment"]), "rb") as handle:
+            for block in index["blocks"]:
+                if block["first"] is None or (until and block["first"] > until) or (since and block["last"] < since):
+                    continue
+                chunk = read_block(handle, block, index["format"])
+                if stats is not None:
+                    stats["blocks"] += 1
+                    stats["bytes"] += block["length"]
+                yield from filter_records(chunk, since, until)
+
+def live_range(log_dir, since=None, until=None):
+    """The same records from the not yet archived .bak files and the active log"""
+    for path in log_files(log_dir):
+        with open(path, "rb") as f:
+            yield from filter_records(f.read(), since, until)
+
+def verify(archive_dir):
+    """Decompress every block and check it against the index; return the number of bad blocks"""
+    bad = 0
+    for entry in load_catalog(archive_dir)["segments"]:
+        with open(os.path.join(archive_dir, entry["segment"] + ".idx.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        with open(os.path.join(archive_dir, entry["segment"]), "rb") as handle:
+            for block in index["blocks"]:
+                try:
+                    read_block(handle, block, index["format"])
+                except (ValueError, OSError, EOFError, lzma.LZMAError) as error:
+                    print(f"❌ {entry['segment']}: {error}")
+                    bad += 1
+    return bad
+
+def timestamp_arg(value):
+    return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arkiver roterede logfiler komprimeret og læs tidsintervaller fra arkivet.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("archive", "read", "stats", "verify"):
+        command = sub.add_parser(name)
+        command.add_argument("--log-dir", default=LOG_DIR, help="Mappe med membership.log og .bak-filer")
+        command.add_argument("--archive-dir", help="Arkivmappe (standard: <log-dir>/archive)")
+    archive_parser = sub.choices["archive"]
+    archive_parser.add_argument("--format", choices=sorted(FORMATS), default="xz", help="Komprimering")
+    archive_parser.add_argument("--block-size", type=int, default=BLOCK_SIZE // 1024, help="Blokstørrelse i KB før komprimering")
+    archive_parser.add_argument("--keep", action="store_true", help="Behold .bak-filerne efter arkivering")
+    read_parser = sub.choices["read"]
+    read_parser.add_argument("--since", type=timestamp_arg, help="Fra tidspunkt (UTC som i loggen)")
+    read_parser.add_argument("--until", type=timestamp_arg, help="Til tidspunkt")
+    read_parser.add_argument("--include-live", action="store_true", help="Læs også .bak-filer og membership.log der ikke er arkiveret")
+    args = parser.parse_args(argv)
+    archive_dir = args.archive_dir or os.path.join(args.log_dir, "archive")
+
+    if args.command == "archive":
+        started = time.perf_counter()
+        added = archive(args.log_dir, archive_dir, args.format, args.block_size * 1024, args.keep)
+        for entry in added:
+            print(f"✓ {entry['source']} → {entry['segment']} ({entry['raw_bytes'] / 1e6:.1f} MB → "
+                  f"{entry['bytes'] / 1e6:.2f} MB, {entry['blocks']} blokke)")
+        print(f"\n✅ {len(added)} filer arkiveret på {time.perf_counter() - started:.2f} s")
+        return 0
+
+    if args.command == "verify":
+        bad = verify(archive_dir)
+        print("✅ Alle blokke er intakte" if not bad else f"\n⚠ {bad} beskadigede blokke")
+        return 1 if bad else 0
+
+    if args.command == "stats":
+        segments = load_catalog(archive_dir)["segments"]
+        raw = sum(entry["raw_bytes"] for entry in segments)
+        packed = sum(entry["bytes"] for entry in segments)
+        print(f"{'='*60}\n📊 Logarkiv\n{'='*60}")
+        print(f"   Segmenter: {len(segments)}")
+        if segments:
+            print(f"   Periode: {segments[0]['first']} → {max(entry['last'] or '' for entry in segments)}")
+            print(f"   Størrelse: {raw / 1e6:.1f} MB → {packed / 1e6:.2f} MB (faktor {raw / max(packed, 1):.1f})")
+        return 0
+
+    started = time.perf_counter()
+    stats = {"blocks": 0, "bytes": 0}
+    records = 0
+    out = sys.stdout.buffer
+    for record in read_range(archive_dir, args.since, args.until, stats):
+        out.write(record if record.endswith(b"\n") else record + b"\n")
+        records += 1
+    if args.include_live:
+        for record in live_range(args.log_dir, args.since, args.until):
+            out.write(record if record.endswith(b"\n") else record + b"\n")
+            records += 1
+    out.flush()
+    print(f"\n{records} linjer, {stats['blocks']} blokke ({stats['bytes'] / 1e6:.2f} MB) dekomprimeret "
+          f"på {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
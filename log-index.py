@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Indekseret opslag i Membership Manager logfiler
+Bygger et inverteret indeks over abonnements-, ordre- og bruger-ID'er samt log-niveau,
+opdateres trinvist med kun de nye bytes og viser tidslinjer på millisekunder
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from membership_log import DIGIT_BYTES, LOG_DIR, epoch, head_hash, log_files, scan_file
+
+DEFAULT_INDEX = os.path.join(LOG_DIR, "membership-index.sqlite")
+
+SUBSCRIPTION, ORDER, USER, LEVEL = 1, 2, 3, 4
+KIND_NAMES = {SUBSCRIPTION: "abonnement", ORDER: "ordre", USER: "bruger", LEVEL: "niveau"}
+
+# ID formats used in the log messages, e.g. "abonnements-ID: %d", "Ordre #%d",
+# "bruger #%d", "(user: %d, IP: %s)". Memberships are rows in
+# wp_membership_subscriptions, so "medlemskab #%d" counts as a subscription.
+ID_PATTERN = re.compile(rb"""
+    (?:
+        (abonnements-id|subscription\ id|subscription|medlemskabs-id|medlemskab|membership\ id|membership)
+      | (ordre-id|ordre|order)
+      | (bruger-id|bruger|user\ id|user)
+    )
+    [ :#]*(\d+)
+""", re.I | re.X)
+
+# INFO is the bulk of every log and not worth a posting list of its own
+LEVEL_CODES = {b"DEBUG": 1, b"WARNING": 3, b"ERROR": 4, b"CRITICAL": 5}
+LEVEL_NAMES = {code: name.decode() for name, code in LEVEL_CODES.items()}
+LEVEL_NAMES[2] = "INFO"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    head_hash TEXT NOT NULL UNIQUE,
+    indexed_bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    kind INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    PRIMARY KEY (kind, key, ts, file_id, offset)
+) WITHOUT ROWID;
+"""
+
+DIGIT_RUN = re.compile(rb"\d+")
+
+class IdExtractor:
+    """Finds the IDs in a message, running ID_PATTERN once per message shape
+
+    Messages that differ only in their digits (the same template with other
+    IDs) share a plan: which digit runs are IDs, and of which kind. Later
+    messages then only need their digit runs split out.
+    """
+
+    CACHE_LIMIT = 100000
+
+    def __init__(self):
+        self.plans = {}
+
+    def extract(self, message):
+        runs = DIGIT_RUN.findall(message)
+        if not runs:
+            return ()
+        key = (message.translate(None, DIGIT_BYTES), len(runs))
+        plan = self.plans.get(key)
+        if plan is None:
+            if len(self.plans) >= self.CACHE_LIMIT:
+                self.plans.clear()
+            plan = self.plans[key] = self.plan(message)
+        return [(kind, int(runs[ordinal])) for kind, ordinal in plan]
+
+    @staticmethod
+    def plan(message):
+        steps = []
+        for match in ID_PATTERN.finditer(message):
+            kind = SUBSCRIPTION if match.group(1) else ORDER if match.group(2) else USER
+            steps.append((kind, len(DIGIT_RUN.findall(message, 0, match.start(4)))))
+        return tuple(steps)
+
+def open_index(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute("PRAGMA cache_size = -65536")
+    connection.executescript(SCHEMA)
+    return connection
+
+def update_index(connection, paths):
+    """Index bytes appended since the last run; return (files, new lines)
+
+    Files are recognised by the hash of their first line, so the active log
+    keeps its postings after Membership_Manager::log() renames it to a .bak.
+    Postings of files that no longer exist are dropped.
+    """
+    known = {row[0]: (row[1], row[2]) for row in connection.execute("SELECT head_hash, id, indexed_bytes FROM files")}
+    seen = set()
+    new_lines = 0
+
+    with connection:
+        for path in paths:
+            digest = head_hash(path)
+            if digest is None:
+                continue  # Empty or still being written
+            seen.add(digest)
+            if digest in known:
+                file_id, start = known[digest]
+                connection.execute("UPDATE files SET path = ? WHERE id = ?", (path, file_id))
+            else:
+                file_id = connection.execute(
+                    "INSERT INTO files (path, head_hash, indexed_bytes) VALUES (?, ?, 0)", (path, digest)
+                ).lastrowid
+                start = 0
+
+            extractor = IdExtractor()
+            rows = []
+            end = start
+            for timestamp, level, message, offset in scan_file(path, start):
+                ts = epoch(timestamp)
+                code = LEVEL_CODES.get(level) or LEVEL_CODES.get(level.upper(), 2)
+                if code != 2:
+                    rows.append((LEVEL, code, ts, file_id, offset, code))
+                for kind, key in extractor.extract(message):
+                    rows.append((kind, key, ts, file_id, offset, code))
+                new_lines += 1
+                end = offset
+            if rows:
+                connection.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if end > start or rows:
+                # Resume at the last line next time; it may still get continuation lines
+                connection.execute("UPDATE files SET indexed_bytes = ? WHERE id = ?", (end, file_id))
+
+        for digest, (file_id, _) in known.items():
+            if digest not in seen:
+                connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+    return len(seen), new_lines
+
+def query(connection, filters, level=None, since=None, until=None, limit=None):
+    """(ts, file_path, offset) of lines matching every (kind, key) filter, oldest first"""
+    if not filters and level:
+        filters = [(LEVEL, level)]
+        level = None
+    first_kind, first_key = filters[0]
+    sql = ["SELECT p.ts, f.path, p.offset FROM postings p JOIN files f ON f.id = p.file_id",
+           "WHERE p.kind = ? AND p.key = ?"]
+    params = [first_kind, first_key]
+    for kind, key in filters[1:]:
+        sql.append("AND EXISTS (SELECT 1 FROM postings q WHERE q.kind = ? AND q.key = ?"
+                   " AND q.ts = p.ts AND q.file_id = p.file_id AND q.offset = p.offset)")
+        params += [kind, key]
+    if level:
+        sql.append("AND p.level = ?")
+        params.append(level)
+    if since:
+        sql.append("AND p.ts >= ?")
+        params.append(int(since.timestamp()))
+    if until:
+        sql.append("AND p.ts <= ?")
+        params.append(int(until.timestamp()))
+    sql.append("ORDER BY p.ts, p.file_id, p.offset")
+    if limit:
+        sql.append("LIMIT ?")
+        params.append(limit)
+    return connection.execute(" ".join(sql), params).fetchall()
+
+def read_line(handles, path, offset):
+    handle = handles.get(path)
+    if handle is None:
+        handle = handles[path] = open(path, "rb")
+    handle.seek(offset)
+    return handle.readline().rstrip(b"\r\n").decode("utf-8", "replace")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indekser og søg i membership.log efter abonnement, ordre, bruger eller niveau.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("update", "timeline"):
+        command = sub.add_parser(name)
+        command.add_argument("--log-dir", default=LOG_DIR, help="Mappe med logfiler")
+        command.add_argument("--index", default=DEFAULT_INDEX, help="Sti til indeksfilen")
+    timeline = sub.choices["timeline"]
+    timeline.add_argument("--subscription", type=int, help="Abonnements-/medlemskabs-ID")
+    timeline.add_argument("--order", type=int, help="Ordrenummer")
+    timeline.add_argument("--user", type=int, help="Bruger-ID")
+    timeline.add_argument("--level", choices=sorted(name.decode() for name in LEVEL_CODES), help="Kun dette niveau")
+    timeline.add_argument("--since", type=datetime.fromisoformat, help="Fra tidspunkt")
+    timeline.add_argument("--until", type=datetime.fromisoformat, help="Til tidspunkt")
+    timeline.add_argument("--limit", type=int, help="Maksimalt antal linjer")
+    timeline.add_argument("--no-update", action="store_true", help="Spring den trinvise opdatering over")
+    args = parser.parse_args(argv)
+
+    connection = open_index(args.index)
+
+    if args.command == "update" or not args.no_update:
+        started = time.perf_counter()
+        files, lines = update_index(connection, log_files(args.log_dir))
+        if args.command == "update":
+            print(f"✅ {lines} nye linjer indekseret fra {files} filer på {time.perf_counter() - started:.2f} s")
+            return 0
+
+    filters = [(kind, value) for kind, value in ((SUBSCRIPTION, args.subscription), (ORDER, args.order), (USER, args.user))
+               if value is not None]
+    level = LEVEL_CODES[args.level.encode()] if args.level else None
+    if not filters and not level:
+        parser.error("angiv mindst én af --subscription, --order, --user eller --level")
+
+    started = time.perf_counter()
+    rows = query(connection, filters, level, args.since, args.until, args.limit)
+    handles = {}
+    try:
+        for _, path, offset in rows:
+            print(read_line(handles, path, offset))
+    finally:
+        for handle in handles.values():
+            handle.close()
+    print(f"\n{len(rows)} linjer på {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
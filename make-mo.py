@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Bygger binære oversættelseskataloger for Membership Manager
+Laver membership-manager-da_DK.po ud fra oversættelseskataloget i languages/ (eller læser en eksisterende .po)
+og kompilerer den til .mo med hash-tabel samt .l10n.php til WordPress 6.5+
+"""
+
+import argparse
+import os
+import sys
+
+from php_i18n import (TEXT_DOMAIN, build_l10n_php, build_mo, collect_messages,
+                      decode_single_quoted, read_po, write_po)
+from translation_catalogue import open_catalogue
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+LANGUAGES_DIR = os.path.join(PLUGIN_DIR, "languages")
+DEFAULT_LOCALE = "da_DK"
+SOURCE_PATHS = ["membership-manager.php", "includes", "admin", "templates"]
+
+# Plural rules for the locales we ship
+PLURAL_FORMS = {
+    "da_DK": "nplurals=2; plural=(n != 1);",
+}
+
+def load_translations(locale=DEFAULT_LOCALE):
+    """The English => translation dictionary from the shared catalogue, in source order"""
+    return dict(open_catalogue(locale).items())
+
+def catalogue_from_dictionary(dictionary, locale):
+    """Build (header_fields, messages, translations) from an English => Danish dict
+
+    Keys are PHP source literals as auto-translate.py matches them, so they
+    are decoded the way PHP reads a single-quoted string. Entries that
+    translate to themselves are skipped; WordPress falls back to the source
+    string anyway. Source references are taken from the current tree.
+    """
+    references = collect_messages([os.path.join(PLUGIN_DIR, p) for p in SOURCE_PATHS], PLUGIN_DIR)
+    messages = {}
+    translations = {}
+    for english, danish in dictionary.items():
+        msgid = decode_single_quoted(f"'{english}'")
+        msgstr = decode_single_quoted(f"'{danish}'")
+        key = (None, msgid)
+        if msgid == msgstr or key in messages:
+            continue
+        found = references.get(key, {})
+        messages[key] = {
+            "msgid": msgid,
+            "msgctxt": None,
+            "msgid_plural": None,
+            "references": found.get("references", []),
+            "comments": found.get("comments", []),
+            "flags": found.get("flags", []),
+        }
+        translations[key] = msgstr
+
+    header_fields = catalogue_header(locale)
+    return header_fields, messages, translations
+
+def catalogue_header(locale):
+    return [
+        ("Project-Id-Version", "JW Membership Manager"),
+        ("MIME-Version", "1.0"),
+        ("Content-Type", "text/plain; charset=UTF-8"),
+        ("Content-Transfer-Encoding", "8bit"),
+        ("Language", locale),
+        ("Plural-Forms", PLURAL_FORMS.get(locale, "nplurals=2; plural=(n != 1);")),
+        ("X-Generator", "make-mo.py"),
+        ("X-Domain", TEXT_DOMAIN),
+    ]
+
+def write_binary_catalogues(po_path, header_fields, messages, translations):
+    """Write the .mo and .l10n.php files next to a .po file"""
+    base = po_path[:-3] if po_path.endswith(".po") else po_path
+    with open(base + ".mo", "wb") as f:
+        f.write(build_mo(header_fields, messages, translations))
+    with open(base + ".l10n.php", "w", encoding="utf-8", newline="\n") as f:
+        f.write(build_l10n_php(header_fields, messages, translations))
+    return base + ".mo", base + ".l10n.php"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Byg .po, .mo og .l10n.php oversættelsesfiler.")
+    parser.add_argument("po_file", nargs="?", help="Eksisterende .po-fil der skal kompileres (standard: byg fra ordbogen)")
+    parser.add_argument("--locale", default=DEFAULT_LOCALE, help="Sprogkode for den genererede .po-fil")
+    args = parser.parse_args(argv)
+
+    if args.po_file:
+        po_path = args.po_file
+        header_fields, messages, translations = read_po(po_path)
+    else:
+        po_path = os.path.join(LANGUAGES_DIR, f"{TEXT_DOMAIN}-{args.locale}.po")
+        header_fields, messages, translations = catalogue_from_dictionary(load_translations(args.locale), args.locale)
+        with open(po_path, "w", encoding="utf-8", newline="\n") as f:
+            write_po(f, header_fields, messages, translations)
+        print(f"✓ {po_path}: {len(messages)} oversættelser")
+
+    for path in write_binary_catalogues(po_path, header_fields, messages, translations):
+        print(f"✓ {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Genererer languages/membership-manager.pot ud fra kildekoden
+Finder alle WordPress i18n-kald (__, _e, _x, _n, esc_html__, esc_attr__ m.fl.) i én gennemgang
+"""
+
+import argparse
+import io
+import os
+import sys
+from datetime import datetime, timezone
+
+from php_i18n import TEXT_DOMAIN, collect_messages, read_plugin_headers, write_po
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_FILE = "membership-manager.php"
+DEFAULT_PATHS = [PLUGIN_FILE, "includes", "admin", "templates"]
+DEFAULT_OUTPUT = os.path.join("languages", "membership-manager.pot")
+
+# Plugin header fields that WordPress translates on the Plugins screen
+HEADER_STRINGS = ["Plugin Name", "Plugin URI", "Description", "Author", "Author URI"]
+
+def header_messages(headers):
+    messages = {}
+    for name in HEADER_STRINGS:
+        value = headers.get(name)
+        if value and (None, value) not in messages:
+            messages[(None, value)] = {
+                "msgid": value,
+                "msgctxt": None,
+                "msgid_plural": None,
+                "references": [],
+                "comments": [f"{name} of the plugin"],
+                "flags": [],
+            }
+    return messages
+
+def build_pot(paths, creation_date):
+    """Return the POT file contents and message count for the given source paths"""
+    headers = read_plugin_headers(os.path.join(PLUGIN_DIR, PLUGIN_FILE))
+    messages = header_messages(headers)
+    for key, entry in collect_messages(paths, PLUGIN_DIR, TEXT_DOMAIN).items():
+        if key in messages:
+            messages[key]["references"].extend(entry["references"])
+        else:
+            messages[key] = entry
+
+    name = headers.get("Plugin Name", "Membership Manager")
+    version = headers.get("Version", "")
+    header_fields = [
+        ("Project-Id-Version", f"{name} {version}".strip()),
+        ("MIME-Version", "1.0"),
+        ("Content-Type", "text/plain; charset=UTF-8"),
+        ("Content-Transfer-Encoding", "8bit"),
+        ("POT-Creation-Date", creation_date),
+        ("PO-Revision-Date", "YEAR-MO-DA HO:MI+ZONE"),
+        ("Last-Translator", "FULL NAME <EMAIL@ADDRESS>"),
+        ("Language-Team", "LANGUAGE <LL@li.org>"),
+        ("X-Generator", "make-pot.py"),
+        ("X-Domain", TEXT_DOMAIN),
+    ]
+    comments = [
+        f"Copyright (C) {creation_date[:4]} {headers.get('Author', '')}".rstrip(),
+        f"This file is distributed under the {headers.get('License', 'same license as the plugin')}.",
+    ]
+
+    out = io.StringIO()
+    write_po(out, header_fields, messages, header_comments=comments)
+    return out.getvalue(), len(messages)
+
+def strip_creation_date(content):
+    """The POT without the lines that change with the date it was generated; the copyright year is one"""
+    return "\n".join(line for line in content.splitlines()
+                     if not line.startswith('"POT-Creation-Date:') and not line.startswith("# Copyright (C) "))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generer POT-fil for membership-manager.")
+    parser.add_argument("paths", nargs="*", help="Filer eller mapper der skal scannes (standard: plugin-fil, includes, admin, templates)")
+    parser.add_argument("-o", "--output", default=os.path.join(PLUGIN_DIR, DEFAULT_OUTPUT), help="POT-fil der skal skrives")
+    parser.add_argument("--check", action="store_true", help="Skriv ikke; afslut med fejl hvis POT-filen er forældet")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [os.path.join(PLUGIN_DIR, p) for p in DEFAULT_PATHS]
+    creation_date = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M+0000")
+    content, count = build_pot(paths, creation_date)
+
+    if args.check:
+        try:
+            with open(args.output, "r", encoding="utf-8") as f:
+                current = f.read()
+        except OSError:
+            current = ""
+        if strip_creation_date(current) != strip_creation_date(content):
+            print(f"✗ {args.output} er ikke opdateret ({count} strenge i kildekoden)")
+            return 1
+        print(f"✓ {args.output} er opdateret ({count} strenge)")
+        return 0
+
+    with open(args.output, "w", encoding="utf-8", newline="\n") as f:
+        f.write(content)
+    print(f"✅ {count} strenge skrevet til {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Forudberegnet medlemsstatistik til dashboard-widgets
+Læser et snapshot af wp_membership_subscriptions og beregner statustal, snart udløbende medlemskaber,
+fordeling på fornyelsestype samt månedlig churn og fastholdelse i ét gennemløb, gemt som versioneret JSON/SQLite
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from membership_snapshot import open_snapshot
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(PLUGIN_DIR, "build", "membership-stats.json")
+FORMAT_VERSION = 1
+STATUSES = ["active", "expired", "pending-cancel", "cancelled", "on-hold"]
+EXPIRING_DAYS = [7, 14, 30]
+CHURNED = ("expired", "cancelled")
+
+# The single pass over the table. Everything the widgets need is a sum over
+# these groups: status and renewal type, the 7/14/30-day expiry bucket of
+# active rows, manual rows without a token, and the start and churn month.
+# A membership churns when it is expired or cancelled, in the month of
+# status_changed_date, or of end_date when that is missing. The rows are
+# counted in a Counter rather than with GROUP BY, which has SQLite sort
+# every row first and takes about twice as long.
+GROUPS = f"""
+SELECT status, renewal_type,
+       CASE WHEN status = 'active' AND end_date >= :now THEN
+            CASE WHEN end_date <= :until_7 THEN 7 WHEN end_date <= :until_14 THEN 14
+                 WHEN end_date <= :until_30 THEN 30 END
+       END AS expiring,
+       renewal_type = 'manual' AND (renewal_token IS NULL OR renewal_token = '') AS missing_token,
+       NULLIF(substr(start_date, 1, 7), '0000-00') AS start_month,
+       CASE WHEN status IN {CHURNED}
+            THEN NULLIF(substr(COALESCE(NULLIF(status_changed_date, ''), end_date), 1, 7), '0000-00') END AS churn_month
+FROM membership_subscriptions
+"""
+
+# render_status_widget() lists the first five expiring this week,
+# render_issues_widget() the first ten pending-cancel rows
+EXPIRING_LIST = """
+SELECT id, user_id, end_date, renewal_type FROM membership_subscriptions
+WHERE status = 'active' AND end_date BETWEEN :now AND :until_7
+ORDER BY end_date ASC LIMIT 5
+"""
+FAILED_LIST = """
+SELECT id, user_id, end_date, renewal_type FROM membership_subscriptions
+WHERE status = 'pending-cancel' ORDER BY end_date ASC LIMIT 10
+"""
+
+def month_index(month):
+    year, number = month.split("-")
+    return int(year) * 12 + int(number) - 1
+
+def month_name(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def compute(connection, now=None, months=24):
+    """The statistics dict for a snapshot, computed from one scan of the table"""
+    now = now or datetime.utcnow()
+    params = {"now": now.strftime("%Y-%m-%d %H:%M:%S")}
+    for days in EXPIRING_DAYS:
+        params[f"until_{days}"] = (now + timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    # get_membership_status_counts(): the known statuses, total over every row
+    counts = dict.fromkeys(STATUSES, 0)
+    counts["total"] = 0
+    by_type = defaultdict(lambda: defaultdict(int))
+    expiring = {days: defaultdict(int) for days in EXPIRING_DAYS}
+    missing_tokens = 0
+    lifetimes = defaultdict(int)
+    groups = Counter(connection.execute(GROUPS, params))
+    for (status, renewal_type, bucket, missing, start_month, churn_month), count in groups.items():
+        if status in counts:
+            counts[status] += count
+        counts["total"] += count
+        by_type[status][renewal_type] += count
+        if bucket:
+            for days in EXPIRING_DAYS:
+                if bucket <= days:
+                    expiring[days][renewal_type] += count
+        if missing:
+            missing_tokens += count
+        if start_month:
+            lifetimes[(start_month, churn_month)] += count
+
+    current = month_index(now.strftime("%Y-%m"))
+    first = current - months + 1
+    monthly = churn_curve(lifetimes, first, current)
+    return {
+        "version": FORMAT_VERSION,
+        "generated_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "status_counts": counts,
+        "renewal_types": {status: dict(types) for status, types in sorted(by_type.items())},
+        "expiring": {str(days): {"total": sum(types.values()), **types} for days, types in expiring.items()},
+        "expiring_soon": [dict(zip(("id", "user_id", "end_date", "renewal_type"), row))
+                          for row in connection.execute(EXPIRING_LIST, params)],
+        "failed_renewals": [dict(zip(("id", "user_id", "end_date", "renewal_type"), row))
+                            for row in connection.execute(FAILED_LIST)],
+        "missing_tokens": missing_tokens,
+        "monthly": monthly,
+        "retention": retention_curves(lifetimes, first, current),
+    }
+
+def churn_curve(lifetimes, first, current):
+    """Opening, new, churned and closing members per month from first to current"""
+    starts = defaultdict(int)
+    churns = defaultdict(int)
+    for (start_month, churn_month), count in lifetimes.items():
+        start = month_index(start_month)
+        starts[start] += count
+        if churn_month:
+            churns[max(month_index(churn_month), start)] += count
+    live = sum(count for month, count in starts.items() if month < first) - \
+        sum(count for month, count in churns.items() if month < first)
+    curve = []
+    for month in range(first, current + 1):
+        new, churned = starts.get(month, 0), churns.get(month, 0)
+        curve.append({
+            "month": month_name(month),
+            "opening": live,
+            "new": new,
+            "churned": churned,
+            "closing": live + new - churned,
+            "churn_rate": round(churned / live, 4) if live else None,
+        })
+        live += new - churned
+    return curve
+
+def retention_curves(lifetimes, first, current):
+    """{cohort month: [share still a member after 0, 1, 2 ... months]} for cohorts since first"""
+    cohorts = defaultdict(lambda: defaultdict(int))
+    for (start_month, churn_month), count in lifetimes.items():
+        start = month_index(start_month)
+        if first <= start <= current:
+            age = max(month_index(churn_month) - start, 0) if churn_month else None
+            cohorts[start][age] += count
+    curves = {}
+    for start, ages in sorted(cohorts.items()):
+        size = sum(ages.values())
+        remaining = size
+        curve = []
+        for age in range(current - start + 1):
+            remaining -= ages.get(age, 0)
+            curve.append(round(remaining / size, 4))
+        curves[month_name(start)] = {"members": size, "retained": curve}
+    return curves
+
+def write_sqlite(path, stats):
+    """The same numbers as tables, for readers that prefer SQL over JSON"""
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE status_counts (status TEXT, renewal_type TEXT, count INTEGER);
+            CREATE TABLE expiring (days INTEGER, renewal_type TEXT, count INTEGER);
+            CREATE TABLE monthly (month TEXT PRIMARY KEY, opening INTEGER, new INTEGER, churned INTEGER,
+                                  closing INTEGER, churn_rate REAL);
+            CREATE TABLE retention (cohort TEXT, age INTEGER, members INTEGER, retained REAL,
+                                    PRIMARY KEY (cohort, age));
+        """)
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", str(stats["version"])), ("generated_at", stats["generated_at"]),
+            ("missing_tokens", str(stats["missing_tokens"])), ("total", str(stats["status_counts"]["total"])),
+            ("expiring_soon", json.dumps(stats["expiring_soon"])), ("failed_renewals", json.dumps(stats["failed_renewals"])),
+        ])
+        connection.executemany("INSERT INTO status_counts VALUES (?, ?, ?)", [
+            (status, renewal_type, count)
+            for status, types in stats["renewal_types"].items() for renewal_type, count in types.items()])
+        connection.executemany("INSERT INTO expiring VALUES (?, ?, ?)", [
+            (int(days), renewal_type, count)
+            for days, types in stats["expiring"].items() for renewal_type, count in types.items()
+            if renewal_type != "total"])
+        connection.executemany("INSERT INTO monthly VALUES (:month, :opening, :new, :churned, :closing, :churn_rate)",
+                               stats["monthly"])
+        connection.executemany("INSERT INTO retention VALUES (?, ?, ?, ?)", [
+            (cohort, age, curve["members"], share)
+            for cohort, curve in stats["retention"].items() for age, share in enumerate(curve["retained"])])
+    connection.close()
+
+def write_json(path, stats):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, separators=(",", ":"))
+    # Readers never see a half-written file
+    os.replace(path + ".tmp", path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forudberegn medlemsstatistik til dashboardet ud fra et snapshot.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON-fil der skrives")
+    parser.add_argument("--sqlite", help="Skriv også tallene som SQLite-tabeller")
+    parser.add_argument("--months", type=int, default=24, help="Antal måneder i churn- og fastholdelseskurverne")
+    parser.add_argument("--now", type=datetime.fromisoformat, help="Beregn som på dette tidspunkt (UTC)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    loaded = time.perf_counter()
+    stats = compute(connection, args.now, args.months)
+    finished = time.perf_counter()
+    write_json(args.output, stats)
+    if args.sqlite:
+        write_sqlite(args.sqlite, stats)
+
+    counts = stats["status_counts"]
+    print(f"{'='*60}\n📊 Medlemsstatistik {stats['generated_at']}\n{'='*60}")
+    print("   " + ", ".join(f"{status}: {counts[status]}" for status in STATUSES) + f" (i alt {counts['total']})")
+    print("   Udløber: " + ", ".join(f"{days} dage: {stats['expiring'][str(days)]['total']}" for days in EXPIRING_DAYS))
+    if stats["monthly"]:
+        last = stats["monthly"][-1]
+        print(f"   {last['month']}: {last['opening']} → {last['closing']} (+{last['new']}, -{last['churned']})")
+    print(f"\n📄 Skrevet til {args.output}" + (f" og {args.sqlite}" if args.sqlite else ""))
+    print(f"\n✅ Indlæst på {loaded - started:.2f} s, beregnet på {finished - loaded:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Fælles værktøjer til Membership Manager logfiler
+Læser logs/membership.log og de roterede backups som strømme af poster
+og genkender hvilken log-skabelon (sprintf-format) hver besked kommer fra
+"""
+
+import glob
+import hashlib
+import heapq
+import mmap
+import os
+import re
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from php_i18n import KEYWORDS, find_php_files, literal_value, read_arguments, tokenize
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(PLUGIN_DIR, "logs")
+LOG_FILE = "membership.log"
+SOURCE_PATHS = ["membership-manager.php", "includes"]
+
+# [YYYY-mm-dd HH:MM:SS] [LEVEL] - message, as written by Membership_Manager::log()
+LINE = re.compile(rb"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] \[([^\]\n]*)\] - ([^\n]*)", re.M)
+DIGIT_BYTES = b"0123456789"
+
+LogRecord = namedtuple("LogRecord", "timestamp level message path offset")
+
+def log_files(log_dir=LOG_DIR):
+    """Rotated backups oldest first, then the active log
+
+    Backups are named membership.log.Y-m-d-His.bak by the rotation in
+    Membership_Manager::log(), so name order is rotation order.
+    """
+    backups = sorted(glob.glob(os.path.join(log_dir, LOG_FILE + ".*.bak")))
+    active = os.path.join(log_dir, LOG_FILE)
+    return backups + ([active] if os.path.exists(active) else [])
+
+def parse_timestamp(text, _cache={}):
+    """datetime for a log timestamp (str or bytes); consecutive lines mostly share a second"""
+    value = _cache.get(text)
+    if value is None:
+        if len(_cache) > 4096:
+            _cache.clear()
+        raw = text.decode("ascii") if isinstance(text, bytes) else text
+        value = _cache[text] = datetime.fromisoformat(raw)
+    return value
+
+def epoch(timestamp, _cache={}):
+    """Unix time of a log timestamp; converted once per minute, seconds added on"""
+    minute = timestamp[:16]
+    value = _cache.get(minute)
+    if value is None:
+        if len(_cache) > 4096:
+            _cache.clear()
+        value = _cache[minute] = int(datetime.fromisoformat(minute.decode("ascii")).timestamp())
+    return value + int(timestamp[17:19])
+
+def head_hash(path):
+    """Identify a log file by its first line, which survives rotation renames"""
+    with open(path, "rb") as f:
+        first_line = f.readline(512)
+    if not first_line.endswith(b"\n") and len(first_line) < 512:
+        return None
+    return hashlib.sha1(first_line).hexdigest()
+
+def scan_file(path, start=0):
+    """Yield (timestamp, level, message, offset) byte strings for one log file
+
+    The file is memory-mapped and split by a single compiled pattern, so no
+    Python code runs per byte. Lines without a log header (multi-line
+    messages such as print_r() output) are appended to the previous message.
+    `start` is a byte offset to resume from at the beginning of a line.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pending = None
+            pending_end = start
+            for match in LINE.finditer(data, start):
+                if pending is not None:
+                    if match.start() > pending_end + 1:
+                        pending[2] += data[pending_end:match.start() - 1].rstrip(b"\r")
+                    yield tuple(pending)
+                pending = [match.group(1), match.group(2), match.group(3).rstrip(b"\r"), match.start()]
+                pending_end = match.end()
+            if pending is not None:
+                if size > pending_end + 1:
+                    pending[2] += data[pending_end:size].rstrip(b"\r\n")
+                yield tuple(pending)
+
+def time_span(path):
+    """Timestamps of the first and last line in a file, as bytes, or None"""
+    with open(path, "rb") as f:
+        head = f.read(64)
+        f.seek(max(0, os.fstat(f.fileno()).st_size - 65536))
+        tail = f.read()
+    first = LINE.match(head)
+    last = None
+    for last in LINE.finditer(tail):
+        pass
+    if not first or not last:
+        return None
+    return first.group(1), last.group(1)
+
+def _in_time_order(paths, streams, key):
+    """Chain the streams when the files follow each other in time, else merge them
+
+    Rotated files normally do follow each other, which avoids a heap
+    operation per line.
+    """
+    spans = [time_span(path) for path in paths]
+    if all(a is None or b is None or a[1] <= b[0] for a, b in zip(spans, spans[1:])):
+        return (entry for stream in streams for entry in stream)
+    return heapq.merge(*streams, key=key)
+
+def scan_files(paths):
+    """scan_file() over several files, in timestamp order"""
+    return _in_time_order(paths, [scan_file(path) for path in paths], lambda entry: entry[0])
+
+def iter_file_records(path, start=0):
+    """LogRecords for one file; see scan_file()"""
+    for timestamp, level, message, offset in scan_file(path, start):
+        yield LogRecord(parse_timestamp(timestamp), level.decode("ascii", "replace").upper(),
+                        message.decode("utf-8", "replace"), path, offset)
+
+def iter_records(paths):
+    """LogRecords from several files in timestamp order"""
+    return _in_time_order(paths, [iter_file_records(path) for path in paths],
+                          lambda record: record.timestamp)
+
+# -- Writing ----------------------------------------------------------------
+
+ROTATE_BYTES = 5 * 1024 * 1024
+KEEP_BACKUPS = 5
+
+def format_line(message, level="INFO", moment=None):
+    """One line as Membership_Manager::log() writes it; WordPress runs date() in UTC"""
+    moment = moment or datetime.utcnow()
+    return f"[{moment:%Y-%m-%d %H:%M:%S}] [{level}] - {message}\n"
+
+def append_log(lines, log_dir=LOG_DIR):
+    """Append formatted lines to membership.log, rotating it like Membership_Manager::log()"""
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, LOG_FILE)
+    if os.path.exists(path) and os.path.getsize(path) > ROTATE_BYTES:
+        os.rename(path, f"{path}.{datetime.utcnow():%Y-%m-%d-%H%M%S}.bak")
+        backups = sorted(glob.glob(os.path.join(log_dir, LOG_FILE + ".*.bak")), key=os.path.getmtime)
+        for old in backups[:-KEEP_BACKUPS]:
+            os.remove(old)
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+# -- Log templates ----------------------------------------------------------
+
+FORMAT_PLACEHOLDER = re.compile(r"%%|%(?:\d+\$)?[-+ 0#']*\d*(?:\.\d+)?([bcdeEfFgGosuxX])")
+INTERPOLATION = re.compile(r"\{\$[^}]*\}|\$[A-Za-z_]\w*(?:->\w+|\[[^\]]*\])*")
+DIGITS = re.compile(r"\d+")
+
+def _split_concatenation(tokens):
+    parts = [[]]
+    depth = 0
+    for token in tokens:
+        kind, text, _ = token
+        if kind == "punct" and text in "()":
+            depth += 1 if text == "(" else -1
+        elif kind == "punct" and text == "." and depth == 0:
+            parts.append([])
+            continue
+        parts[-1].append(token)
+    return parts
+
+def _part_value(part):
+    """Literal value of one concatenation operand, or None"""
+    if len(part) == 1 and part[0][0] in ("sq", "dq"):
+        return literal_value(part)
+    if len(part) > 2 and part[0][0] == "name" and part[0][1] in KEYWORDS and part[1][1] == "(":
+        args = read_arguments(iter(part[2:]))
+        return literal_value(args[0]) if args else None
+    return None
+
+def _interpolated_template(token):
+    """Template for a double-quoted string with "$var" / "{$obj->x}" parts"""
+    pieces = INTERPOLATION.split(token[1:-1])
+    values = [literal_value([("dq", f'"{piece}"', 0)]) or "" for piece in pieces]
+    return "%s".join(value.replace("%", "%%") for value in values)
+
+def expression_template(tokens):
+    """printf-style template for the message argument of a log() call
+
+    sprintf( format, ... ) yields the format itself; concatenations and
+    interpolated strings become literal text with %s for each dynamic part.
+    Returns None when nothing literal is left (e.g. log( $message )).
+    """
+    if not tokens:
+        return None
+    if tokens[0][:2] == ("name", "sprintf") and len(tokens) > 1 and tokens[1][1] == "(":
+        args = read_arguments(iter(tokens[2:]))
+        parts = [_part_value(part) for part in _split_concatenation(args[0])] if args else [None]
+        if any(part is None for part in parts):
+            return None
+        return "".join(parts)
+
+    pieces = []
+    for part in _split_concatenation(tokens):
+        value = _part_value(part)
+        if value is not None:
+            pieces.append(value.replace("%", "%%"))
+        elif len(part) == 1 and part[0][0] == "dq":
+            pieces.append(_interpolated_template(part[0][1]))
+        elif not pieces or pieces[-1] != "%s":
+            pieces.append("%s")
+    template = "".join(pieces)
+    return None if template.replace("%s", "").strip() == "" else template
+
+def extract_log_templates(content):
+    """Yield (template, line) for every ::log( ... ) call in PHP source"""
+    tokens = tokenize(content)
+    previous = None
+    for kind, text, line in tokens:
+        if kind == "name" and text == "log" and previous == "::":
+            kind, text, _ = next(tokens, (None, None, None))
+            if text == "(":
+                args = read_arguments(tokens)
+                template = expression_template(args[0])
+                if template:
+                    yield template, line
+        previous = text
+
+def load_templates(paths=None):
+    """Unique log templates found in the plugin source, in source order"""
+    paths = paths or [os.path.join(PLUGIN_DIR, p) for p in SOURCE_PATHS]
+    templates = {}
+    for filepath in find_php_files(paths):
+        with open(filepath, "r", encoding="utf-8") as f:
+            for template, _ in extract_log_templates(f.read()):
+                templates.setdefault(template, None)
+    return list(templates)
+
+def template_regex(template):
+    """Compiled full-match regex for a printf-style template"""
+    pieces = []
+    position = 0
+    for match in FORMAT_PLACEHOLDER.finditer(template):
+        pieces.append(re.escape(template[position:match.start()]))
+        if match.group(0) == "%%":
+            pieces.append("%")
+        elif match.group(1) in "du":
+            pieces.append(r"-?\d+")
+        else:
+            pieces.append(".*?")
+        position = match.end()
+    pieces.append(re.escape(template[position:]))
+    return re.compile("".join(pieces) + r"\Z", re.S)
+
+def literal_prefix(template):
+    match = FORMAT_PLACEHOLDER.search(template.replace("%%", "\0"))
+    prefix = template.replace("%%", "\0")[:match.start() if match else None]
+    return prefix.replace("\0", "%")
+
+class TemplateMatcher:
+    """Maps log messages to the template that produced them
+
+    Messages are first reduced to a key with every digit run replaced by %d;
+    the key -> template result is cached, so the regexes only run the first
+    time a message shape is seen. Messages no template explains are grouped
+    by that key.
+    """
+
+    PREFIX_LENGTH = 4
+    CACHE_LIMIT = 100000
+
+    def __init__(self, templates):
+        self.by_prefix = defaultdict(list)
+        self.short = []
+        # Longer literal text first, so "%s" style catch-alls match last
+        ordered = sorted(templates, key=lambda t: -len(FORMAT_PLACEHOLDER.sub("", t)))
+        for template in ordered:
+            prefix = literal_prefix(template)
+            entry = (template, template_regex(template))
+            if len(prefix) >= self.PREFIX_LENGTH:
+                self.by_prefix[prefix[:self.PREFIX_LENGTH]].append(entry)
+            else:
+                self.short.append(entry)
+        self.cache = {}
+
+    def classify(self, message):
+        key = DIGITS.sub("%d", message)
+        template = self.cache.get(key)
+        if template is None:
+            template = self.match(message) or key
+            if len(self.cache) < self.CACHE_LIMIT:
+                self.cache[key] = template
+        return template
+
+    def match(self, message):
+        for template, regex in self.by_prefix.get(message[:self.PREFIX_LENGTH], ()):
+            if regex.match(message):
+                return template
+        for template, regex in self.short:
+            if regex.match(message):
+                return template
+        return None
+
+# Start/finish markers of the long-running jobs; a failure line also ends a run
+RUN_MARKERS = [
+    ("validering",
+     "Starter medlemskabsdata validering.",
+     ["Validering fuldført: %d ordrer tjekket, %d medlemskaber tjekket, %d problemer fundet.",
+      "Validering mislykkedes: Ingen medlemskabsprodukter konfigureret.",
+      "Validering mislykkedes med fejl: %s"]),
+    ("reparation",
+     "Starter automatisk reparation af medlemskabsdata.",
+     ["Reparation fuldført: %d problemer rettet (%d ordrer linket, %d medlemskaber oprettet)",
+      "Reparation mislykkedes med fejl: %s"]),
+    ("fornyelsesproces",
+     "Starter fornyelsesproces.",
+     ["Fornyelsesproces afsluttet."]),
+    ("migration",
+     "Starter WooCommerce abonnements migration med produkter: %s",
+     ["Afsluttede WooCommerce abonnements migration. Migrerede %d abonnementer, sprang %d over.",
+      "Migration mislykkedes med fejl: %s"]),
+    ("datooprydning",
+     "Starting cleanup of invalid end dates.",
+     ["Finished cleanup. Updated %d out of %d memberships with invalid end dates.",
+      "Cleanup failed with exception: %s in %s:%d",
+      "Cleanup failed with fatal error: %s in %s:%d"]),
+    ("test påmindelser",
+     "Starter test påmindelses-e-mail proces. Mål: %s, Type: %s, Fornyelse: %s",
+     ["Test påmindelses-e-mail proces fuldført. Sendte %d e-mails."]),
+]
+
+class RunTracker:
+    """Pairs start and finish markers into runs as records stream past
+
+    feed() takes a template and the moment it was logged, and returns a
+    finished run as (name, started, finished) or None. A second start before
+    the finish abandons the earlier run.
+    """
+
+    def __init__(self, markers=RUN_MARKERS):
+        self.starts = {start: name for name, start, _ in markers}
+        self.finishes = {finish: name for name, _, finishes in markers for finish in finishes}
+        self.templates = set(self.starts) | set(self.finishes)
+        self.open = {}
+        self.abandoned = defaultdict(int)
+
+    def feed(self, template, moment):
+        name = self.starts.get(template)
+        if name is not None:
+            if name in self.open:
+                self.abandoned[name] += 1
+            self.open[name] = moment
+            return None
+        name = self.finishes.get(template)
+        if name is not None and name in self.open:
+            return name, self.open.pop(name), moment
+        return None
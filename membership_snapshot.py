@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Fælles indlæsning af Membership Manager data-snapshots
+Læser en eksport af medlemskabstabellen og WooCommerce ordrer fra CSV-filer eller en SQLite-fil
+ind i en SQLite database i hukommelsen, så værktøjerne kan arbejde med joins i stedet for rækkevise opslag
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+from operator import itemgetter
+
+# wp_membership_subscriptions as created by Membership_Manager::activate(),
+# plus flattened WooCommerce data. A snapshot is either a SQLite file with
+# these tables or a directory with one <table>.csv per table (header row =
+# column names, missing columns are left NULL, missing tables are empty).
+SCHEMA = {
+    "membership_subscriptions": """
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        start_date TEXT NOT NULL DEFAULT '0000-00-00 00:00:00',
+        end_date TEXT NOT NULL DEFAULT '0000-00-00 00:00:00',
+        status TEXT NOT NULL DEFAULT '',
+        renewal_type TEXT NOT NULL DEFAULT 'manual',
+        renewal_token TEXT NOT NULL DEFAULT '',
+        paused_date TEXT,
+        status_changed_date TEXT
+    """,
+    # One row per shop order. membership_created/membership_ids are the
+    # _membership_created/_membership_ids post meta as stored (serialized PHP,
+    # JSON or a comma list). subscription_relation is 'renewal' or 'parent'
+    # when WooCommerce Subscriptions links the order to subscription_id.
+    "orders": """
+        id INTEGER PRIMARY KEY,
+        status TEXT NOT NULL DEFAULT '',
+        date_created TEXT NOT NULL DEFAULT '',
+        user_id INTEGER NOT NULL DEFAULT 0,
+        billing_email TEXT NOT NULL DEFAULT '',
+        billing_first_name TEXT NOT NULL DEFAULT '',
+        billing_last_name TEXT NOT NULL DEFAULT '',
+        membership_created TEXT NOT NULL DEFAULT '',
+        membership_ids TEXT NOT NULL DEFAULT '',
+        subscription_relation TEXT NOT NULL DEFAULT '',
+        subscription_id INTEGER
+    """,
+    # Line items; is_subscription is 1 for WC_Subscriptions_Product products
+    "order_items": """
+        item_id INTEGER PRIMARY KEY,
+        order_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL DEFAULT 0,
+        name TEXT NOT NULL DEFAULT '',
+        is_subscription INTEGER NOT NULL DEFAULT 0
+    """,
+    # is_customer_note is 1 for notes with the is_customer_note comment meta
+    "order_notes": """
+        note_id INTEGER PRIMARY KEY,
+        order_id INTEGER NOT NULL,
+        date_created TEXT NOT NULL DEFAULT '',
+        content TEXT NOT NULL DEFAULT '',
+        is_customer_note INTEGER NOT NULL DEFAULT 0
+    """,
+    "options": """
+        option_name TEXT PRIMARY KEY,
+        option_value TEXT NOT NULL DEFAULT ''
+    """,
+    # WooCommerce Subscriptions export for the migration planner. Dates are
+    # WC_Subscription::get_date() values (GMT, '' or 0 when unset); order
+    # notes of a subscription live in order_notes under its ID, as in WC.
+    "wcs_subscriptions": """
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT '',
+        start_date TEXT NOT NULL DEFAULT '',
+        end_date TEXT NOT NULL DEFAULT ''
+    """,
+    # is_subscription as WC_Subscriptions_Product::is_subscription() answers
+    # for the item's product before the products are converted
+    "wcs_subscription_items": """
+        item_id INTEGER PRIMARY KEY,
+        subscription_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL DEFAULT 0,
+        is_subscription INTEGER NOT NULL DEFAULT 0
+    """,
+    # wp_users and wp_usermeta. Roles live in the <prefix>capabilities meta
+    # as a serialized array such as a:1:{s:10:"subscriber";b:1;}
+    "users": """
+        id INTEGER PRIMARY KEY,
+        user_login TEXT NOT NULL DEFAULT '',
+        user_email TEXT NOT NULL DEFAULT ''
+    """,
+    "usermeta": """
+        umeta_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        meta_key TEXT NOT NULL DEFAULT '',
+        meta_value TEXT
+    """,
+    # wp_membership_security_log as created by
+    # Membership_Security::create_security_log_table(); context is JSON
+    "security_log": """
+        id INTEGER PRIMARY KEY,
+        event TEXT NOT NULL DEFAULT '',
+        user_id INTEGER,
+        ip_address TEXT NOT NULL DEFAULT '',
+        context TEXT,
+        created_at TEXT NOT NULL DEFAULT '0000-00-00 00:00:00'
+    """,
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS membership_user ON membership_subscriptions (user_id, end_date)",
+    "CREATE INDEX IF NOT EXISTS membership_status ON membership_subscriptions (status, end_date)",
+    "CREATE INDEX IF NOT EXISTS item_order ON order_items (order_id, item_id)",
+    "CREATE INDEX IF NOT EXISTS note_order ON order_notes (order_id, date_created)",
+    "CREATE INDEX IF NOT EXISTS wcs_item_subscription ON wcs_subscription_items (subscription_id, item_id)",
+    "CREATE INDEX IF NOT EXISTS usermeta_key ON usermeta (meta_key, user_id)",
+    "CREATE INDEX IF NOT EXISTS security_created ON security_log (created_at)",
+]
+
+# Values of a serialized PHP array: a:2:{i:0;i:12;i:1;s:2:"34";}
+PHP_SCALAR = re.compile(r'(?:i|d|b):(-?[\d.]+);|s:(\d+):"')
+
+def php_items(value):
+    """Keys and values of a flat PHP-serialized array, alternating: [key, value, key, value, ...]"""
+    items = []
+    position = value.find("{") + 1
+    while True:
+        match = PHP_SCALAR.match(value, position)
+        if not match:
+            break
+        if match.group(2) is not None:
+            start = match.end()
+            # s:N: counts bytes, not characters
+            raw = value[start:].encode("utf-8")[:int(match.group(2))].decode("utf-8", "replace")
+            items.append(raw)
+            position = start + len(raw) + 2
+        else:
+            items.append(match.group(1))
+            position = match.end()
+    return items
+
+def php_list(value):
+    """List of strings from a PHP-serialized array, a JSON list or a comma separated value
+
+    Mirrors (array) get_option()/get_post_meta(): a scalar becomes a
+    one-element list, an empty string an empty list.
+    """
+    if value is None:
+        return []
+    value = str(value).strip()
+    if not value:
+        return []
+    if value.startswith("a:"):
+        return php_items(value)[1::2]
+    if value.startswith("["):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def php_empty(value):
+    """PHP empty() of a meta or option value as stored"""
+    return value is None or str(value).strip() in ("", "0") or not php_list(value)
+
+def php_empty_sql(column):
+    """SQL for php_empty(column); serialized arrays are decided by their count, other lists call into Python"""
+    value = f"trim({column})"
+    return (f"(CASE WHEN {column} IS NULL OR {value} IN ('', '0') THEN 1"
+            f" WHEN {value} GLOB 'a:[0-9]*:{{*' THEN {value} GLOB 'a:0:*'"
+            f" WHEN {value} GLOB '[[]*' OR {value} GLOB '*,*' THEN php_empty({column})"
+            f" ELSE 0 END)")
+
+COLUMN_DEFAULT = re.compile(r"DEFAULT ('[^']*'|-?\d+)")
+
+def blank_values(table):
+    """{column: SQL an empty CSV cell stands for}: NULL, or the column default when NOT NULL"""
+    blanks = {}
+    for line in SCHEMA[table].strip().splitlines():
+        name = line.split()[0]
+        default = COLUMN_DEFAULT.search(line)
+        if "NOT NULL" not in line or "PRIMARY KEY" in line:
+            blanks[name] = "NULL"
+        else:
+            blanks[name] = default.group(1) if default else "''"
+    return blanks
+
+def _load_csv(connection, table, path):
+    """Bulk insert a CSV file; rows go from the csv module to SQLite without a Python loop"""
+    blanks = blank_values(table)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        wanted = [(index, name) for index, name in enumerate(header) if name in blanks]
+        if not wanted:
+            return 0
+        values = [f"COALESCE(NULLIF(?, ''), {blanks[name]})" for _, name in wanted]
+        sql = f"INSERT INTO {table} ({', '.join(name for _, name in wanted)}) VALUES ({', '.join(values)})"
+        rows = reader if len(wanted) == len(header) else map(itemgetter(*(index for index, _ in wanted)), reader)
+        if len(wanted) == 1 and rows is not reader:
+            rows = ((value,) for value in rows)
+        before = connection.total_changes
+        connection.executemany(sql, rows)
+        return connection.total_changes - before
+
+def create_schema(connection):
+    for table, columns in SCHEMA.items():
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        # Snapshots written before a column was added get it with its default
+        present = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        for line in columns.strip().splitlines():
+            if line.split()[0] not in present:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {line.strip().rstrip(',')}")
+
+def open_snapshot(source):
+    """In-memory SQLite connection holding the snapshot at `source`
+
+    A SQLite file is copied into memory so nothing is written back to it;
+    a directory is read as CSV files. Tables the source lacks are created
+    empty, and the lookup indexes are added.
+    """
+    connection = sqlite3.connect(":memory:")
+    if os.path.isdir(source):
+        create_schema(connection)
+        with connection:
+            for table in SCHEMA:
+                path = os.path.join(source, f"{table}.csv")
+                if os.path.exists(path):
+                    _load_csv(connection, table, path)
+    elif os.path.exists(source):
+        disk = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            disk.backup(connection)
+        finally:
+            disk.close()
+        create_schema(connection)
+    else:
+        raise FileNotFoundError(source)
+    for statement in INDEXES:
+        connection.execute(statement)
+    connection.create_function("php_list_json", 1, lambda value: json.dumps(php_list(value)), deterministic=True)
+    connection.create_function("php_empty", 1, php_empty, deterministic=True)
+    return connection
+
+def get_option(connection, name, default=None):
+    row = connection.execute("SELECT option_value FROM options WHERE option_name = ?", (name,)).fetchone()
+    return row[0] if row else default
+
+def product_ids(connection, name):
+    """Integer product IDs stored in a list option such as membership_automatic_renewal_products"""
+    return [int(float(value)) for value in php_list(get_option(connection, name, "")) if value.strip()]
+
+def load_membership_products(connection, automatic=None, manual=None):
+    """Fill the membership_products temp table; options from the snapshot unless given"""
+    if automatic is None:
+        automatic = product_ids(connection, "membership_automatic_renewal_products")
+    if manual is None:
+        manual = product_ids(connection, "membership_manual_renewal_products")
+    connection.execute("CREATE TEMP TABLE membership_products (product_id INTEGER PRIMARY KEY, automatic INTEGER)")
+    # in_array() on the automatic list wins when a product is in both
+    connection.executemany("INSERT OR IGNORE INTO membership_products VALUES (?, 1)", [(p,) for p in automatic])
+    connection.executemany("INSERT OR IGNORE INTO membership_products VALUES (?, 0)", [(p,) for p in manual])
+    return automatic, manual
+
+def sql_literal(value):
+    """MySQL literal for a value in generated SQL"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r").replace("\0", "\\0")
+    return f"'{escaped}'"
+
+def insert_statements(table, columns, rows, chunk_size=1000):
+    """Multi-row INSERT statements with at most chunk_size rows each"""
+    head = f"INSERT INTO `{table}` ({', '.join(f'`{column}`' for column in columns)}) VALUES\n"
+    chunk = []
+    for row in rows:
+        chunk.append("(" + ", ".join(sql_literal(value) for value in row) + ")")
+        if len(chunk) >= chunk_size:
+            yield head + ",\n".join(chunk) + ";\n"
+            chunk = []
+    if chunk:
+        yield head + ",\n".join(chunk) + ";\n"
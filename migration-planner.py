@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Offline migrationsplan for WooCommerce Subscriptions
+Anvender Membership_Manager::migrate_woocommerce_subscription() reglerne på en eksport af abonnementer,
+linjer og ordrenoter i ét samlet SQL-gennemløb og skriver bulk-INSERTs til wp_membership_subscriptions
+"""
+
+import argparse
+import csv
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from membership_snapshot import insert_statements, open_snapshot
+
+ZERO_DATE = "0000-00-00 00:00:00"
+COLUMNS = ["user_id", "start_date", "end_date", "status", "renewal_type", "paused_date", "status_changed_date"]
+
+# Each step is one statement over the whole export; together they replace
+# the per-subscription loop in migrate_woocommerce_subscription().
+PLAN = """
+-- The first line item with a selected product decides the renewal type
+-- (get_items() is in item ID order, the loop breaks on the first hit)
+CREATE TEMP TABLE first_selected AS
+SELECT subscription_id, MIN(item_id) AS item_id, is_subscription
+FROM wcs_subscription_items
+WHERE product_id IN (SELECT product_id FROM selected_products)
+GROUP BY subscription_id;
+
+-- parse_subscription_status_dates(): the newest matching internal note
+-- wins, so the date is the maximum over the matching notes. 'status set
+-- to on-hold' is already covered by 'to on-hold'.
+CREATE TEMP TABLE status_dates AS
+SELECT n.order_id AS subscription_id,
+       MAX(CASE WHEN s.status = 'on-hold' AND (instr(lower(n.content), 'to on-hold')
+                                               OR instr(lower(n.content), 'to on hold'))
+                THEN n.date_created END) AS paused_date,
+       MAX(CASE WHEN instr(lower(n.content), 'status changed') OR instr(lower(n.content), 'status set to')
+                THEN n.date_created END) AS status_changed_date
+FROM order_notes n
+JOIN first_selected f ON f.subscription_id = n.order_id
+JOIN subscriptions s ON s.id = n.order_id
+WHERE NOT n.is_customer_note
+GROUP BY n.order_id;
+
+-- Duplicate rule: a user who already has a membership row is skipped,
+-- and within the run only the first subscription per user is inserted.
+-- wcs_get_subscriptions() returns them by start_date, newest first.
+CREATE TEMP TABLE plan AS
+SELECT s.id AS subscription_id, s.user_id, s.status,
+       COALESCE(s.start_date, :zero_date) AS start_date,
+       COALESCE(s.end_date, datetime(COALESCE(s.start_date, :now), '+1 years')) AS end_date,
+       s.end_date IS NULL AS generated_end,
+       s.start_date IS NULL AS missing_start,
+       CASE WHEN f.is_subscription THEN 'automatic' ELSE 'manual' END AS renewal_type,
+       d.paused_date, d.status_changed_date,
+       CASE WHEN f.subscription_id IS NULL THEN 'not_selected'
+            WHEN EXISTS (SELECT 1 FROM membership_subscriptions m WHERE m.user_id = s.user_id) THEN 'exists'
+            WHEN ROW_NUMBER() OVER (PARTITION BY s.user_id, f.subscription_id IS NULL
+                                    ORDER BY s.start_date IS NULL, s.start_date DESC, s.id DESC) > 1 THEN 'duplicate'
+            ELSE 'migrate' END AS action
+FROM subscriptions s
+LEFT JOIN first_selected f ON f.subscription_id = s.id
+LEFT JOIN status_dates d ON d.subscription_id = s.id
+"""
+
+# get_status() drops the wc- prefix; get_date() gives 0 or '' when unset
+SUBSCRIPTIONS = """
+CREATE TEMP TABLE subscriptions AS
+SELECT id, user_id,
+       CASE WHEN status LIKE 'wc-%' THEN substr(status, 4) ELSE status END AS status,
+       NULLIF(NULLIF(trim(start_date), ''), '0') AS start_date,
+       NULLIF(NULLIF(NULLIF(trim(end_date), ''), '0'), :zero_date) AS end_date
+FROM wcs_subscriptions
+"""
+
+def build_plan(connection, products, now=None):
+    """Create the temp table `plan` with one row and an action per exported subscription"""
+    now = now or datetime.utcnow()
+    params = {"zero_date": ZERO_DATE, "now": now.strftime("%Y-%m-%d %H:%M:%S")}
+    for name in ("plan", "status_dates", "first_selected", "subscriptions", "selected_products"):
+        connection.execute(f"DROP TABLE IF EXISTS temp.{name}")
+    connection.execute("CREATE TEMP TABLE selected_products (product_id INTEGER PRIMARY KEY)")
+    connection.executemany("INSERT OR IGNORE INTO selected_products VALUES (?)", ((product,) for product in products))
+    for statement in [SUBSCRIPTIONS] + PLAN.split(";\n\n"):
+        connection.execute(statement, params)
+
+def plan_rows(connection):
+    return connection.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM plan WHERE action = 'migrate' ORDER BY start_date DESC, subscription_id DESC")
+
+def write_sql(stream, connection, table, chunk_size, products):
+    count = connection.execute("SELECT COUNT(*) FROM plan WHERE action = 'migrate'").fetchone()[0]
+    stream.write(f"-- Membership Manager: migration af {count} WooCommerce abonnementer\n")
+    stream.write(f"-- Produkter: {', '.join(str(product) for product in products)}\n")
+    stream.write(f"-- Genereret {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC; kør mod samme databasetilstand som eksporten\n")
+    stream.write("START TRANSACTION;\n")
+    for statement in insert_statements(table, COLUMNS, plan_rows(connection), chunk_size):
+        stream.write(statement)
+    stream.write("COMMIT;\n")
+    return count
+
+def write_plan_csv(path, connection):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        cursor = connection.execute(
+            "SELECT subscription_id, user_id, action, status, renewal_type, start_date, end_date, generated_end, "
+            "paused_date, status_changed_date FROM plan ORDER BY subscription_id")
+        writer.writerow([column[0] for column in cursor.description])
+        writer.writerows(cursor)
+
+def print_report(connection):
+    actions = Counter(dict(connection.execute("SELECT action, COUNT(*) FROM plan GROUP BY action")))
+    print(f"\n{'='*60}\n📊 Migrationsplan (tørkørsel)\n{'='*60}")
+    print(f"   Abonnementer i eksporten: {sum(actions.values())}")
+    print(f"   Migreres: {actions['migrate']}")
+    print(f"   Springes over (ingen valgte produkter): {actions['not_selected']}")
+    print(f"   Findes allerede for brugeren: {actions['exists']}")
+    print(f"   Nyere abonnement for samme bruger i eksporten: {actions['duplicate']}")
+
+    rows = connection.execute(
+        "SELECT status, renewal_type, COUNT(*) FROM plan WHERE action = 'migrate' "
+        "GROUP BY status, renewal_type ORDER BY COUNT(*) DESC").fetchall()
+    if rows:
+        print(f"\n{'status':<18}{'fornyelse':<12}{'antal':>8}")
+        for status, renewal_type, count in rows:
+            print(f"{status:<18}{renewal_type:<12}{count:>8}")
+
+    generated, missing_start, paused, changed = connection.execute(
+        "SELECT SUM(generated_end), SUM(missing_start), COUNT(paused_date), COUNT(status_changed_date) "
+        "FROM plan WHERE action = 'migrate'").fetchone()
+    print(f"\n   Slutdato genereret (startdato + 1 år): {generated or 0}")
+    print(f"   Med datoer fra ordrenoter: {paused} paused_date, {changed} status_changed_date")
+    if missing_start:
+        print(f"   ⚠ {missing_start} abonnementer uden startdato indsættes med {ZERO_DATE}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Planlæg migration fra WooCommerce Subscriptions som bulk-INSERTs.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med wcs_subscriptions.csv, wcs_subscription_items.csv, "
+                                         "order_notes.csv og membership_subscriptions.csv")
+    parser.add_argument("--products", required=True, help="Kommasepareret liste af valgte produkt-ID'er")
+    parser.add_argument("--output", help="Skriv SQL hertil (standard: kun rapport)")
+    parser.add_argument("--prefix", default="wp_", help="WordPress tabelpræfiks")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rækker pr. INSERT")
+    parser.add_argument("--plan-csv", help="Skriv handlingen for hvert abonnement som CSV")
+    args = parser.parse_args(argv)
+
+    try:
+        products = [int(value) for value in args.products.split(",") if value.strip()]
+    except ValueError:
+        parser.error("--products skal være heltal adskilt af komma")
+    if not products:
+        parser.error("Vælg mindst ét produkt at migrere")
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    build_plan(connection, products)
+    print_report(connection)
+
+    if args.plan_csv:
+        write_plan_csv(args.plan_csv, connection)
+        print(f"\n📄 Plan skrevet til {args.plan_csv}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            count = write_sql(f, connection, f"{args.prefix}membership_subscriptions", args.chunk_size, products)
+        statements = -(-count // args.chunk_size)
+        print(f"\n📄 {count} rækker i {statements} INSERT-sætninger skrevet til {args.output}")
+    print(f"\n✅ Planlagt på {time.perf_counter() - started:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
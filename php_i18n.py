@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Fælles gettext-værktøjer til Membership Manager
+Tokenizer til PHP-strenge, udtræk af oversættelige kald og skrivning af .po/.pot-filer
+"""
+
+import os
+import re
+import struct
+
+TEXT_DOMAIN = "membership-manager"
+
+# Argument layout of the WordPress i18n functions (same keywords as wp-cli i18n)
+KEYWORDS = {
+    "__": ("msgid", "domain"),
+    "_e": ("msgid", "domain"),
+    "esc_html__": ("msgid", "domain"),
+    "esc_html_e": ("msgid", "domain"),
+    "esc_attr__": ("msgid", "domain"),
+    "esc_attr_e": ("msgid", "domain"),
+    "_x": ("msgid", "msgctxt", "domain"),
+    "_ex": ("msgid", "msgctxt", "domain"),
+    "esc_html_x": ("msgid", "msgctxt", "domain"),
+    "esc_attr_x": ("msgid", "msgctxt", "domain"),
+    "_n": ("msgid", "msgid_plural", None, "domain"),
+    "_n_noop": ("msgid", "msgid_plural", "domain"),
+    "_nx": ("msgid", "msgid_plural", None, "msgctxt", "domain"),
+    "_nx_noop": ("msgid", "msgid_plural", "msgctxt", "domain"),
+}
+
+OPEN_TAG = re.compile(r"<\?(?:php\b|=)?", re.I)
+
+TOKEN = re.compile(r"""
+    (?P<close>\?>)
+  | (?P<comment>//.*?(?=\?>|\n|$)|\#(?!\[).*?(?=\?>|\n|$)|/\*.*?(?:\*/|\Z))
+  | (?P<sq>'(?:[^'\\]|\\.)*')
+  | (?P<dq>"(?:[^"\\]|\\.)*")
+  | (?P<heredoc><<<[ \t]*(?P<hq>['"]?)(?P<hid>[A-Za-z_]\w*)(?P=hq)\r?\n.*?^[ \t]*(?P=hid)\b)
+  | (?P<name>[A-Za-z_\x80-\uffff][\w\x80-\uffff]*)
+  | (?P<arrow>->|\?->|::)
+  | (?P<punct>[(),]|\.(?![.=\d]))
+  | (?P<other>\S)
+""", re.S | re.X | re.M)
+
+DQ_ESCAPE = re.compile(rb"""
+    \\(?P<simple>[nrtvef\\$"])
+  | \\(?P<oct>[0-7]{1,3})
+  | \\x(?P<hex>[0-9A-Fa-f]{1,2})
+  | \\u\{(?P<uni>[0-9A-Fa-f]+)\}
+  | (?P<var>\$(?=[A-Za-z_\x80-\xff{]))
+""", re.X)
+
+SIMPLE_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"v": b"\v", b"e": b"\x1b",
+                  b"f": b"\f", b"\\": b"\\", b"$": b"$", b'"': b'"'}
+
+PRINTF_PLACEHOLDER = re.compile(r"%(?:\d+\$)?[-+ 0#']*\d*(?:\.\d+)?[bcdeEfFgGosuxX]")
+
+class Interpolated(Exception):
+    """Raised for double-quoted strings that interpolate variables"""
+
+def decode_single_quoted(token):
+    """Value of a single-quoted PHP literal, quotes included in `token`"""
+    body = token[1:-1]
+    if "\\" not in body:
+        return body
+    return re.sub(r"\\([\\'])", r"\1", body)
+
+def decode_double_quoted(token):
+    """Value of a double-quoted PHP literal; raises Interpolated for "$var" strings"""
+    body = token[1:-1]
+    if "\\" not in body and "$" not in body:
+        return body
+
+    def replace(match):
+        if match.group("var"):
+            raise Interpolated(token)
+        if match.group("simple"):
+            return SIMPLE_ESCAPES[match.group("simple")]
+        if match.group("oct"):
+            return bytes([int(match.group("oct"), 8) & 0xFF])
+        if match.group("hex"):
+            return bytes([int(match.group("hex"), 16)])
+        return chr(int(match.group("uni"), 16)).encode("utf-8")
+
+    raw = DQ_ESCAPE.sub(replace, body.encode("utf-8"))
+    return raw.decode("utf-8", errors="surrogateescape")
+
+def tokenize(content):
+    """Yield (kind, text, line) for the PHP parts of a file
+
+    Inline HTML outside <?php ... ?> is skipped. Whitespace is dropped and
+    every other character becomes an "other" token, so callers can tell a
+    plain literal argument from an expression.
+    """
+    pos = 0
+    line = 1
+    length = len(content)
+    while pos < length:
+        opening = OPEN_TAG.search(content, pos)
+        if not opening:
+            return
+        line += content.count("\n", pos, opening.end())
+        pos = opening.end()
+        while True:
+            match = TOKEN.search(content, pos)
+            if not match:
+                return
+            kind = match.lastgroup
+            if kind in ("hq", "hid"):
+                kind = "heredoc"
+            start = match.start()
+            line += content.count("\n", pos, start)
+            text = match.group(kind)
+            yield kind, text, line
+            line += text.count("\n")
+            pos = match.end()
+            if kind == "close":
+                break
+
+def literal_value(tokens):
+    """Value of an argument made only of concatenated literals, else None"""
+    if not tokens or len(tokens) % 2 == 0:
+        return None
+    parts = []
+    for i, (kind, text, _) in enumerate(tokens):
+        if i % 2:
+            if text != ".":
+                return None
+        elif kind == "sq":
+            parts.append(decode_single_quoted(text))
+        elif kind == "dq":
+            try:
+                parts.append(decode_double_quoted(text))
+            except Interpolated:
+                return None
+        else:
+            return None
+    return "".join(parts)
+
+def read_arguments(tokens):
+    """Consume tokens up to the closing parenthesis of a call
+
+    Call this right after the opening "(" has been read. Returns one token
+    list per top-level argument.
+    """
+    args = [[]]
+    depth = 1
+    for kind, text, line in tokens:
+        if kind == "punct" and text in "()":
+            depth += 1 if text == "(" else -1
+            if depth == 0:
+                break
+        elif kind == "punct" and text == "," and depth == 1:
+            args.append([])
+            continue
+        elif kind == "close":
+            break
+        args[-1].append((kind, text, line))
+    return args
+
+def extract_calls(content, domain=TEXT_DOMAIN):
+    """Yield dicts describing every i18n call with literal arguments in PHP source
+
+    Each dict has msgid, line and, where present, msgid_plural, msgctxt and
+    comment (a preceding "translators:" comment). Calls for other text
+    domains, or with non-literal arguments, are skipped.
+    """
+    tokens = tokenize(content)
+    previous = None
+    translator_comment = None
+
+    for kind, text, line in tokens:
+        if kind == "comment":
+            cleaned = clean_comment(text)
+            if cleaned.lower().startswith("translators:"):
+                translator_comment = (cleaned, line + text.count("\n"))
+            continue
+
+        if kind != "name" or text not in KEYWORDS or previous in ("arrow", "function"):
+            previous = "function" if kind == "name" and text.lower() == "function" else kind
+            continue
+
+        function = text
+        kind, text, _ = next(tokens, (None, None, None))
+        previous = kind
+        if text != "(":
+            continue
+
+        args = read_arguments(tokens)
+        previous = "punct"
+
+        call = {"line": line}
+        for field, arg in zip(KEYWORDS[function], args):
+            if field is None:
+                continue
+            value = literal_value(arg)
+            if value is None:
+                break
+            call[field] = value
+        else:
+            if call.get("domain") != domain or not call.get("msgid"):
+                continue
+            del call["domain"]
+            if translator_comment and line - translator_comment[1] <= 1:
+                call["comment"] = translator_comment[0]
+            translator_comment = None
+            yield call
+
+def clean_comment(text):
+    """Strip comment markers and leading asterisks from a PHP comment"""
+    if text.startswith("/*"):
+        text = text[2:-2] if text.endswith("*/") else text[2:]
+        lines = [re.sub(r"^\s*\*?\s?", "", part) for part in text.splitlines()]
+        return " ".join(part.strip() for part in lines if part.strip())
+    return text.lstrip("/#").strip()
+
+def find_php_files(paths):
+    """Sorted PHP files under the given files and directories"""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith(".php"):
+                    found.append(os.path.join(root, file))
+    return found
+
+def collect_messages(paths, base_dir, domain=TEXT_DOMAIN):
+    """Merge the i18n calls of all PHP files into catalogue entries
+
+    Returns a dict keyed on (msgctxt, msgid) in order of first appearance.
+    Each entry holds msgid, msgctxt, msgid_plural, references, comments and
+    flags, ready for write_po().
+    """
+    messages = {}
+    for filepath in find_php_files(paths):
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        reference = os.path.relpath(filepath, base_dir).replace(os.sep, "/")
+        for call in extract_calls(content, domain):
+            key = (call.get("msgctxt"), call["msgid"])
+            entry = messages.get(key)
+            if entry is None:
+                entry = messages[key] = {
+                    "msgid": call["msgid"],
+                    "msgctxt": call.get("msgctxt"),
+                    "msgid_plural": call.get("msgid_plural"),
+                    "references": [],
+                    "comments": [],
+                    "flags": [],
+                }
+            elif not entry["msgid_plural"] and call.get("msgid_plural"):
+                entry["msgid_plural"] = call["msgid_plural"]
+            entry["references"].append(f"{reference}:{call['line']}")
+            if call.get("comment") and call["comment"] not in entry["comments"]:
+                entry["comments"].append(call["comment"])
+            if "php-format" not in entry["flags"] and (
+                PRINTF_PLACEHOLDER.search(entry["msgid"])
+                or PRINTF_PLACEHOLDER.search(entry["msgid_plural"] or "")
+            ):
+                entry["flags"].append("php-format")
+    return messages
+
+def po_quote(value):
+    """Quote a string for a .po file, splitting multi-line values"""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"')
+               .replace("\t", "\\t").replace("\r", "\\r"))
+    lines = escaped.split("\n")
+    if len(lines) == 1:
+        return f'"{escaped}"'
+    parts = [line + "\\n" for line in lines[:-1]]
+    if lines[-1]:
+        parts.append(lines[-1])
+    return '""\n' + "\n".join(f'"{part}"' for part in parts)
+
+def format_header(fields):
+    """The msgstr of the empty msgid, from an ordered list of (name, value)"""
+    return "".join(f"{name}: {value}\n" for name, value in fields)
+
+def write_po(stream, header_fields, messages, translations=None, header_comments=()):
+    """Write a .po/.pot catalogue
+
+    `translations` maps (msgctxt, msgid) to a msgstr string, or to a list of
+    plural forms; when omitted every msgstr is left empty (a template).
+    """
+    for comment in header_comments:
+        stream.write(f"# {comment}\n")
+    stream.write('msgid ""\n')
+    stream.write(f"msgstr {po_quote(format_header(header_fields))}\n")
+
+    for key, entry in messages.items():
+        stream.write("\n")
+        for comment in entry.get("comments", ()):
+            stream.write(f"#. {comment}\n")
+        for reference in entry.get("references", ()):
+            stream.write(f"#: {reference}\n")
+        if entry.get("flags"):
+            stream.write(f"#, {', '.join(entry['flags'])}\n")
+        if entry.get("msgctxt") is not None:
+            stream.write(f"msgctxt {po_quote(entry['msgctxt'])}\n")
+        stream.write(f"msgid {po_quote(entry['msgid'])}\n")
+        translated = (translations or {}).get(key)
+        if entry.get("msgid_plural"):
+            stream.write(f"msgid_plural {po_quote(entry['msgid_plural'])}\n")
+            forms = translated if isinstance(translated, list) else [translated or "", ""]
+            for i, form in enumerate(forms):
+                stream.write(f"msgstr[{i}] {po_quote(form or '')}\n")
+        else:
+            stream.write(f"msgstr {po_quote(translated or '')}\n")
+
+def read_plugin_headers(filepath):
+    """Parse the "Name: value" header block of the main plugin file"""
+    headers = {}
+    with open(filepath, "r", encoding="utf-8") as f:
+        head = f.read(8192)
+    for match in re.finditer(r"^[ \t/*#@]*([A-Za-z][A-Za-z ]*?):[ \t]*(.+?)\s*$", head, re.M):
+        headers.setdefault(match.group(1).strip(), match.group(2).strip())
+    return headers
+
+PO_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", '"': '"', "a": "\a", "b": "\b", "f": "\f", "v": "\v"}
+
+def po_unquote(text):
+    """Value of one quoted .po string line"""
+    text = text.strip()
+    if len(text) < 2 or text[0] != '"' or text[-1] != '"':
+        raise ValueError(f"Ugyldig .po-streng: {text}")
+    return re.sub(r'\\(.)', lambda m: PO_ESCAPES.get(m.group(1), "\\" + m.group(1)), text[1:-1])
+
+def read_po(filepath):
+    """Parse a .po file into (header_fields, messages, translations)
+
+    `messages` and `translations` use the same shapes as write_po(), so a
+    catalogue can be read, changed and written back. Obsolete (#~) entries
+    are dropped; fuzzy entries keep their "fuzzy" flag.
+    """
+    messages = {}
+    translations = {}
+    header = None
+
+    entry = None
+    field = None
+
+    def finish():
+        nonlocal header
+        if entry is None or "msgid" not in entry:
+            return
+        key = (entry.get("msgctxt"), entry["msgid"])
+        if key == (None, ""):
+            header = entry.get("msgstr", "")
+            return
+        forms = entry.get("msgstr[]")
+        translations[key] = [forms[i] for i in sorted(forms)] if forms else entry.get("msgstr", "")
+        messages[key] = {
+            "msgid": entry["msgid"],
+            "msgctxt": entry.get("msgctxt"),
+            "msgid_plural": entry.get("msgid_plural"),
+            "references": entry["references"],
+            "comments": entry["comments"],
+            "flags": entry["flags"],
+        }
+
+    def new_entry():
+        return {"references": [], "comments": [], "flags": []}
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        for raw_line in f:
+            line = raw_line.strip()
+            if not line or line.startswith("#~"):
+                continue
+            if line.startswith("#"):
+                if entry is not None and "msgid" in entry and field != "comment":
+                    finish()
+                    entry = None
+                if entry is None:
+                    entry = new_entry()
+                field = "comment"
+                if line.startswith("#:"):
+                    entry["references"].extend(line[2:].split())
+                elif line.startswith("#."):
+                    entry["comments"].append(line[2:].strip())
+                elif line.startswith("#,"):
+                    entry["flags"].extend(flag.strip() for flag in line[2:].split(",") if flag.strip())
+                continue
+            if line.startswith('"'):
+                value = po_unquote(line)
+                if isinstance(field, tuple):
+                    entry["msgstr[]"][field[1]] += value
+                else:
+                    entry[field] += value
+                continue
+
+            keyword, _, rest = line.partition(" ")
+            if keyword in ("msgctxt", "msgid") and entry is not None and "msgid" in entry:
+                finish()
+                entry = None
+            if entry is None:
+                entry = new_entry()
+            plural = re.match(r"msgstr\[(\d+)\]$", keyword)
+            if plural:
+                field = ("msgstr[]", int(plural.group(1)))
+                entry.setdefault("msgstr[]", {})[field[1]] = po_unquote(rest)
+            elif keyword in ("msgctxt", "msgid", "msgid_plural", "msgstr"):
+                field = keyword
+                entry[field] = po_unquote(rest)
+            else:
+                raise ValueError(f"{filepath}: ukendt linje: {raw_line.rstrip()}")
+    finish()
+
+    header_fields = []
+    for header_line in (header or "").split("\n"):
+        name, sep, value = header_line.partition(":")
+        if sep:
+            header_fields.append((name.strip(), value.strip()))
+    return header_fields, messages, translations
+
+def compiled_entries(messages, translations):
+    """Sorted (original, translation) byte pairs as stored in a .mo file
+
+    Context and plural forms are encoded the gettext way: "ctxt\\x04msgid"
+    and NUL-separated plural strings. Untranslated and fuzzy entries are left
+    out, like msgfmt does.
+    """
+    pairs = []
+    for key, entry in messages.items():
+        translated = translations.get(key)
+        if not translated or "fuzzy" in entry.get("flags", ()):
+            continue
+        original = entry["msgid"]
+        if entry.get("msgid_plural"):
+            original += "\0" + entry["msgid_plural"]
+            if not isinstance(translated, list):
+                translated = [translated]
+            if not any(translated):
+                continue
+            translated = "\0".join(translated)
+        elif isinstance(translated, list):
+            translated = translated[0]
+        if entry.get("msgctxt") is not None:
+            original = entry["msgctxt"] + "\x04" + original
+        pairs.append((original.encode("utf-8"), translated.encode("utf-8")))
+    pairs.sort()
+    return pairs
+
+def gettext_hash(data):
+    """hashpjw as used for the .mo hash table (gettext's hash_string)"""
+    value = 0
+    for byte in data:
+        value = ((value << 4) + byte) & 0xFFFFFFFF
+        high = value & 0xF0000000
+        if high:
+            value ^= high >> 24
+            value ^= high
+    return value
+
+def _next_prime(number):
+    number |= 1
+    while any(number % d == 0 for d in range(3, int(number ** 0.5) + 1, 2)):
+        number += 2
+    return number
+
+def build_mo(header_fields, messages, translations):
+    """Compile a catalogue into .mo bytes, including the GNU hash table"""
+    pairs = compiled_entries(messages, translations)
+    pairs.insert(0, (b"", format_header(header_fields).encode("utf-8")))
+    count = len(pairs)
+    hash_size = max(3, _next_prime(count * 4 // 3))
+
+    originals_offset = 28
+    translations_offset = originals_offset + count * 8
+    hash_offset = translations_offset + count * 8
+    data_offset = hash_offset + hash_size * 4
+
+    hash_table = [0] * hash_size
+    for index, (original, _) in enumerate(pairs):
+        # GNU hash_string() stops at the NUL, so plurals hash on msgid alone
+        hash_value = gettext_hash(original.split(b"\0", 1)[0])
+        slot = hash_value % hash_size
+        if hash_table[slot]:
+            increment = 1 + (hash_value % (hash_size - 2))
+            while hash_table[slot]:
+                slot = slot - (hash_size - increment) if slot >= hash_size - increment else slot + increment
+        hash_table[slot] = index + 1
+
+    original_table = []
+    translation_table = []
+    blob = bytearray()
+    for original, _ in pairs:
+        original_table += [len(original), data_offset + len(blob)]
+        blob += original + b"\0"
+    for _, translated in pairs:
+        translation_table += [len(translated), data_offset + len(blob)]
+        blob += translated + b"\0"
+
+    header = struct.pack("<7I", 0x950412DE, 0, count, originals_offset,
+                         translations_offset, hash_size, hash_offset)
+    return (header
+            + struct.pack(f"<{count * 2}I", *original_table)
+            + struct.pack(f"<{count * 2}I", *translation_table)
+            + struct.pack(f"<{hash_size}I", *hash_table)
+            + bytes(blob))
+
+def _php_string(value):
+    """PHP literal for a string, like var_export() writes it"""
+    quoted = "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return quoted.replace("\0", "' . \"\\0\" . '")
+
+def build_l10n_php(header_fields, messages, translations):
+    """Catalogue as a .l10n.php file, the format WordPress 6.5+ loads without parsing"""
+    entries = []
+    for original, translated in compiled_entries(messages, translations):
+        singular = original.decode("utf-8").split("\0")[0]
+        entries.append(f"{_php_string(singular)}=>{_php_string(translated.decode('utf-8'))}")
+    headers = [f"{_php_string(name.lower())}=>{_php_string(value)}" for name, value in header_fields]
+    body = ",".join(headers + [f"'messages'=>[{','.join(entries)}]"])
+    return f"<?php\nreturn [{body}];\n"
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Simulering af rate limiting for filter_memberships
+Afspiller request-spor mod en model af Membership_Security::check_rate_limit() og mod alternative algoritmer
+(token bucket, sliding-window log, shardede tællere) og måler lageroperationer, nøgler, falske 429 og tabte tællinger
+"""
+
+import argparse
+import csv
+import heapq
+import random
+import re
+import sys
+import time
+from collections import defaultdict, deque, namedtuple
+from datetime import datetime, timezone
+
+from membership_log import LOG_DIR, log_files, parse_timestamp, scan_files
+
+PERIOD = 3600
+DEFAULT_LIMIT = 100
+ADMIN_LIMIT = 500
+PREFIX = "membership_rate_limit_filter_memberships"
+GC_INTERVAL = 86400
+
+# Membership_Security::check_rate_limit() logs each rejected request
+RATE_LIMITED = re.compile(rb'^Rate limit exceeded for action "([^"]*)" by (?:user|IP) \S+ \(user: (\d+), IP: ([^)]*)\)')
+
+Request = namedtuple("Request", "time ip user_id limit")
+
+def dimensions(request):
+    """(key, kind) pairs in the order check_rate_limit() checks them"""
+    keys = []
+    if request.ip and request.ip != "0.0.0.0":
+        keys.append((f"{PREFIX}_ip_{request.ip}", "ip"))
+    if request.user_id:
+        keys.append((f"{PREFIX}_user_{request.user_id}", "user"))
+    return keys
+
+class Store:
+    """Transient storage that counts the queries WordPress would run
+
+    With the 'options' backend (no persistent object cache) a transient is
+    two wp_options rows: get_transient() reads the timeout and the value
+    and deletes both when expired; set_transient() adds both rows, or
+    updates them, skipping the timeout when it did not change within the
+    same second. With 'object-cache' every get and set is one operation.
+    Expired rows stay in wp_options until read or until the daily
+    delete_expired_transients() run.
+    """
+
+    def __init__(self, backend="options"):
+        self.backend = backend
+        self.data = {}
+        self.versions = defaultdict(int)
+        self.expiry = []
+        self.reads = 0
+        self.writes = 0
+        self.live = 0
+        self.peak_keys = 0
+        self.peak_rows = 0
+        self.next_gc = None
+
+    def get(self, key, now):
+        """(value or None, version) as seen by a request reading at `now`"""
+        entry = self.data.get(key)
+        self.reads += 1
+        if entry is not None and entry[1] <= now:
+            if self.backend == "options":
+                self.writes += 2
+            del self.data[key]
+            entry = None
+        elif self.backend == "options":
+            self.reads += 1
+        return (entry[0] if entry else None), self.versions[key]
+
+    def set(self, key, value, ttl, now, version):
+        """Write a value read at `version`; True when another request wrote the key in between"""
+        lost = self.versions[key] != version
+        entry = self.data.get(key)
+        timeout = int(now) + ttl
+        if self.backend == "options":
+            self.writes += 2 if entry is None or entry[2] != timeout else 1
+        else:
+            self.writes += 1
+        if entry is None or entry[1] <= now:
+            self.live += 1
+            self.peak_keys = max(self.peak_keys, self.live)
+        self.data[key] = (value, now + ttl, timeout)
+        self.versions[key] += 1
+        heapq.heappush(self.expiry, (now + ttl, key))
+        self.peak_rows = max(self.peak_rows, len(self.data) * (2 if self.backend == "options" else 1))
+        return lost
+
+    def advance(self, now):
+        """Expire keys up to `now` and run the transient garbage collection"""
+        while self.expiry and self.expiry[0][0] <= now:
+            expires, key = heapq.heappop(self.expiry)
+            entry = self.data.get(key)
+            if entry is not None and entry[1] == expires:
+                self.live -= 1
+                if self.backend != "options":
+                    del self.data[key]
+        if self.backend == "options":
+            if self.next_gc is None:
+                self.next_gc = now + GC_INTERVAL
+            elif now >= self.next_gc:
+                self.data = {key: entry for key, entry in self.data.items() if entry[1] > now}
+                self.next_gc = now + GC_INTERVAL
+
+class CurrentLimiter:
+    """check_rate_limit() as written
+
+    Each dimension is read and written in turn, so a request rejected on
+    the user key has already counted on the IP key. set_transient()
+    restarts the hour on every allowed request: the counter only resets
+    after an hour without allowed requests, not every hour.
+    """
+
+    name = "nuværende"
+
+    def check(self, request, now, store):
+        writes = []
+        for key, _ in dimensions(request):
+            count, version = store.get(key, now)
+            if count is None:
+                writes.append((key, 1, PERIOD, version))
+                continue
+            if count >= request.limit:
+                # get_rate_limit_reset_time() queries the timeout row directly
+                store.reads += 1
+                return False, writes
+            writes.append((key, count + 1, PERIOD, version))
+        return True, writes
+
+class TokenBucketLimiter:
+    """limit tokens per key, refilled continuously over the period"""
+
+    name = "token bucket"
+
+    def check(self, request, now, store):
+        rate = request.limit / PERIOD
+        writes = []
+        for key, _ in dimensions(request):
+            bucket, version = store.get(key, now)
+            tokens, last = bucket or (request.limit, now)
+            tokens = min(request.limit, tokens + (now - last) * rate)
+            if tokens < 1:
+                return False, []
+            writes.append((key, (tokens - 1, now), PERIOD, version))
+        return True, writes
+
+class SlidingLogLimiter:
+    """Timestamps of the allowed requests in the last period, per key"""
+
+    name = "sliding log"
+
+    def check(self, request, now, store):
+        writes = []
+        for key, _ in dimensions(request):
+            log, version = store.get(key, now)
+            log = tuple(moment for moment in log or () if moment > now - PERIOD)
+            if len(log) >= request.limit:
+                return False, []
+            writes.append((key, log + (now,), PERIOD, version))
+        return True, writes
+
+class ShardedLimiter:
+    """Fixed hourly windows with the counter split over several keys
+
+    A request reads every shard and increments one at random, so
+    concurrent requests only collide when they pick the same shard.
+    """
+
+    def __init__(self, shards=4, seed=1):
+        self.shards = shards
+        self.random = random.Random(seed)
+        self.name = f"shardet ({shards})"
+
+    def check(self, request, now, store):
+        window = int(now // PERIOD)
+        ttl = (window + 1) * PERIOD - now
+        writes = []
+        for key, _ in dimensions(request):
+            values = [store.get(f"{key}_{window}_{shard}", now) for shard in range(self.shards)]
+            if sum(value or 0 for value, _ in values) >= request.limit:
+                return False, []
+            shard = self.random.randrange(self.shards)
+            value, version = values[shard]
+            writes.append((f"{key}_{window}_{shard}", (value or 0) + 1, ttl, version))
+        return True, writes
+
+def ideal_decisions(requests):
+    """Exact sliding window over allowed requests with atomic updates: the reference for false 429s"""
+    logs = defaultdict(deque)
+    decisions = bytearray(len(requests))
+    for index, request in enumerate(requests):
+        keys = [logs[key] for key, _ in dimensions(request)]
+        for log in keys:
+            while log and log[0] <= request.time - PERIOD:
+                log.popleft()
+        if all(len(log) < request.limit for log in keys):
+            decisions[index] = 1
+            for log in keys:
+                log.append(request.time)
+    return decisions
+
+def replay(requests, limiter, backend="options", race=0.02):
+    """Run a trace through a limiter; writes land `race` seconds after the reads they are based on"""
+    store = Store(backend)
+    pending = []
+    decisions = bytearray(len(requests))
+    lost = 0
+    sequence = 0
+    for index, request in enumerate(requests):
+        now = request.time
+        while pending and pending[0][0] <= now:
+            moment, _, key, value, ttl, version = heapq.heappop(pending)
+            store.advance(moment)
+            lost += store.set(key, value, ttl, moment, version)
+        store.advance(now)
+        allowed, writes = limiter.check(request, now, store)
+        decisions[index] = allowed
+        for key, value, ttl, version in writes:
+            sequence += 1
+            heapq.heappush(pending, (now + race, sequence, key, value, ttl, version))
+    while pending:
+        moment, _, key, value, ttl, version = heapq.heappop(pending)
+        lost += store.set(key, value, ttl, moment, version)
+    return decisions, store, lost
+
+def synthetic_trace(users=40, days=7, admin_share=0.25, users_per_ip=4, sessions_per_day=3,
+                    session_requests=25, think_time=20.0, burst=0.1, seed=1):
+    """Admin page traffic: users in offices behind shared IPs, sessions of filter/pagination clicks
+
+    A click fires a burst of 2-4 near-simultaneous requests with
+    probability `burst` (double clicks, quick pagination).
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+    requests = []
+    for user_id in range(1, users + 1):
+        ip = f"10.0.{(user_id - 1) // users_per_ip}.1"
+        limit = ADMIN_LIMIT if rng.random() < admin_share else DEFAULT_LIMIT
+        for day in range(days):
+            for _ in range(max(0, int(rng.gauss(sessions_per_day, 1)))):
+                moment = start + day * 86400 + rng.uniform(7, 17) * 3600
+                for _ in range(max(1, int(rng.expovariate(1 / session_requests)))):
+                    copies = rng.randint(2, 4) if rng.random() < burst else 1
+                    for copy in range(copies):
+                        requests.append(Request(moment + copy * rng.uniform(0, 0.01), ip, user_id, limit))
+                    moment += rng.expovariate(1 / think_time)
+    requests.sort()
+    return requests
+
+def parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+def read_trace(path, default_limit=DEFAULT_LIMIT):
+    """CSV with time (epoch or Y-m-d H:i:s), ip, user_id and optionally admin (1/0)"""
+    requests = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            admin = row.get("admin", "").strip().lower() in ("1", "true", "yes")
+            requests.append(Request(parse_time(row["time"]), row.get("ip", "").strip(),
+                                    int(row.get("user_id") or 0), ADMIN_LIMIT if admin else default_limit))
+    requests.sort()
+    return requests
+
+def read_log_trace(paths, limit=DEFAULT_LIMIT, action=None):
+    """Requests from 'Rate limit exceeded' lines; lines within one second are spread over that second"""
+    by_second = defaultdict(list)
+    for timestamp, _, message, _ in scan_files(paths):
+        match = RATE_LIMITED.match(message)
+        if match and (action is None or match.group(1).decode() == action):
+            by_second[timestamp].append((match.group(3).decode("utf-8", "replace"), int(match.group(2))))
+    requests = []
+    for timestamp, hits in by_second.items():
+        second = parse_timestamp(timestamp).replace(tzinfo=timezone.utc).timestamp()
+        for index, (ip, user_id) in enumerate(hits):
+            requests.append(Request(second + index / len(hits), ip, user_id, limit))
+    requests.sort()
+    return requests
+
+def write_trace(path, requests):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time", "ip", "user_id", "admin"])
+        for request in requests:
+            writer.writerow([f"{request.time:.3f}", request.ip, request.user_id, int(request.limit == ADMIN_LIMIT)])
+
+def compare(requests, limiters, backend, race):
+    ideal = ideal_decisions(requests)
+    rows = []
+    for limiter in limiters:
+        started = time.perf_counter()
+        decisions, store, lost = replay(requests, limiter, backend, race)
+        rejected = decisions.count(0)
+        false_429 = sum(1 for got, want in zip(decisions, ideal) if not got and want)
+        over = sum(1 for got, want in zip(decisions, ideal) if got and not want)
+        rows.append({
+            "limiter": limiter.name,
+            "rejected": rejected,
+            "false_429": false_429,
+            "over_limit": over,
+            "reads_per_request": store.reads / len(requests),
+            "writes_per_request": store.writes / len(requests),
+            "peak_keys": store.peak_keys,
+            "peak_rows": store.peak_rows,
+            "lost_updates": lost,
+            "seconds": time.perf_counter() - started,
+        })
+    return ideal.count(0), rows
+
+def print_report(requests, ideal_rejected, rows, backend, race):
+    span = (requests[-1].time - requests[0].time) / 3600 if requests else 0
+    print(f"{len(requests)} requests over {span:.1f} timer; backend: {backend}; race-vindue: {race * 1000:.0f} ms")
+    print(f"Reference (præcist sliding window, atomisk): {ideal_rejected} afvist\n")
+    print(f"{'algoritme':<16}{'429':>8}{'falske 429':>12}{'for mange':>11}{'læs/req':>9}{'skriv/req':>10}"
+          f"{'nøgler':>8}{'rækker':>8}{'tabte':>8}")
+    for row in rows:
+        print(f"{row['limiter']:<16}{row['rejected']:>8}{row['false_429']:>12}{row['over_limit']:>11}"
+              f"{row['reads_per_request']:>9.2f}{row['writes_per_request']:>10.2f}{row['peak_keys']:>8}"
+              f"{row['peak_rows']:>8}{row['lost_updates']:>8}")
+    print("\n   falske 429: afvist selvom referencen tillader; for mange: tilladt selvom referencen afviser")
+    print("   nøgler: flest levende nøgler på én gang; rækker: flest lagrede rækker inkl. udløbne transients")
+    print("   tabte: skrivninger der overskrev en anden requests samtidige opdatering")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Afspil request-spor mod check_rate_limit() og alternative rate limiters.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="CSV med time, ip, user_id, admin")
+    source.add_argument("--from-log", action="store_true",
+                        help="Byg sporet af 'Rate limit exceeded'-linjer i membership.log og backups")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Mappe med membership.log (med --from-log)")
+    parser.add_argument("--action", default="filter_memberships", help="Kun denne action (med --from-log)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="max_requests for spor uden admin-kolonne")
+    parser.add_argument("--users", type=int, default=40, help="Syntetisk: antal brugere")
+    parser.add_argument("--days", type=int, default=7, help="Syntetisk: antal dage")
+    parser.add_argument("--users-per-ip", type=int, default=4, help="Syntetisk: brugere bag samme IP (kontor-NAT)")
+    parser.add_argument("--admin-share", type=float, default=0.25, help="Syntetisk: andel med manage_options (500/time)")
+    parser.add_argument("--session-requests", type=int, default=25, help="Syntetisk: gennemsnitligt antal klik pr. session")
+    parser.add_argument("--burst", type=float, default=0.1, help="Syntetisk: andel klik der giver samtidige requests")
+    parser.add_argument("--seed", type=int, default=1, help="Syntetisk: seed")
+    parser.add_argument("--write-trace", help="Gem det syntetiske spor som CSV")
+    parser.add_argument("--backend", choices=["options", "object-cache"], default="options",
+                        help="Hvor transients ligger: wp_options eller en vedvarende objekt-cache")
+    parser.add_argument("--race-ms", type=float, default=20.0, help="Tid mellem læsning og skrivning i en request")
+    parser.add_argument("--shards", type=int, default=4, help="Antal shards for den shardede tæller")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        requests = read_trace(args.trace, args.limit)
+    elif args.from_log:
+        requests = read_log_trace(log_files(args.log_dir), args.limit, args.action or None)
+    else:
+        requests = synthetic_trace(args.users, args.days, args.admin_share, args.users_per_ip,
+                                   session_requests=args.session_requests, burst=args.burst, seed=args.seed)
+        if args.write_trace:
+            write_trace(args.write_trace, requests)
+            print(f"📄 Spor skrevet til {args.write_trace}")
+    if not requests:
+        print("⚠ Ingen requests i sporet")
+        return 1
+
+    limiters = [CurrentLimiter(), TokenBucketLimiter(), SlidingLogLimiter(), ShardedLimiter(args.shards, args.seed)]
+    started = time.perf_counter()
+    ideal_rejected, rows = compare(requests, limiters, args.backend, args.race_ms / 1000)
+    print_report(requests, ideal_rejected, rows, args.backend, args.race_ms / 1000)
+    print(f"\n✅ Afspillet på {time.perf_counter() - started:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
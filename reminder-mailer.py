@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Samtidig afsendelse af påmindelses-e-mails for Membership Manager
+Sender flettede beskeder (fra email-templates.py) over en begrænset pulje af vedvarende SMTP-forbindelser
+med asyncio, prøver igen ved midlertidige fejl og logger resultatet i membership.log-formatet
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import time
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid
+
+from membership_log import LOG_DIR, append_log, format_line
+
+# Roughly WordPress' is_email(): local@domain.tld without spaces
+EMAIL = re.compile(r"^[A-Za-z0-9!#$%&'*+/=?^_`{|}~.-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+$")
+TAGS = re.compile(r"<[^>]*>")
+
+class SmtpError(Exception):
+    """An SMTP reply outside 2xx/3xx, or a broken connection (code 0)"""
+
+    def __init__(self, code, text):
+        super().__init__(f"{code} {text}")
+        self.code = code
+        self.text = text
+
+    @property
+    def transient(self):
+        return self.code == 0 or 400 <= self.code < 500
+
+def describe(error):
+    """Text for an exception whose str() may be empty, such as a timeout"""
+    return str(error) or type(error).__name__
+
+def is_email(address):
+    return bool(address) and len(address) >= 6 and bool(EMAIL.match(address))
+
+def sanitize_text_field(value):
+    return " ".join(TAGS.sub("", value).split())
+
+def sanitize_email(value):
+    return re.sub(r"[^A-Za-z0-9!#$%&'*+/=?^_`{|}~.@-]", "", value)
+
+def staging_mode(flag=False):
+    return flag or os.environ.get("MEMBERSHIP_STAGING_MODE", "").lower() in ("1", "true", "yes")
+
+def encode_header(value):
+    return value if value.isascii() else Header(value, "utf-8").encode()
+
+def build_message(to, subject, body, from_name, from_address):
+    """The message wp_mail() sends for Membership_Emails::send_email(), as SMTP DATA bytes
+
+    Assembled by hand rather than with email.message.EmailMessage, whose
+    policy machinery costs over a millisecond per message and would block
+    the event loop; the body goes out as 8bit UTF-8 like PHPMailer does.
+    """
+    headers = [
+        f"Date: {formatdate(localtime=False)}",
+        f"From: {formataddr((sanitize_text_field(from_name), sanitize_email(from_address)), 'utf-8')}",
+        f"To: {to}",
+        f"Subject: {encode_header(subject)}",
+        f"Message-ID: {make_msgid(domain=sanitize_email(from_address).rpartition('@')[2] or None)}",
+        "MIME-Version: 1.0",
+        "Content-Type: text/html; charset=UTF-8",
+        "Content-Transfer-Encoding: 8bit",
+    ]
+    lines = body.replace("\r\n", "\n").split("\n")
+    return ("\r\n".join(headers) + "\r\n\r\n" + "\r\n".join(lines)).encode("utf-8")
+
+class SmtpConnection:
+    """A minimal asyncio SMTP client that keeps its session open between messages"""
+
+    def __init__(self, host, port, username=None, password=None, tls="starttls", timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.tls = tls
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.features = set()
+
+    async def reply(self):
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise SmtpError(0, "forbindelsen blev lukket")
+            line = line.decode("utf-8", "replace").rstrip("\r\n")
+            lines.append(line[4:])
+            if len(line) < 4 or line[3] != "-":
+                try:
+                    return int(line[:3]), "\n".join(lines)
+                except ValueError:
+                    raise SmtpError(0, line) from None
+
+    async def command(self, line, expect=(250,)):
+        self.writer.write(line.encode("utf-8") + b"\r\n")
+        await self.writer.drain()
+        code, text = await self.reply()
+        if code not in expect:
+            raise SmtpError(code, text)
+        return code, text
+
+    async def ehlo(self):
+        _, text = await self.command("EHLO membership-manager")
+        self.features = {line.split()[0].upper() for line in text.splitlines()[1:] if line.strip()}
+
+    async def connect(self):
+        """Open the session; any failure closes the socket and is raised as SmtpError"""
+        context = ssl.create_default_context() if self.tls != "none" else None
+        try:
+            self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(
+                self.host, self.port, ssl=context if self.tls == "ssl" else None), self.timeout)
+            code, text = await self.reply()
+            if code != 220:
+                raise SmtpError(code, text)
+            await self.ehlo()
+            if self.tls == "starttls" and "STARTTLS" in self.features:
+                await self.command("STARTTLS", expect=(220,))
+                await asyncio.wait_for(self.writer.start_tls(context), self.timeout)
+                await self.ehlo()
+            if self.username:
+                credentials = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+                await self.command(f"AUTH PLAIN {credentials}", expect=(235,))
+        except SmtpError:
+            await self.abort()
+            raise
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            await self.abort()
+            raise SmtpError(0, describe(error)) from None
+
+    @property
+    def open(self):
+        return self.writer is not None
+
+    async def send(self, sender, recipient, data):
+        """Deliver one message; a connection that fails or cannot be reset is closed"""
+        try:
+            await self.command(f"MAIL FROM:<{sender}>")
+            await self.command(f"RCPT TO:<{recipient}>", expect=(250, 251))
+            await self.command("DATA", expect=(354,))
+            # Dot-stuffing, and the terminating <CRLF>.<CRLF>
+            self.writer.write(re.sub(rb"(?m)^\.", b"..", data).rstrip(b"\r\n") + b"\r\n.\r\n")
+            await self.writer.drain()
+            code, text = await self.reply()
+            if code != 250:
+                raise SmtpError(code, text)
+        except SmtpError as error:
+            if not error.code:
+                await self.abort()
+                raise
+            try:
+                await self.command("RSET")
+            except (SmtpError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                await self.abort()
+            raise
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            await self.abort()
+            raise SmtpError(0, describe(error)) from None
+
+    async def abort(self):
+        """Drop the socket without QUIT"""
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await asyncio.wait_for(self.writer.wait_closed(), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is None:
+            return
+        try:
+            await self.command("QUIT", expect=(221,))
+        except (SmtpError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        await self.abort()
+
+class Mailer:
+    """Delivers a batch of messages with `connections` concurrent SMTP sessions
+
+    Every worker keeps one connection open and reopens it after a
+    connection-level error. Transient failures (4xx, dropped connections)
+    are retried with exponential backoff; 5xx replies fail the message at
+    once. One result line per message is collected in membership.log format.
+    """
+
+    def __init__(self, settings, connections=4, retries=3, backoff=1.0, per_connection=100):
+        self.settings = settings
+        self.connections = connections
+        self.retries = retries
+        self.backoff = backoff
+        self.per_connection = per_connection
+        self.log_lines = []
+        self.stats = {"sent": 0, "failed": 0, "blocked": 0, "invalid": 0, "retries": 0, "connections": 0}
+
+    def log(self, message, level="INFO"):
+        self.log_lines.append(format_line(message, level))
+
+    def check(self, item):
+        """send_email()'s checks before wp_mail(); returns False when the message is not sent"""
+        to, subject = item.get("to", ""), item.get("subject", "")
+        if self.settings["staging"]:
+            self.log(f"[STAGING MODE] E-mail blokeret - Til: {to}, Emne: {subject}", "INFO")
+            self.stats["blocked"] += 1
+            return False
+        if not is_email(to):
+            self.log(f"Ugyldig e-mailadresse: {to}", "ERROR")
+            self.stats["invalid"] += 1
+            return False
+        if not subject or not item.get("body"):
+            self.log("Tomt emne eller besked i e-mail", "ERROR")
+            self.stats["invalid"] += 1
+            return False
+        return True
+
+    def sent_line(self, item):
+        # Same line the calling send_*_renewal_reminders() logs after send_email()
+        kind = "automatisk" if item.get("renewal_type") == "automatic" else "manuel"
+        if item.get("reminder_type"):
+            self.log(f"Sendte {kind} fornyelsespåmindelse ({item['reminder_type']}) til: {item['to']}")
+        else:
+            self.log(f"Sendte e-mail til: {item['to']}")
+
+    async def worker(self, queue):
+        connection = None
+        delivered = 0
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                data = build_message(item["to"], item["subject"], item["body"],
+                                     self.settings["from_name"], self.settings["from_address"])
+                for attempt in range(self.retries + 1):
+                    try:
+                        if connection is None or delivered >= self.per_connection:
+                            if connection is not None:
+                                await connection.close()
+                            connection = SmtpConnection(**self.settings["smtp"])
+                            delivered = 0
+                            await connection.connect()
+                            self.stats["connections"] += 1
+                        await connection.send(self.settings["from_address"], item["to"], data)
+                        delivered += 1
+                        self.stats["sent"] += 1
+                        self.sent_line(item)
+                        break
+                    except SmtpError as error:
+                        if connection is not None and not connection.open:
+                            connection = None
+                        if not error.transient or attempt == self.retries:
+                            self.stats["failed"] += 1
+                            self.log(f"Kunne ikke sende e-mail til: {item['to']} med emne: {item['subject']}", "ERROR")
+                            break
+                        self.stats["retries"] += 1
+                        await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        finally:
+            if connection is not None:
+                await connection.close()
+
+    async def produce(self, queue, items, workers):
+        try:
+            for item in items:
+                if self.check(item):
+                    await queue.put(item)
+        finally:
+            # Let every worker stop, also when reading the messages failed
+            for _ in range(workers):
+                await queue.put(None)
+
+    async def run(self, items):
+        queue = asyncio.Queue(maxsize=self.connections * 4)
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.connections)]
+        producer = asyncio.create_task(self.produce(queue, items, len(workers)))
+        results = await asyncio.gather(*workers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.log(f"Afsendelsen stoppede med en fejl: {describe(result)}", "ERROR")
+        # With every worker gone nothing takes from the queue any more; what
+        # is still in it fails, and the producer is stopped if it waits
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                self.stats["failed"] += 1
+                self.log(f"Kunne ikke sende e-mail til: {item['to']} med emne: {item['subject']}", "ERROR")
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+class SinkServer:
+    """Local SMTP sink for end-to-end tests; accepts everything unless told to fail or stall"""
+
+    def __init__(self, fail_rate=0.0, delay=0.0, output=None):
+        self.fail_rate = fail_rate
+        self.delay = delay
+        self.output = output
+        self.received = 0
+        self.sessions = 0
+
+    async def handle(self, reader, writer):
+        self.sessions += 1
+
+        async def say(line):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await say("220 membership-sink ESMTP")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb = line.decode("utf-8", "replace").strip().split(" ")[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    await say("250-membership-sink\r\n250-8BITMIME\r\n250 PIPELINING" if verb == "EHLO" else "250 membership-sink")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await say("250 OK")
+                elif verb == "DATA":
+                    await say("354 Slut med <CRLF>.<CRLF>")
+                    chunks = []
+                    while True:
+                        chunk = await reader.readline()
+                        if chunk in (b".\r\n", b".\n", b""):
+                            break
+                        chunks.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    if random.random() < self.fail_rate:
+                        await say("451 4.3.0 Midlertidig fejl")
+                        continue
+                    self.received += 1
+                    if self.output:
+                        with open(os.path.join(self.output, f"{self.received:06d}.eml"), "wb") as f:
+                            f.write(b"".join(chunks))
+                    await say("250 OK modtaget")
+                elif verb == "QUIT":
+                    await say("221 Farvel")
+                    break
+                else:
+                    await say("502 Ikke understøttet")
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        if self.output:
+            os.makedirs(self.output, exist_ok=True)
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+def read_messages(path):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+async def send_batch(args):
+    sink = None
+    host, port = args.smtp_host, args.smtp_port
+    if args.sink:
+        sink = SinkServer(args.sink_fail_rate, args.sink_delay)
+        host, port = "127.0.0.1", await sink.start()
+    settings = {
+        "staging": staging_mode(args.staging),
+        "from_name": args.from_name,
+        "from_address": args.from_address,
+        "smtp": {"host": host, "port": port, "username": args.smtp_user,
+                 "password": os.environ.get("SMTP_PASSWORD", ""), "tls": "none" if args.sink else args.tls},
+    }
+    mailer = Mailer(settings, args.connections, args.retries, args.backoff)
+    started = time.perf_counter()
+    await mailer.run(read_messages(args.messages))
+    elapsed = time.perf_counter() - started
+    if sink:
+        sink.server.close()
+        await sink.server.wait_closed()
+    return mailer, elapsed
+
+async def run_sink(args):
+    sink = SinkServer(args.fail_rate, args.delay, args.output)
+    port = await sink.start(args.host, args.port)
+    print(f"📬 SMTP sink lytter på {args.host}:{port} (Ctrl+C for at stoppe)")
+    try:
+        async with sink.server:
+            await sink.server.serve_forever()
+    finally:
+        print(f"\n{sink.received} beskeder modtaget over {sink.sessions} forbindelser")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send påmindelses-e-mails samtidigt over vedvarende SMTP-forbindelser.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    send = sub.add_parser("send", help="Send beskeder fra en JSONL-fil (email-templates.py render)")
+    send.add_argument("messages", help="JSONL med to, subject, body (- for stdin)")
+    send.add_argument("--smtp-host", default="localhost", help="SMTP-server")
+    send.add_argument("--smtp-port", type=int, default=587, help="SMTP-port")
+    send.add_argument("--smtp-user", help="Brugernavn (adgangskode i miljøvariablen SMTP_PASSWORD)")
+    send.add_argument("--tls", choices=["starttls", "ssl", "none"], default="starttls", help="Kryptering")
+    send.add_argument("--from-name", default="", help="membership_email_from_name")
+    send.add_argument("--from-address", required=True, help="membership_email_from_address")
+    send.add_argument("--connections", type=int, default=4, help="Antal samtidige SMTP-forbindelser")
+    send.add_argument("--retries", type=int, default=3, help="Genforsøg ved midlertidige fejl")
+    send.add_argument("--backoff", type=float, default=1.0, help="Første ventetid i sekunder før genforsøg")
+    send.add_argument("--staging", action="store_true", help="Bloker alle e-mails som MEMBERSHIP_STAGING_MODE")
+    send.add_argument("--log-dir", default=LOG_DIR, help="Mappe med membership.log")
+    send.add_argument("--no-log", action="store_true", help="Skriv loglinjerne til stdout i stedet for membership.log")
+    send.add_argument("--sink", action="store_true", help="Send til en lokal SMTP sink i samme proces (test)")
+    send.add_argument("--sink-fail-rate", type=float, default=0.0, help="Andel midlertidige fejl fra test-sinken")
+    send.add_argument("--sink-delay", type=float, default=0.0, help="Forsinkelse pr. besked i test-sinken (sekunder)")
+
+    sink = sub.add_parser("sink", help="Start en lokal SMTP sink")
+    sink.add_argument("--host", default="127.0.0.1", help="Adresse der lyttes på")
+    sink.add_argument("--port", type=int, default=8025, help="Port")
+    sink.add_argument("--fail-rate", type=float, default=0.0, help="Andel beskeder der afvises med 451")
+    sink.add_argument("--delay", type=float, default=0.0, help="Forsinkelse pr. besked (sekunder)")
+    sink.add_argument("--output", help="Gem modtagne beskeder som .eml i denne mappe")
+    args = parser.parse_args(argv)
+
+    if args.command == "sink":
+        try:
+            asyncio.run(run_sink(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if not is_email(args.from_address):
+        parser.error("--from-address er ikke en gyldig e-mailadresse")
+    mailer, elapsed = asyncio.run(send_batch(args))
+    if args.no_log:
+        sys.stdout.writelines(mailer.log_lines)
+    else:
+        append_log(mailer.log_lines, args.log_dir)
+
+    stats = mailer.stats
+    print(f"\n{'='*60}\n📊 Afsendelse\n{'='*60}")
+    print(f"   Sendt: {stats['sent']}, fejlet: {stats['failed']}, ugyldige: {stats['invalid']}, blokeret: {stats['blocked']}")
+    print(f"   Genforsøg: {stats['retries']}, forbindelser åbnet: {stats['connections']}")
+    print(f"\n✅ {stats['sent'] / elapsed if elapsed else 0:.0f} beskeder/s over {args.connections} forbindelser ({elapsed:.2f} s)")
+    return 0 if not stats["failed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
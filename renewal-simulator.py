@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Simulering af fornyelses-cron for Membership Manager
+Beregner for hver dag i en periode hvilke påmindelser, automatiske fornyelsesordrer og udløb
+Membership_Renewals::process_membership_renewals() vil give, ud fra et snapshot af medlemskabstabellen
+"""
+
+import argparse
+import csv
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from membership_snapshot import open_snapshot
+
+REMINDERS = [("30_days", 30), ("14_days", 14), ("7_days", 7), ("1_day", 1)]
+ZERO_DATE = "0000-00-00 00:00:00"
+
+# One row per subscription and renewal cycle. Cycle n is the membership
+# after n automatic renewals, each of which moves end_date one year on the
+# way the checkout does (DateTime::modify('+1 year'); SQLite normalises
+# Feb 29 to Mar 1 the same way). A cycle only exists when the renewal order
+# before it is created inside the simulated period.
+#
+# due:     the day process_membership_renewals() sees days_left == 0
+# expires: the first run where process_expirations() finds end_date < now,
+#          i.e. the day after the date of (end_date - run time - UTC offset)
+CYCLES = """
+WITH RECURSIVE cycles(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM cycles WHERE n < :max_cycles)
+SELECT id, automatic, n, due, expires FROM (
+    SELECT id, renewal_type = 'automatic' AS automatic, n,
+           julianday(date(end_date, printf('%+d years', n))) AS due,
+           julianday(date(end_date, printf('%+d years', n), :shift)) + 1 AS expires,
+           julianday(date(end_date, printf('%+d years', n - 1))) AS previous_due,
+           julianday(date(end_date)) AS first_due,
+           julianday(date(end_date, :shift)) + 1 AS first_expires
+    FROM membership_subscriptions, cycles
+    WHERE status = 'active' AND end_date <> :zero_date AND julianday(end_date) IS NOT NULL
+      AND (n = 0 OR (renewal_type = 'automatic' AND :assume_renewed))
+)
+WHERE n = 0 OR (first_due < first_expires AND first_due >= :start AND previous_due <= :end)
+"""
+
+EVENTS = """
+CREATE TEMP TABLE cycle_rows AS {cycles};
+
+CREATE TEMP TABLE events AS
+SELECT c.due - k.days AS day, k.kind, c.automatic, c.id
+FROM cycle_rows c, reminder_kinds k
+WHERE c.due - k.days < c.expires AND c.due - k.days BETWEEN :start AND :end
+  AND (k.days > 0 OR c.automatic)
+UNION ALL
+-- Expiry of the last cycle; anything already past end_date goes on the first run
+SELECT max(c.expires, :start), 'expired', c.automatic, c.id
+FROM cycle_rows c
+WHERE c.expires <= :end
+  AND NOT (:assume_renewed AND c.automatic AND c.due < c.expires AND c.due BETWEEN :start AND :end)
+"""
+
+def simulate(connection, start, end, run_time="00:00", utc_offset=0.0, assume_renewed=False):
+    """Create the temp table `events` (day, kind, automatic, id) for runs on start..end
+
+    kind is a reminder type, 'renewal' for an automatic renewal order on the
+    expiration date, or 'expired'. Days are Julian day numbers. Each
+    subscription row is expanded by SQL joins, not a Python loop.
+    """
+    hours, minutes = (int(part) for part in run_time.split(":"))
+    shift = -(hours * 3600 + minutes * 60 + int(utc_offset * 3600))
+    start_day = connection.execute("SELECT julianday(?)", (start.isoformat(),)).fetchone()[0]
+    end_day = connection.execute("SELECT julianday(?)", (end.isoformat(),)).fetchone()[0]
+    params = {
+        "start": start_day,
+        "end": end_day,
+        "shift": f"{shift:+d} seconds",
+        "zero_date": ZERO_DATE,
+        "assume_renewed": int(assume_renewed),
+        "max_cycles": (end - start).days // 365 + 1 if assume_renewed else 0,
+    }
+    connection.execute("DROP TABLE IF EXISTS temp.reminder_kinds")
+    connection.execute("CREATE TEMP TABLE reminder_kinds (kind TEXT, days INTEGER)")
+    connection.executemany("INSERT INTO reminder_kinds VALUES (?, ?)", REMINDERS + [("renewal", 0)])
+    for table in ("cycle_rows", "events"):
+        connection.execute(f"DROP TABLE IF EXISTS temp.{table}")
+    for statement in EVENTS.format(cycles=CYCLES).split(";\n\n"):
+        connection.execute(statement, params)
+    return params
+
+def daily_counts(connection):
+    """{date: {(kind, automatic): count}}"""
+    days = defaultdict(dict)
+    for day, kind, automatic, count in connection.execute(
+            "SELECT date(day), kind, automatic, COUNT(*) FROM events GROUP BY day, kind, automatic ORDER BY day"):
+        days[day][(kind, automatic)] = count
+    return days
+
+def day_summary(counts):
+    reminders = {kind: counts.get((kind, 1), 0) + counts.get((kind, 0), 0) for kind, _ in REMINDERS}
+    return {
+        "emails_automatic": sum(counts.get((kind, 1), 0) for kind, _ in REMINDERS),
+        "emails_manual": sum(counts.get((kind, 0), 0) for kind, _ in REMINDERS),
+        "orders": counts.get(("renewal", 1), 0),
+        "expired": counts.get(("expired", 1), 0) + counts.get(("expired", 0), 0),
+        **reminders,
+    }
+
+def missed_renewals(connection, params):
+    """Automatic subscriptions that expire before their day-0 run can create the renewal order
+
+    process_expirations() runs first and compares the full end_date with
+    the current time, so an end_date earlier in the day than the cron run
+    expires the subscription before the renewal check sees days_left == 0.
+    """
+    return connection.execute(
+        "SELECT COUNT(*) FROM cycle_rows WHERE automatic AND due >= expires AND due BETWEEN :start AND :end",
+        params).fetchone()[0]
+
+def print_report(days, invalid, missed, by_type):
+    kinds = [kind for kind, _ in REMINDERS]
+    header = f"{'dato':<12}{'e-mail auto':>12}{'e-mail man.':>12}{'ordrer':>8}{'udløb':>8}"
+    if by_type:
+        header += "".join(f"{kind:>9}" for kind in kinds)
+    print(header)
+    totals = defaultdict(int)
+    peak = None
+    for day, counts in days.items():
+        summary = day_summary(counts)
+        for key, value in summary.items():
+            totals[key] += value
+        emails = summary["emails_automatic"] + summary["emails_manual"]
+        if peak is None or emails + summary["orders"] > peak[1]:
+            peak = (day, emails + summary["orders"])
+        line = (f"{day:<12}{summary['emails_automatic']:>12}{summary['emails_manual']:>12}"
+                f"{summary['orders']:>8}{summary['expired']:>8}")
+        if by_type:
+            line += "".join(f"{summary[kind]:>9}" for kind in kinds)
+        print(line)
+
+    print(f"\n{'='*60}\n📊 I alt\n{'='*60}")
+    print(f"   E-mails: {totals['emails_automatic'] + totals['emails_manual']} "
+          f"({totals['emails_automatic']} automatisk, {totals['emails_manual']} manuel)")
+    print(f"   Fornyelsesordrer: {totals['orders']}")
+    print(f"   Udløb: {totals['expired']}")
+    if peak:
+        print(f"   Travleste dag: {peak[0]} ({peak[1]} e-mails og ordrer)")
+    if missed:
+        print(f"   ⚠ {missed} automatiske fornyelser udløber før kørslen på udløbsdagen og får ingen ordre")
+    if invalid:
+        print(f"   ⚠ {invalid} aktive medlemskaber har en ugyldig slutdato (DateTime kaster en exception)")
+
+def write_csv(stream, days):
+    writer = csv.writer(stream)
+    fields = ["emails_automatic", "emails_manual", "orders", "expired"] + [kind for kind, _ in REMINDERS]
+    writer.writerow(["date"] + fields)
+    for day, counts in days.items():
+        summary = day_summary(counts)
+        writer.writerow([day] + [summary[field] for field in fields])
+
+def print_details(connection, day):
+    rows = connection.execute(
+        "SELECT e.kind, e.automatic, e.id FROM events e WHERE date(e.day) = ? ORDER BY e.kind, e.id",
+        (day.isoformat(),)).fetchall()
+    for kind, automatic, subscription_id in rows:
+        print(f"{kind:<10}{'automatic' if automatic else 'manual':<11}#{subscription_id}")
+    print(f"\n{len(rows)} hændelser {day.isoformat()}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simuler fornyelses-cron (påmindelser, ordrer og udløb) ud fra et snapshot.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--date", type=date.fromisoformat, help="Simuler kun denne dag")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="Første dag (standard: i dag)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Sidste dag (standard: et år frem)")
+    parser.add_argument("--run-time", default="00:00", help="Tidspunkt (UTC) hvor WP-cron kører, HH:MM")
+    parser.add_argument("--utc-offset", type=float, default=0.0,
+                        help="Sidens tidszone i timer; current_time('mysql') i process_expirations() bruger den")
+    parser.add_argument("--assume-renewed", action="store_true",
+                        help="Antag at automatiske fornyelsesordrer betales, så slutdatoen rykker et år")
+    parser.add_argument("--by-type", action="store_true", help="Vis påmindelser pr. type (30/14/7/1 dage)")
+    parser.add_argument("--details", action="store_true", help="List abonnements-ID'er (kun med --date)")
+    parser.add_argument("--csv", action="store_true", help="Skriv dagstal som CSV")
+    args = parser.parse_args(argv)
+
+    start = args.date or args.start or datetime.utcnow().date()
+    end = args.date or args.end or start + timedelta(days=365)
+    if end < start:
+        parser.error("--to skal være efter --from")
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    params = simulate(connection, start, end, args.run_time, args.utc_offset, args.assume_renewed)
+
+    if args.details and args.date:
+        print_details(connection, args.date)
+        return 0
+
+    days = daily_counts(connection)
+    if args.csv:
+        write_csv(sys.stdout, days)
+        return 0
+
+    invalid = connection.execute(
+        "SELECT COUNT(*) FROM membership_subscriptions WHERE status = 'active' AND end_date <> ? "
+        "AND julianday(end_date) IS NULL", (ZERO_DATE,)).fetchone()[0]
+    print_report(days, invalid, missed_renewals(connection, params), args.by_type)
+    print(f"\n✅ {start} → {end} simuleret på {time.perf_counter() - started:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
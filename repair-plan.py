@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Reparationsplan for medlemskabsdata
+Beregner de rettelser Membership_Manager::fix_membership_data() ville lave på et snapshot af ordrer og medlemskaber,
+og skriver dem som ét transaktionelt SQL-script med mængdebaserede UPDATE/INSERT, der kan køres igen uden virkning.
+Scriptet kører ikke membership_manager_subscription_activated, så nye medlemmer får hverken medlemsrollen eller
+has_active_membership; kør role-reconciler.py på et nyt snapshot bagefter
+"""
+
+import argparse
+import json
+import re
+import secrets
+import sys
+import time
+from datetime import datetime
+
+from membership_snapshot import (insert_statements, load_membership_products, open_snapshot, php_empty_sql,
+                                 php_list)
+
+CHECKED_STATUSES = ("completed", "processing")
+SERIALIZED = re.compile(r"^a:\d+:\{")
+# create_membership_subscription() fires membership_manager_subscription_activated,
+# whose handle_activation() adds the member role; a plain INSERT does not
+ROLE_WARNING = ("Nye medlemskaber får ikke medlemsrollen eller has_active_membership af scriptet. "
+                "Kør role-reconciler.py på et nyt snapshot bagefter.")
+
+# Checked orders with a configured membership product, a user, and no
+# _membership_created, in wc_get_orders() order. `automatic` is the renewal
+# type create_membership_subscription() would pick: the first item that is
+# a membership product or a subscription product decides.
+BROKEN_ORDERS = """
+SELECT o.id, o.user_id, o.subscription_relation, o.subscription_id, hit.automatic
+FROM orders o
+JOIN (SELECT DISTINCT i.order_id FROM order_items i JOIN membership_products p ON p.product_id = i.product_id) m
+  ON m.order_id = o.id
+JOIN (
+    SELECT i.order_id, MIN(i.item_id), COALESCE(p.automatic, 1) AS automatic
+    FROM order_items i
+    LEFT JOIN membership_products p ON p.product_id = i.product_id
+    WHERE p.product_id IS NOT NULL OR i.is_subscription
+    GROUP BY i.order_id
+) hit ON hit.order_id = o.id
+WHERE o.status IN ({statuses}) AND o.user_id <> 0 AND {created_empty}
+ORDER BY o.date_created DESC, o.id DESC
+"""
+
+# Every order of the subscriptions involved; get_related_orders() lists them newest ID first
+RELATED_ORDERS = """
+SELECT o.subscription_id, o.id, o.subscription_relation, o.membership_ids
+FROM orders o
+WHERE o.subscription_id IN (SELECT value FROM json_each(?)) AND o.subscription_relation IN ('parent', 'renewal')
+ORDER BY o.subscription_id, o.id DESC
+"""
+
+# get_user_membership(): the membership with the latest end_date
+LATEST_MEMBERSHIPS = """
+SELECT user_id, id FROM (
+    SELECT user_id, id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY end_date DESC, id) AS rank
+    FROM membership_subscriptions
+    WHERE user_id IN (SELECT value FROM json_each(?))
+)
+WHERE rank = 1
+"""
+
+def meta_array_first(value):
+    """$meta[0] when get_post_meta() gives a non-empty array, else None
+
+    Only PHP-serialized values come back as arrays; JSON or comma lists are
+    strings to the is_array() check in fix_membership_data().
+    """
+    if value is None or not SERIALIZED.match(str(value).strip()):
+        return None
+    items = php_list(value)
+    return items[0] if items else None
+
+def plan_repairs(connection, automatic=None, manual=None):
+    """The results array of fix_membership_data() plus the rows the SQL script needs
+
+    Orders are replayed in wc_get_orders() order so that links and
+    memberships made earlier in the run are seen by later orders, exactly
+    as in the PHP loop; only the broken orders are visited. New memberships
+    get the IDs AUTO_INCREMENT is expected to hand out.
+    """
+    results = {
+        "total_fixed": 0,
+        "orders_linked": 0,
+        "memberships_created": 0,
+        "errors": 0,
+        "fixes": [],
+        "success": True,
+    }
+    plan = {"create": [], "link": []}
+    automatic, manual = load_membership_products(connection, automatic, manual)
+    if not automatic and not manual:
+        results["success"] = False
+        results["fixes"].append({"type": "error", "message": "Ingen medlemskabsprodukter konfigureret."})
+        return results, plan
+
+    statuses = CHECKED_STATUSES + tuple(f"wc-{status}" for status in CHECKED_STATUSES)
+    broken = connection.execute(BROKEN_ORDERS.format(
+        statuses=", ".join("?" for _ in statuses), created_empty=php_empty_sql("o.membership_created")),
+        statuses).fetchall()
+
+    subscriptions = sorted({row[3] for row in broken if row[2] in ("parent", "renewal") and row[3]})
+    parents, related = {}, {}
+    membership_ids = {}
+    for subscription_id, order_id, relation, ids in connection.execute(RELATED_ORDERS, (json.dumps(subscriptions),)):
+        related.setdefault(subscription_id, []).append(order_id)
+        if relation == "parent":
+            parents[subscription_id] = order_id
+        membership_ids[order_id] = meta_array_first(ids)
+
+    users = sorted({row[1] for row in broken})
+    latest = dict(connection.execute(LATEST_MEMBERSHIPS, (json.dumps(users),)))
+    existing = set()
+    created = {}
+    next_id = (connection.execute("SELECT MAX(id) FROM membership_subscriptions").fetchone()[0] or 0) + 1
+
+    for order_id, user_id, relation, subscription_id, renewal_automatic in broken:
+        subscription_membership_id = None
+        if relation == "renewal" and subscription_id:
+            parent_id = parents.get(subscription_id)
+            if parent_id is not None:
+                subscription_membership_id = membership_ids.get(parent_id)
+        elif relation == "parent" and subscription_id:
+            for related_id in related.get(subscription_id, []):
+                if membership_ids.get(related_id) is not None:
+                    subscription_membership_id = membership_ids[related_id]
+                    break
+
+        via_subscription = subscription_membership_id not in (None, "", "0")
+        membership_id = None
+        if via_subscription and re.match(r"^\d+", subscription_membership_id):
+            candidate = int(re.match(r"^\d+", subscription_membership_id).group())
+            if candidate in existing or connection.execute(
+                    "SELECT 1 FROM membership_subscriptions WHERE id = ?", (candidate,)).fetchone():
+                existing.add(candidate)
+                membership_id = candidate
+        if membership_id is None:
+            membership_id = latest.get(user_id)
+
+        if membership_id is not None:
+            membership_ids[order_id] = str(membership_id)
+            created_for = created.get(membership_id)
+            plan["link"].append({"order_id": order_id, "membership_id": None if created_for else membership_id,
+                                 "user_id": created_for})
+            results["orders_linked"] += 1
+            results["total_fixed"] += 1
+            results["fixes"].append({
+                "type": "success",
+                "order_id": order_id,
+                "membership_id": membership_id,
+                "message": "Linkede ordre #%d til eksisterende medlemskab #%d%s" % (
+                    order_id, membership_id, " (via subscription)" if via_subscription else ""),
+            })
+        else:
+            # create_membership_subscription() does not set _membership_created,
+            # so the creating order itself stays unlinked until the next run
+            membership_id = next_id
+            next_id += 1
+            latest[user_id] = membership_id
+            existing.add(membership_id)
+            created[membership_id] = user_id
+            plan["create"].append({"seq": len(plan["create"]), "order_id": order_id, "user_id": user_id,
+                                   "membership_id": membership_id, "renewal_type": "automatic" if renewal_automatic else "manual"})
+            results["memberships_created"] += 1
+            results["total_fixed"] += 1
+            results["fixes"].append({
+                "type": "success",
+                "order_id": order_id,
+                "membership_id": membership_id,
+                "message": "Oprettede nyt medlemskab #%d for ordre #%d (bruger #%d)" % (membership_id, order_id, user_id),
+            })
+    return results, plan
+
+def write_sql(stream, plan, prefix="wp_", chunk_size=500, utc_offset=0.0, link_created=False):
+    """The repair as one transaction; every step is guarded so a second run changes nothing
+
+    Memberships are only inserted for users that still have none, and
+    links only touch orders whose _membership_created is still empty when
+    the script runs. Links to memberships created by the script are
+    resolved through the user, as get_user_membership() does.
+    """
+    memberships = f"`{prefix}membership_subscriptions`"
+    postmeta = f"`{prefix}postmeta`"
+    links = list(plan["link"])
+    if link_created:
+        links += [{"order_id": row["order_id"], "membership_id": None, "user_id": row["user_id"]} for row in plan["create"]]
+    offset = int(round(utc_offset * 60))
+
+    stream.write(f"-- Membership Manager: reparation af {len(plan['create'])} medlemskaber og {len(links)} ordre-links\n")
+    stream.write(f"-- Genereret {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC. Kør igen uden virkning; ryd objekt-cachen bagefter.\n")
+    if plan["create"]:
+        stream.write(f"-- ADVARSEL: {ROLE_WARNING}\n")
+    stream.write("START TRANSACTION;\n\n")
+
+    stream.write("CREATE TEMPORARY TABLE `mm_repair_create` (seq INT UNSIGNED NOT NULL, order_id BIGINT UNSIGNED NOT NULL, "
+                 "user_id BIGINT UNSIGNED NOT NULL PRIMARY KEY, renewal_type VARCHAR(20) NOT NULL, "
+                 "renewal_token VARCHAR(64) NOT NULL);\n")
+    for statement in insert_statements("mm_repair_create", ["seq", "order_id", "user_id", "renewal_type", "renewal_token"],
+                                       ((row["seq"], row["order_id"], row["user_id"], row["renewal_type"], secrets.token_hex(32))
+                                        for row in plan["create"]), chunk_size):
+        stream.write(statement)
+    # new DateTime() runs in UTC under WordPress; current_time('mysql') is site time
+    stream.write(f"""INSERT INTO {memberships} (user_id, start_date, end_date, status, renewal_type, renewal_token, status_changed_date)
+SELECT c.user_id, UTC_TIMESTAMP(), UTC_TIMESTAMP() + INTERVAL 1 YEAR, 'active', c.renewal_type, c.renewal_token,
+       UTC_TIMESTAMP() + INTERVAL {offset} MINUTE
+FROM `mm_repair_create` c
+WHERE NOT EXISTS (SELECT 1 FROM {memberships} s WHERE s.user_id = c.user_id)
+ORDER BY c.seq;
+
+""")
+
+    stream.write("CREATE TEMPORARY TABLE `mm_repair_link` (order_id BIGINT UNSIGNED NOT NULL PRIMARY KEY, "
+                 "membership_id BIGINT UNSIGNED NULL, user_id BIGINT UNSIGNED NULL, ids_value VARCHAR(64) NULL);\n")
+    for statement in insert_statements("mm_repair_link", ["order_id", "membership_id", "user_id"],
+                                       ((row["order_id"], row["membership_id"], row["user_id"]) for row in links),
+                                       chunk_size):
+        stream.write(statement)
+    stream.write(f"""-- Orders that already have _membership_created are left alone
+DELETE l FROM `mm_repair_link` l
+JOIN {postmeta} pm ON pm.post_id = l.order_id AND pm.meta_key = '_membership_created'
+WHERE pm.meta_value NOT IN ('', '0', 'a:0:{{}}');
+
+UPDATE `mm_repair_link` l
+SET l.membership_id = (SELECT s.id FROM {memberships} s WHERE s.user_id = l.user_id ORDER BY s.end_date DESC, s.id LIMIT 1)
+WHERE l.membership_id IS NULL;
+
+DELETE FROM `mm_repair_link` WHERE membership_id IS NULL;
+
+-- update_post_meta( $order_id, '_membership_ids', array( $id ) ) stores the ID as a string
+UPDATE `mm_repair_link`
+SET ids_value = CONCAT('a:1:{{i:0;s:', CHAR_LENGTH(membership_id), ':"', membership_id, '";}}');
+
+UPDATE {postmeta} pm JOIN `mm_repair_link` l ON pm.post_id = l.order_id
+SET pm.meta_value = CASE pm.meta_key WHEN '_membership_created' THEN '1' ELSE l.ids_value END
+WHERE pm.meta_key IN ('_membership_created', '_membership_ids');
+
+INSERT INTO {postmeta} (post_id, meta_key, meta_value)
+SELECT l.order_id, k.meta_key, CASE k.meta_key WHEN '_membership_created' THEN '1' ELSE l.ids_value END
+FROM `mm_repair_link` l
+CROSS JOIN (SELECT '_membership_created' AS meta_key UNION ALL SELECT '_membership_ids') k
+WHERE NOT EXISTS (SELECT 1 FROM {postmeta} pm WHERE pm.post_id = l.order_id AND pm.meta_key = k.meta_key);
+
+DROP TEMPORARY TABLE `mm_repair_create`;
+DROP TEMPORARY TABLE `mm_repair_link`;
+COMMIT;
+""")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Beregn reparation af medlemskabsdata offline og skriv den som ét SQL-script.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--output", help="Skriv SQL-scriptet hertil (standard: kun opsummering)")
+    parser.add_argument("--prefix", default="wp_", help="WordPress tabelpræfiks")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rækker pr. INSERT i de midlertidige tabeller")
+    parser.add_argument("--utc-offset", type=float, default=0.0, help="Sidens tidszone i timer (til status_changed_date)")
+    parser.add_argument("--link-created", action="store_true",
+                        help="Link også ordren der opretter et medlemskab (admin gør det først ved næste kørsel)")
+    parser.add_argument("--limit", type=int, default=50, help="Antal rettelser der vises (0 = alle)")
+    parser.add_argument("--json", action="store_true", help="Skriv resultatet som JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    results, plan = plan_repairs(connection)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_sql(f, plan, args.prefix, args.chunk_size, args.utc_offset, args.link_created)
+
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        if results["memberships_created"]:
+            print(f"⚠ {ROLE_WARNING}", file=sys.stderr)
+        return 0 if results["success"] else 1
+
+    fixes = results["fixes"]
+    for fix in fixes[:args.limit or None]:
+        print(f"{'✓' if fix['type'] == 'success' else '❌'} {fix['message']}")
+    if args.limit and len(fixes) > args.limit:
+        print(f"   ... og {len(fixes) - args.limit} mere")
+
+    print(f"\n{'='*60}\n📊 Reparationsplan\n{'='*60}")
+    print("   Reparation fuldført: %d problemer rettet (%d ordrer linket, %d medlemskaber oprettet)" % (
+        results["total_fixed"], results["orders_linked"], results["memberships_created"]))
+    if results["memberships_created"]:
+        print("   Medlemskabs-ID'er for nye medlemskaber er dem AUTO_INCREMENT forventes at give")
+        print(f"   ⚠ {ROLE_WARNING}")
+    if args.output:
+        print(f"\n📄 SQL-script skrevet til {args.output}")
+    print(f"\n✅ Planlagt på {time.perf_counter() - started:.2f} s")
+    return 0 if results["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Afstemning af medlemsroller mod medlemskaber
+Sammenholder et snapshot af wp_membership_subscriptions med brugernes roller i wp_usermeta og finder de brugere,
+hvor Membership_Roles har misset en aktivering eller et udløb, og skriver rettelserne som SQL eller et WP-CLI-script
+"""
+
+import argparse
+import json
+import shlex
+import sys
+import time
+from datetime import datetime
+
+from membership_snapshot import get_option, insert_statements, open_snapshot, php_items, sql_literal
+
+ACTIVE_FLAG = "has_active_membership"
+ENDED = ("expired", "cancelled")
+
+# Existing users with an active or ended membership whose role or
+# has_active_membership meta looks out of line; `active` is
+# get_active_members(), `ended` means handle_expiration() has run for one
+# of the user's memberships (expired or cancelled). The instr() test is a
+# cheap superset of "has the role"; plan_roles() checks the parsed value.
+USER_STATE = f"""
+WITH members AS (
+    SELECT user_id, MAX(status = 'active') AS active
+    FROM membership_subscriptions
+    WHERE status = 'active' OR status IN {ENDED}
+    GROUP BY user_id
+), state AS (
+    SELECT u.id, m.active,
+           (SELECT meta_value FROM usermeta WHERE user_id = u.id AND meta_key = :caps_key ORDER BY umeta_id LIMIT 1) AS caps,
+           (SELECT meta_value FROM usermeta WHERE user_id = u.id AND meta_key = :flag_key ORDER BY umeta_id LIMIT 1) AS flag
+    FROM members m
+    JOIN users u ON u.id = m.user_id
+)
+SELECT id, active, caps, flag FROM state
+WHERE CASE WHEN active THEN caps IS NULL OR instr(caps, :role_token) = 0 OR flag IS NOT 'yes'
+           ELSE instr(caps, :role_token) > 0 OR flag IS NOT 'no' END
+"""
+
+# Users with the role and no membership at all; the plugin never removes a
+# role it did not see expire, so these are only counted
+ROLE_WITHOUT_MEMBERSHIP = """
+SELECT COUNT(*) FROM usermeta um JOIN users u ON u.id = um.user_id
+WHERE um.meta_key = :caps_key AND instr(um.meta_value, :role_token) > 0
+  AND NOT EXISTS (SELECT 1 FROM membership_subscriptions s WHERE s.user_id = um.user_id)
+"""
+
+def capability_roles(value):
+    """{role: granted} from a <prefix>capabilities meta value, in stored order"""
+    if value is None or not str(value).strip().startswith("a:"):
+        return {}
+    items = php_items(str(value).strip())
+    return {key: granted not in ("", "0") for key, granted in zip(items[0::2], items[1::2])}
+
+def serialize_capabilities(roles):
+    """The meta value update_user_meta() stores for a WP_User::$caps array"""
+    body = "".join(f's:{len(role.encode("utf-8"))}:"{role}";b:{int(granted)};' for role, granted in roles.items())
+    return f"a:{len(roles)}:{{{body}}}"
+
+def plan_roles(connection, prefix="wp_", member_role=None, remove_role=None, default_role=None):
+    """The summary and per-user changes that would bring roles in line with memberships
+
+    Active members get the member role and has_active_membership = 'yes',
+    as handle_activation() does. Users whose memberships have all ended
+    lose the role and get 'no', as handle_expiration() does; with role
+    removal disabled only the meta is set. Settings come from the snapshot
+    options unless given.
+    """
+    member_role = member_role or get_option(connection, "membership_member_role", "subscriber") or "subscriber"
+    if remove_role is None:
+        remove_role = get_option(connection, "membership_remove_role_on_expiration", "yes") == "yes"
+    default_role = default_role or get_option(connection, "default_role", "subscriber") or "subscriber"
+    summary = {
+        "member_role": member_role,
+        "remove_role": remove_role,
+        "missing_role": 0,
+        "stale_role": 0,
+        "stale_role_kept": 0,
+        "role_without_membership": 0,
+        "missing_users": 0,
+        "flag_only": 0,
+    }
+    changes = []
+    params = {
+        "caps_key": f"{prefix}capabilities",
+        "flag_key": ACTIVE_FLAG,
+        "role_token": f's:{len(member_role.encode("utf-8"))}:"{member_role}";',
+    }
+    summary["role_without_membership"] = connection.execute(ROLE_WITHOUT_MEMBERSHIP, params).fetchone()[0]
+    for user_id, active, caps, flag in connection.execute(USER_STATE, params):
+        roles = capability_roles(caps)
+        has_role = member_role in roles
+        new_roles = None
+        if active and not has_role:
+            new_roles = dict(roles)
+            new_roles[member_role] = True
+            summary["missing_role"] += 1
+        elif not active and has_role:
+            if remove_role:
+                new_roles = {role: granted for role, granted in roles.items() if role != member_role}
+                if not new_roles:
+                    new_roles[default_role] = True
+                summary["stale_role"] += 1
+            else:
+                summary["stale_role_kept"] += 1
+        wanted_flag = "yes" if active else "no"
+        new_caps = serialize_capabilities(new_roles) if new_roles is not None else None
+        if new_caps is not None and new_roles == roles:
+            # The default role is the member role: remove_role() + add_role() is a no-op
+            new_caps = None
+        if new_caps is None and flag == wanted_flag:
+            continue
+        if new_caps is None:
+            summary["flag_only"] += 1
+        changes.append({"user_id": user_id, "active": int(bool(active)), "old_caps": caps if new_caps else None,
+                        "new_caps": new_caps, "flag": wanted_flag})
+
+    # get_user_by() fails for these, so the hooks only log an error
+    summary["missing_users"] = connection.execute(f"""
+        SELECT COUNT(DISTINCT s.user_id) FROM membership_subscriptions s LEFT JOIN users u ON u.id = s.user_id
+        WHERE u.id IS NULL AND (s.status = 'active' OR s.status IN {ENDED})
+    """).fetchone()[0]
+    return summary, changes
+
+def write_sql(stream, changes, prefix="wp_", chunk_size=1000):
+    """The role changes as one transaction, guarded against drift since the snapshot
+
+    A user is skipped when their active/ended state in the live table no
+    longer matches the plan, and capabilities are only replaced while they
+    still hold the value the plan was made from, so a second run is a no-op.
+    """
+    memberships = f"`{prefix}membership_subscriptions`"
+    usermeta = f"`{prefix}usermeta`"
+    caps_key = f"{prefix}capabilities"
+
+    stream.write(f"-- Membership Manager: rolleafstemning for {len(changes)} brugere\n")
+    stream.write(f"-- Genereret {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC. Kør igen uden virkning; ryd objekt-cachen bagefter.\n")
+    stream.write("START TRANSACTION;\n\n")
+    stream.write("CREATE TEMPORARY TABLE `mm_role_change` (user_id BIGINT UNSIGNED NOT NULL PRIMARY KEY, "
+                 "active TINYINT NOT NULL, old_caps LONGTEXT NULL, new_caps LONGTEXT NULL, flag VARCHAR(3) NOT NULL);\n")
+    for statement in insert_statements("mm_role_change", ["user_id", "active", "old_caps", "new_caps", "flag"],
+                                       ((row["user_id"], row["active"], row["old_caps"], row["new_caps"], row["flag"])
+                                        for row in changes), chunk_size):
+        stream.write(statement)
+    stream.write(f"""-- Users whose memberships changed since the snapshot are left to the hooks
+DELETE c FROM `mm_role_change` c
+WHERE c.active <> EXISTS (SELECT 1 FROM {memberships} s WHERE s.user_id = c.user_id AND s.status = 'active');
+
+UPDATE {usermeta} um JOIN `mm_role_change` c ON um.user_id = c.user_id AND um.meta_key = {sql_literal(caps_key)}
+SET um.meta_value = c.new_caps
+WHERE c.new_caps IS NOT NULL AND um.meta_value = c.old_caps;
+
+INSERT INTO {usermeta} (user_id, meta_key, meta_value)
+SELECT c.user_id, {sql_literal(caps_key)}, c.new_caps
+FROM `mm_role_change` c
+WHERE c.new_caps IS NOT NULL AND c.old_caps IS NULL
+  AND NOT EXISTS (SELECT 1 FROM {usermeta} um WHERE um.user_id = c.user_id AND um.meta_key = {sql_literal(caps_key)});
+
+UPDATE {usermeta} um JOIN `mm_role_change` c ON um.user_id = c.user_id AND um.meta_key = '{ACTIVE_FLAG}'
+SET um.meta_value = c.flag;
+
+INSERT INTO {usermeta} (user_id, meta_key, meta_value)
+SELECT c.user_id, '{ACTIVE_FLAG}', c.flag
+FROM `mm_role_change` c
+WHERE NOT EXISTS (SELECT 1 FROM {usermeta} um WHERE um.user_id = c.user_id AND um.meta_key = '{ACTIVE_FLAG}');
+
+DROP TEMPORARY TABLE `mm_role_change`;
+COMMIT;
+""")
+
+# One `wp eval` per chunk. The live table is asked again so a user whose
+# state changed since the snapshot is skipped; WP_User does the role work,
+# which keeps user_level and the object cache right.
+WP_EVAL = """global $wpdb;
+$ids = array( %(ids)s );
+$active = array_map( 'intval', $wpdb->get_col( "SELECT DISTINCT user_id FROM {$wpdb->prefix}membership_subscriptions WHERE status = 'active' AND user_id IN (" . implode( ',', $ids ) . ")" ) );
+$done = 0;
+foreach ( $ids as $id ) {
+    $user = get_user_by( 'ID', $id );
+    if ( ! $user || in_array( $id, $active, true ) !== %(active)s ) {
+        continue;
+    }
+%(body)s
+    $done++;
+}
+WP_CLI::log( sprintf( '%%d af %%d brugere rettet', $done, count( $ids ) ) );"""
+
+ACTIVATE = """    $user->add_role( %(role)s );
+    update_user_meta( $id, 'has_active_membership', 'yes' );"""
+
+EXPIRE = """    $user->remove_role( %(role)s );
+    if ( empty( $user->roles ) ) {
+        $user->add_role( get_option( 'default_role', 'subscriber' ) );
+    }
+    update_user_meta( $id, 'has_active_membership', 'no' );"""
+
+EXPIRE_KEEP_ROLE = """    update_user_meta( $id, 'has_active_membership', 'no' );"""
+
+def php_string(value):
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def write_wp_cli(stream, changes, member_role, remove_role=True, chunk_size=1000):
+    """The role changes as a shell script of batched `wp eval` calls"""
+    stream.write("#!/bin/sh\n")
+    stream.write(f"# Membership Manager: rolleafstemning for {len(changes)} brugere\n")
+    stream.write(f"# Genereret {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC. Kør fra WordPress-roden; kan køres igen uden virkning.\n")
+    stream.write("set -e\n")
+    role = php_string(member_role)
+    for active, body in ((True, ACTIVATE), (False, EXPIRE if remove_role else EXPIRE_KEEP_ROLE)):
+        ids = [row["user_id"] for row in changes if bool(row["active"]) == active]
+        for start in range(0, len(ids), chunk_size):
+            code = WP_EVAL % {
+                "ids": ", ".join(str(user_id) for user_id in ids[start:start + chunk_size]),
+                "active": "true" if active else "false",
+                "body": body % {"role": role},
+            }
+            stream.write(f"wp eval {shlex.quote(code)}\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Afstem brugerroller mod medlemskaber ud fra et snapshot.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--prefix", default="wp_", help="WordPress tabelpræfiks (capabilities-nøglen er <præfiks>capabilities)")
+    parser.add_argument("--sql", help="Skriv rettelserne som SQL-script hertil")
+    parser.add_argument("--wp-cli", help="Skriv rettelserne som shell-script med wp eval hertil")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Brugere pr. INSERT eller wp eval")
+    parser.add_argument("--member-role", help="Medlemsrolle (standard: membership_member_role fra snapshottet)")
+    parser.add_argument("--keep-role", action="store_true", help="Fjern ikke rollen ved udløb, uanset indstillingen")
+    parser.add_argument("--limit", type=int, default=20, help="Antal brugere der vises (0 = alle)")
+    parser.add_argument("--json", action="store_true", help="Skriv opsummering og ændringer som JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    loaded = time.perf_counter()
+    summary, changes = plan_roles(connection, args.prefix, args.member_role, False if args.keep_role else None)
+    planned = time.perf_counter()
+    if args.sql:
+        with open(args.sql, "w", encoding="utf-8") as f:
+            write_sql(f, changes, args.prefix, args.chunk_size)
+    if args.wp_cli:
+        with open(args.wp_cli, "w", encoding="utf-8") as f:
+            write_wp_cli(f, changes, summary["member_role"], summary["remove_role"], args.chunk_size)
+
+    if args.json:
+        json.dump({"summary": summary, "changes": changes}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    for row in changes[:args.limit or None]:
+        if row["new_caps"] is None:
+            print(f"✓ Bruger #{row['user_id']}: has_active_membership → {row['flag']}")
+        else:
+            roles = ", ".join(role for role, granted in capability_roles(row["new_caps"]).items() if granted)
+            print(f"✓ Bruger #{row['user_id']}: roller → {roles}")
+    if args.limit and len(changes) > args.limit:
+        print(f"   ... og {len(changes) - args.limit} mere")
+
+    role = summary["member_role"]
+    print(f"\n{'='*60}\n📊 Rolleafstemning ({role})\n{'='*60}")
+    print(f"   Aktive medlemmer uden rollen: {summary['missing_role']}")
+    print(f"   Udløbne medlemmer med rollen: {summary['stale_role'] + summary['stale_role_kept']}")
+    if summary["stale_role_kept"]:
+        print(f"   ⚠ Rollefjernelse er deaktiveret; {summary['stale_role_kept']} beholder rollen")
+    print(f"   Kun has_active_membership rettet: {summary['flag_only']}")
+    print(f"   Har rollen uden noget medlemskab (røres ikke): {summary['role_without_membership']}")
+    if summary["missing_users"]:
+        print(f"   ⚠ Medlemskaber for {summary['missing_users']} brugere der ikke findes")
+    for path in (args.sql, args.wp_cli):
+        if path:
+            print(f"\n📄 Skrevet til {path}")
+    print(f"\n✅ Indlæst på {loaded - started:.2f} s, afstemt på {planned - loaded:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
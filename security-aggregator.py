@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Glidende vinduer over Membership Manager sikkerhedshændelser
+Læser SECURITY EVENT-linjer fra membership.log eller rækker fra wp_membership_security_log trinvist, tæller pr. IP,
+bruger og hændelse i minut-, time- og døgnvinduer i ringbuffere og viser top-N samt alarmer ved udbrud
+"""
+
+import argparse
+import heapq
+import json
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+
+from membership_log import LOG_DIR, epoch, head_hash, log_files
+
+DEFAULT_STATE = os.path.join(LOG_DIR, "security-windows.state")
+STATE_VERSION = 1
+
+# name, buckets, seconds per bucket. A count is exact to one bucket, so
+# "minute" is the last 60 seconds in 5-second steps.
+WINDOWS = [("minute", 12, 5), ("hour", 60, 60), ("day", 24, 3600)]
+WINDOW_NAMES = [name for name, _, _ in WINDOWS]
+DIMENSIONS = ["ip", "user", "event"]
+DIMENSION_NAMES = {"ip": "IP", "user": "bruger", "event": "hændelse"}
+WINDOW_LABELS = {"minute": "minut", "hour": "time", "day": "døgn"}
+
+# Counts at which a key raises an alert, per dimension and window
+THRESHOLDS = {
+    "ip": {"minute": 30, "hour": 300, "day": 2000},
+    "user": {"minute": 20, "hour": 200, "day": 1000},
+    "event": {"minute": 300, "hour": 3000, "day": 30000},
+}
+MAX_KEYS = 50000
+MAX_ALERTS = 1000
+READ_SIZE = 1 << 24
+
+# Membership_Security::log_security_event() through Membership_Manager::log():
+# SECURITY EVENT: %s | User: %d | IP: %s | Context: %s
+SECURITY_LINE = re.compile(
+    rb"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] \[[^\]\n]*\] - SECURITY EVENT: ([^\n]*) \| User: (-?\d+) \| IP: ([^|\n]*?) \| Context: ",
+    re.M)
+
+class SlidingWindows:
+    """Event counts per key over each of the WINDOWS
+
+    Every key gets a slot. The buckets of one window live in a flat array
+    with `buckets` entries per slot, next to the slot's running total and
+    newest bucket number; a bucket is emptied when the ring comes round to
+    it again. Adding events is a handful of array operations and memory is
+    fixed per key: keys with nothing left in any window are dropped by
+    prune(), and above max_keys the quietest keys are dropped as well.
+    A key alerts once when it reaches a window's threshold and again only
+    after falling below half of it, so a steady flood is one alert.
+    """
+
+    def __init__(self, thresholds=None, max_keys=MAX_KEYS):
+        self.thresholds = [(thresholds or {}).get(name) for name in WINDOW_NAMES]
+        self.max_keys = max_keys
+        self.slots = {}
+        self.keys = []
+        self.free = []
+        self.counts = [array("I") for _ in WINDOWS]
+        self.totals = [array("I") for _ in WINDOWS]
+        self.heads = [array("q") for _ in WINDOWS]
+        self.armed = [array("b") for _ in WINDOWS]
+        self.zero = [array("I", bytes(4 * size)) for _, size, _ in WINDOWS]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _allocate(self, key):
+        if self.free:
+            slot = self.free.pop()
+            self.keys[slot] = key
+        else:
+            slot = len(self.keys)
+            self.keys.append(key)
+            for index in range(len(WINDOWS)):
+                self.counts[index].extend(self.zero[index])
+                self.totals[index].append(0)
+                self.heads[index].append(-1)
+                self.armed[index].append(1)
+        self.slots[key] = slot
+        return slot
+
+    def _release(self, slot):
+        del self.slots[self.keys[slot]]
+        self.keys[slot] = None
+        for index, (_, size, _) in enumerate(WINDOWS):
+            self.counts[index][slot * size:(slot + 1) * size] = self.zero[index]
+            self.totals[index][slot] = 0
+            self.heads[index][slot] = -1
+            self.armed[index][slot] = 1
+        self.free.append(slot)
+
+    def add(self, key, second, count=1):
+        """Count events for `key` at `second`; returns [(window, total)] for each threshold reached"""
+        slot = self.slots.get(key)
+        if slot is None:
+            if len(self.slots) >= self.max_keys:
+                self.prune(second)
+            slot = self._allocate(key)
+        crossed = []
+        for (name, size, width), counts, totals, heads, armed, zero, limit in zip(
+                WINDOWS, self.counts, self.totals, self.heads, self.armed, self.zero, self.thresholds):
+            bucket = second // width
+            head = heads[slot]
+            base = slot * size
+            if bucket > head:
+                if bucket - head >= size:
+                    counts[base:base + size] = zero
+                    totals[slot] = 0
+                else:
+                    # The buckets after head up to this one, wrapping at most once
+                    start = base + (head + 1) % size
+                    first = min(bucket - head, base + size - start)
+                    rest = bucket - head - first
+                    totals[slot] -= sum(counts[start:start + first]) + sum(counts[base:base + rest])
+                    counts[start:start + first] = zero[:first]
+                    if rest:
+                        counts[base:base + rest] = zero[:rest]
+                heads[slot] = bucket
+            elif head - bucket >= size:
+                continue  # Older than the window
+            counts[base + bucket % size] += count
+            total = totals[slot] = totals[slot] + count
+            if limit:
+                if total >= limit:
+                    if armed[slot]:
+                        armed[slot] = 0
+                        crossed.append((name, total))
+                elif total * 2 < limit:
+                    armed[slot] = 1
+        return crossed
+
+    def total(self, slot, index, now):
+        """Events of a slot in window `index` as seen at `now`, without changing the ring"""
+        _, size, width = WINDOWS[index]
+        head = self.heads[index][slot]
+        gap = now // width - head
+        if gap <= 0:
+            return self.totals[index][slot]
+        if gap >= size:
+            return 0
+        counts = self.counts[index]
+        base = slot * size
+        return self.totals[index][slot] - sum(counts[base + (head + step) % size] for step in range(1, gap + 1))
+
+    def prune(self, now):
+        """Drop keys with nothing in any window at `now`; over 90% of max_keys, the quietest too"""
+        index = len(WINDOWS) - 1
+        _, size, width = WINDOWS[index]
+        heads = self.heads[index]
+        idle = [slot for slot in self.slots.values() if now // width - heads[slot] >= size]
+        for slot in idle:
+            self._release(slot)
+        excess = len(self.slots) - self.max_keys * 9 // 10
+        if excess > 0:
+            # The stored totals lag by at most the expired buckets, which is
+            # close enough to pick the quietest keys without a pass per key
+            for slot in heapq.nsmallest(excess, self.slots.values(), key=self.totals[index].__getitem__):
+                self._release(slot)
+        return len(idle)
+
+    def top(self, window, now, limit=10):
+        """[(count, key)] of the busiest keys in a window at `now`"""
+        index = WINDOW_NAMES.index(window)
+        counted = ((self.total(slot, index, now), key) for key, slot in self.slots.items())
+        return [(count, key) for count, key in heapq.nlargest(limit, counted, key=lambda item: item[0]) if count]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["zero"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.zero = [array("I", bytes(4 * size)) for _, size, _ in WINDOWS]
+
+class SecurityAggregator:
+    """The windows for every dimension, the alerts raised and how far each source has been read"""
+
+    def __init__(self, source, thresholds=THRESHOLDS, max_keys=MAX_KEYS):
+        self.version = STATE_VERSION
+        self.source = source
+        self.windows = {dimension: SlidingWindows(thresholds.get(dimension), max_keys) for dimension in DIMENSIONS}
+        self.alerts = deque(maxlen=MAX_ALERTS)
+        self.raised = 0
+        self.now = 0
+        self.events = 0
+        # Log files by head_hash() and the bytes read; the last row id read
+        self.files = {}
+        self.last_id = 0
+
+    def set_thresholds(self, thresholds):
+        for dimension, windows in self.windows.items():
+            windows.thresholds = [thresholds.get(dimension, {}).get(name) for name in WINDOW_NAMES]
+
+    def flush(self, second, batch):
+        """Add one second's {key: count} per dimension to the windows"""
+        for dimension, counted in zip(DIMENSIONS, batch):
+            windows = self.windows[dimension]
+            for key, count in counted.items():
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8", "replace")
+                if dimension == "user":
+                    # Logged-out visitors are user 0 and say nothing about one account
+                    key = int(key)
+                    if not key:
+                        continue
+                elif not key:
+                    continue
+                for window, total in windows.add(key, second, count):
+                    self.alerts.append((second, dimension, key, window, total))
+                    self.raised += 1
+        self.now = max(self.now, second)
+
+    def feed(self, events):
+        """Add (second, ip, user, event) tuples, grouped by second; returns how many there were"""
+        ips, users, names = {}, {}, {}
+        current = None
+        count = 0
+        for second, ip, user, event in events:
+            if second != current:
+                if current is not None:
+                    self.flush(current, (ips, users, names))
+                    ips, users, names = {}, {}, {}
+                current = second
+            ips[ip] = ips.get(ip, 0) + 1
+            users[user] = users.get(user, 0) + 1
+            names[event] = names.get(event, 0) + 1
+            count += 1
+        if current is not None:
+            self.flush(current, (ips, users, names))
+        self.events += count
+        return count
+
+    def prune(self):
+        return sum(windows.prune(self.now) for windows in self.windows.values())
+
+def parse_events(block, end):
+    """(second, ip, user, event) for the SECURITY EVENT lines in block[:end], user as bytes"""
+    last = None
+    for timestamp, event, user, ip in SECURITY_LINE.findall(block, 0, end):
+        if timestamp != last:
+            last = timestamp
+            second = epoch(timestamp)
+        yield second, ip, user, event
+
+def ingest_log(aggregator, paths):
+    """Add the SECURITY EVENT lines written since the last run; returns the number of events
+
+    Files are recognised by their first line like in log-index.py, so the
+    active log is not read again after rotation renames it. The file is
+    read in blocks cut at the last whole line, which keeps memory flat
+    however large the log, and only the matching lines cost Python work.
+    """
+    seen = {}
+    events = 0
+    for path in paths:
+        digest = head_hash(path)
+        if digest is None:
+            continue
+        position = aggregator.files.get(digest, 0)
+        with open(path, "rb") as f:
+            f.seek(position)
+            while True:
+                block = f.read(READ_SIZE)
+                end = block.rfind(b"\n") + 1
+                if not end:
+                    break
+                events += aggregator.feed(parse_events(block, end))
+                position += end
+                f.seek(position)
+        seen[digest] = position
+    aggregator.files = seen
+    return events
+
+def ingest_database(aggregator, path):
+    """Add security_log rows with an id above the last one read, from a snapshot (see dump-loader.py)
+
+    created_at is current_time('mysql'), the site's local time, where the
+    log lines are UTC; windows only compare events of the same source.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT id, created_at, ip_address, COALESCE(user_id, 0), event FROM security_log "
+            "WHERE id > ? AND created_at >= '1970-01-02' ORDER BY id", (aggregator.last_id,))
+        last = [aggregator.last_id]
+
+        def events():
+            for row_id, created_at, ip, user, event in rows:
+                last[0] = row_id
+                yield epoch(created_at.encode("ascii")), ip, user, event
+
+        count = aggregator.feed(events())
+        aggregator.last_id = last[0]
+    finally:
+        connection.close()
+    return count
+
+def load_state(path, source):
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        return SecurityAggregator(source)
+    if getattr(state, "version", None) != STATE_VERSION:
+        return SecurityAggregator(source)
+    if state.source != source:
+        raise ValueError(f"{path} hører til kilden {state.source}; brug --state for en anden fil")
+    return state
+
+def save_state(path, aggregator):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(aggregator, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+def parse_threshold(value):
+    """dimension:window=count, e.g. ip:minute=50"""
+    match = re.fullmatch(r"(\w+):(\w+)=(\d+)", value)
+    if not match or match.group(1) not in DIMENSIONS or match.group(2) not in WINDOW_NAMES:
+        raise argparse.ArgumentTypeError(f"forventede fx ip:minute=50, fik {value}")
+    return match.group(1), match.group(2), int(match.group(3))
+
+def format_time(second):
+    return datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S") if second else "-"
+
+def report(aggregator, alerts, limit):
+    return {
+        "now": format_time(aggregator.now),
+        "events": aggregator.events,
+        "keys": {dimension: len(windows) for dimension, windows in aggregator.windows.items()},
+        "top": {window: {dimension: [{"key": key, "count": count}
+                                     for count, key in windows.top(window, aggregator.now, limit)]
+                         for dimension, windows in aggregator.windows.items()}
+                for window in WINDOW_NAMES},
+        "alerts": [{"time": format_time(second), "dimension": dimension, "key": key, "window": window, "count": total}
+                   for second, dimension, key, window, total in alerts],
+    }
+
+def print_report(data, new_events, elapsed):
+    print(f"{'='*60}\n📊 Sikkerhedshændelser pr. {data['now']}\n{'='*60}")
+    print(f"   {new_events} nye hændelser på {elapsed:.2f} s, {data['events']} i alt; "
+          + ", ".join(f"{count} {DIMENSION_NAMES[dimension]}" for dimension, count in data["keys"].items()) + " følges")
+    for window, dimensions in data["top"].items():
+        print(f"\n   Seneste {WINDOW_LABELS[window]}:")
+        for dimension, entries in dimensions.items():
+            if entries:
+                print(f"   {DIMENSION_NAMES[dimension]:>9}: " + ", ".join(f"{entry['key']} ({entry['count']})" for entry in entries))
+    if data["alerts"]:
+        print(f"\n⚠ {len(data['alerts'])} alarmer:")
+        for alert in data["alerts"]:
+            print(f"   {alert['time']} {DIMENSION_NAMES[alert['dimension']]} {alert['key']}: "
+                  f"{alert['count']} på et {WINDOW_LABELS[alert['window']]}")
+    else:
+        print("\n✅ Ingen nye alarmer")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tæl sikkerhedshændelser i glidende vinduer og vis top-N og alarmer.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--log-dir", default=LOG_DIR, help="Mappe med membership.log (standard)")
+    source.add_argument("--database", help="SQLite-snapshot med security_log i stedet for loggen (se dump-loader.py)")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="Fil med vinduerne mellem kørsler")
+    parser.add_argument("--reset", action="store_true", help="Start forfra i stedet for at fortsætte fra tilstandsfilen")
+    parser.add_argument("--threshold", type=parse_threshold, action="append", default=[],
+                        help="Alarmgrænse som dimension:vindue=antal, fx ip:minute=50 (kan gentages)")
+    parser.add_argument("--max-keys", type=int, default=MAX_KEYS, help="Højeste antal nøgler der følges pr. dimension")
+    parser.add_argument("--top", type=int, default=5, help="Antal nøgler pr. dimension og vindue")
+    parser.add_argument("--json", action="store_true", help="Skriv resultatet som JSON")
+    args = parser.parse_args(argv)
+
+    kind = f"database:{os.path.abspath(args.database)}" if args.database else "log"
+    try:
+        aggregator = SecurityAggregator(kind) if args.reset else load_state(args.state, kind)
+    except ValueError as error:
+        print(f"❌ {error}")
+        return 1
+    thresholds = {dimension: dict(windows) for dimension, windows in THRESHOLDS.items()}
+    for dimension, window, count in args.threshold:
+        thresholds[dimension][window] = count
+    aggregator.set_thresholds(thresholds)
+    for windows in aggregator.windows.values():
+        windows.max_keys = args.max_keys
+
+    started = time.perf_counter()
+    raised = aggregator.raised
+    if args.database:
+        new_events = ingest_database(aggregator, args.database)
+    else:
+        new_events = ingest_log(aggregator, log_files(args.log_dir))
+    aggregator.prune()
+    elapsed = time.perf_counter() - started
+    save_state(args.state, aggregator)
+
+    new_alerts = min(aggregator.raised - raised, len(aggregator.alerts))
+    alerts = list(aggregator.alerts)[len(aggregator.alerts) - new_alerts:]
+    data = report(aggregator, alerts, args.top)
+    if args.json:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(data, new_events, elapsed)
+    return 1 if alerts else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
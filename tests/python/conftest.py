@@ -0,0 +1,33 @@
+import csv
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+def load_script(name):
+    """Import a hyphenated top-level script such as reminder-mailer.py as a module"""
+    module_name = name.replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def write_snapshot(directory, tables):
+    """Write {table: (header, rows)} as a CSV snapshot directory and return its path"""
+    for table, (header, rows) in tables.items():
+        with open(os.path.join(directory, f"{table}.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return str(directory)
+
+@pytest.fixture
+def root():
+    return ROOT
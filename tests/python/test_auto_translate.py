@@ -0,0 +1,75 @@
+import glob
+import os
+import re
+
+import pytest
+
+from conftest import ROOT, load_script
+from translation_catalogue import open_catalogue
+
+auto_translate = load_script("auto-translate")
+
+def baseline_translate(content, translations):
+    """translate_content() before the single-pass engine: two regexes per dictionary entry"""
+    changes = 0
+    for english, danish in translations.items():
+        english_escaped = re.escape(english)
+        danish_escaped = danish.replace('\\', '\\\\').replace("'", "\\'")
+        pattern1 = rf"__\(\s*['\"]{english_escaped}['\"]\s*,\s*['\"]membership-manager['\"]\s*\)"
+        content, n1 = re.subn(pattern1, f"__( '{danish_escaped}', 'membership-manager' )", content)
+        pattern2 = rf"_e\(\s*['\"]{english_escaped}['\"]\s*,\s*['\"]membership-manager['\"]\s*\)"
+        content, n2 = re.subn(pattern2, f"_e( '{danish_escaped}', 'membership-manager' )", content)
+        changes += n1 + n2
+    return content, changes
+
+@pytest.fixture(scope="module")
+def catalogue():
+    return open_catalogue()
+
+@pytest.fixture(scope="module")
+def translations(catalogue):
+    return dict(catalogue.items())
+
+def php_literal(text, quote):
+    return f"{quote}{text}{quote}"
+
+def assert_same(content, catalogue, translations):
+    assert auto_translate.translate_content(content, catalogue) == baseline_translate(content, translations)
+
+def test_other_domain_before_plugin_call(catalogue, translations):
+    content = "<?php echo __( 'Foo', 'other' ) . __( 'Active', 'membership-manager' );\n"
+    translated, changes = auto_translate.translate_content(content, catalogue)
+    assert changes == 1
+    assert "__( 'Foo', 'other' )" in translated
+    assert "'Active'" not in translated
+    assert_same(content, catalogue, translations)
+
+@pytest.mark.parametrize("line", [
+    "_e( 'Active', 'membership-manager' ); _e( \"Expired\", \"membership-manager\" );",
+    "__( 'Active', 'woocommerce' ) . __( 'Expired', 'membership-manager' ) . _e( 'Active', 'other' );",
+    "printf( __( 'Active', 'membership-manager' ), __( 'Unknown text', 'membership-manager' ) );",
+    "esc_html__( 'Active', 'membership-manager' ) . esc_html_e( 'Expired' , 'membership-manager' )",
+    "__( 'It\\'s', 'other' ) . __( 'Active', 'membership-manager' )",
+    "__( \"Say \\\"hi\\\"\", 'other' ); __( 'Active',\n    'membership-manager'\n);",
+])
+def test_same_line_and_mixed_domains(line, catalogue, translations):
+    assert_same(f"<?php\n{line}\n", catalogue, translations)
+
+def test_every_catalogue_entry(catalogue, translations):
+    lines = []
+    for number, english in enumerate(translations):
+        quote = '"' if "'" in english and '"' not in english else "'"
+        if quote in english or "\\" in english or "$" in english:
+            continue
+        domain = "'other'" if number % 5 == 0 else "'membership-manager'"
+        function = "_e" if number % 2 else "__"
+        lines.append(f"{function}( 'Foo', 'other' ) . {function}( {php_literal(english, quote)}, {domain} );")
+    assert_same("<?php\n" + "\n".join(lines) + "\n", catalogue, translations)
+
+def test_plugin_files(catalogue, translations):
+    paths = sorted(glob.glob(os.path.join(ROOT, "includes", "**", "*.php"), recursive=True)
+                   + glob.glob(os.path.join(ROOT, "admin", "**", "*.php"), recursive=True))
+    assert paths
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            assert_same(f.read(), catalogue, translations)
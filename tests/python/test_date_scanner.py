@@ -0,0 +1,69 @@
+import io
+from datetime import datetime, timedelta
+
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+date_scanner = load_script("date-scanner")
+
+NOW_UTC = datetime(2025, 6, 1, 12, 0, 0)
+
+def store(tmp_path):
+    columns = ["id", "user_id", "start_date", "end_date", "status", "paused_date", "status_changed_date"]
+    return write_snapshot(tmp_path, {"membership_subscriptions": (columns, [
+        # PHP rolls 2024-00-00 over to 2023-11-30
+        [1, 1, "2024-00-00 10:00:00", "0000-00-00 00:00:00", "active", "", ""],
+        # Feb 29 + 1 year is Mar 1, as modify( '+1 year' ) gives
+        [2, 2, "2024-02-29 08:00:00", "", "active", "", ""],
+        # No usable start_date: end_date becomes a year from the run
+        [3, 3, "", "1969-12-31 00:00:00", "active", "", ""],
+        [4, 4, "ikke en dato", "0000-00-00 00:00:00", "expired", "", ""],
+        [5, 5, "2025-05-01 00:00:00", "2025-01-01 00:00:00", "active", "", ""],
+        [6, 6, "2024-01-01 00:00:00", "2026-01-01 00:00:00", "active", "2025-01-01 00:00:00", ""],
+        [7, 7, "2024-01-01 00:00:00", "2026-01-01 00:00:00", "on-hold", "2025-01-01 00:00:00", ""],
+        # Site time is UTC+2 below: 13:30 is in the past, 14:30 in the future
+        [8, 8, "2024-01-01 00:00:00", "2026-01-01 00:00:00", "active", "", "2025-06-01 13:30:00"],
+        [9, 9, "2024-01-01 00:00:00", "2026-01-01 00:00:00", "active", "", "2025-06-01 14:30:00"],
+        [10, 10, "2024-01-01 00:00:00", "2026-01-01 00:00:00", "active", "", "2025-01-01 00:00:00"],
+    ])})
+
+def scanned(tmp_path, utc_offset):
+    connection = open_snapshot(store(tmp_path))
+    site_now = (NOW_UTC + timedelta(hours=utc_offset)).strftime("%Y-%m-%d %H:%M:%S")
+    date_scanner.scan(connection, site_now)
+    return connection
+
+def test_fixes(tmp_path):
+    connection = scanned(tmp_path, 2)
+    found = {fix["id"]: (fix["issues"], fix["new_end_date"]) for fix in date_scanner.fixes(connection)}
+    assert found == {
+        1: (["end_date"], "2024-11-30 10:00:00"),
+        2: (["end_date"], "2025-03-01 08:00:00"),
+        3: (["end_date"], None),
+        4: (["end_date"], None),
+        5: (["start_after_end"], "2026-05-01 00:00:00"),
+        6: (["paused_date"], None),
+        9: (["status_changed_date"], None),
+    }
+    summary = date_scanner.summarize(connection, NOW_UTC)
+    assert summary["scanned"] == 10 and summary["rows"] == 7
+    assert summary["issues"] == {"end_date": 4, "start_after_end": 1, "paused_date": 1, "status_changed_date": 1}
+    assert summary["end_from_now"] == 2
+    assert summary["end_from_now_value"] == "2026-06-01 12:00:00"
+
+def test_utc_offset_moves_now(tmp_path):
+    flagged = {fix["id"] for fix in date_scanner.fixes(scanned(tmp_path, 0)) if "status_changed_date" in fix["issues"]}
+    assert flagged == {8, 9}
+
+def test_chunks_and_sql(tmp_path):
+    connection = scanned(tmp_path, 2)
+    assert connection.execute(date_scanner.CHUNKS, (2,)).fetchall() == [(1, 2), (3, 4), (5, 6), (9, 9)]
+    stream = io.StringIO()
+    date_scanner.write_sql(stream, connection, prefix="wp_", chunk_size=2, utc_offset=2)
+    sql = stream.getvalue()
+    assert sql.startswith("-- Membership Manager: datooprydning af 7 medlemskaber\n")
+    assert [line for line in sql.splitlines() if line.startswith("WHERE f.id BETWEEN")] == [
+        "WHERE f.id BETWEEN 1 AND 2;", "WHERE f.id BETWEEN 3 AND 4;",
+        "WHERE f.id BETWEEN 5 AND 6;", "WHERE f.id BETWEEN 9 AND 9;"]
+    assert "UTC_TIMESTAMP() + INTERVAL 120 MINUTE" in sql
+    assert "(3, NULL, 1, 0, 0)" in sql
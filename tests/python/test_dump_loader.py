@@ -0,0 +1,83 @@
+import sqlite3
+
+from conftest import load_script
+
+dump_loader = load_script("dump-loader")
+
+# mysqldump output, one extended INSERT per line
+DUMP = r"""-- MySQL dump 10.13
+CREATE TABLE `wp_membership_subscriptions` (
+  `id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `user_id` bigint(20) unsigned NOT NULL,
+  `start_date` datetime NOT NULL,
+  `end_date` datetime NOT NULL,
+  `status` varchar(20) NOT NULL,
+  `renewal_type` varchar(20) NOT NULL DEFAULT 'manual',
+  `renewal_token` varchar(64) NOT NULL DEFAULT '',
+  `paused_date` datetime DEFAULT NULL,
+  `status_changed_date` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `wp_membership_subscriptions` VALUES (1,10,'2024-01-01 00:00:00','2025-01-01 00:00:00','active','manual','it\'s',NULL,'2024-01-01 00:00:00'),(2,11,'0000-00-00 00:00:00','2024-02-30 00:00:00','expired','automatic','ends with \\',NULL,NULL);
+INSERT INTO `wp_membership_subscriptions` VALUES (3,12,'2024-03-01 00:00:00','2025-03-01 00:00:00','active','manual','nul\0byte, (paren) \'q\'\n','2024-02-30 12:00:00',NULL);
+CREATE TABLE `wp_options` (
+  `option_id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `option_name` varchar(191) NOT NULL DEFAULT '',
+  `option_value` longtext NOT NULL,
+  `autoload` varchar(20) NOT NULL DEFAULT 'yes',
+  PRIMARY KEY (`option_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `wp_options` VALUES (1,'binary_text',_binary 'a,b\'c 0x41','yes'),(2,'hex_value',0x6162632c29,'yes'),(3,'_transient_cache','skip','no');
+CREATE TABLE `wp_comments` (
+  `comment_ID` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `comment_post_ID` bigint(20) unsigned NOT NULL DEFAULT '0',
+  `comment_date` datetime NOT NULL DEFAULT '0000-00-00 00:00:00',
+  `comment_content` text NOT NULL,
+  `comment_type` varchar(20) NOT NULL DEFAULT 'comment',
+  PRIMARY KEY (`comment_ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `wp_comments` VALUES (1,20,'2025-01-02 10:00:00','Status changed to On hold.','order_note'),(2,20,'2025-03-01 10:00:00','Tak for din ordre','order_note'),(3,21,'2025-03-01 10:00:00','Fin side','comment');
+CREATE TABLE `wp_commentmeta` (
+  `meta_id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `comment_id` bigint(20) unsigned NOT NULL DEFAULT '0',
+  `meta_key` varchar(255) DEFAULT NULL,
+  `meta_value` longtext,
+  PRIMARY KEY (`meta_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `wp_commentmeta` VALUES (1,2,'is_customer_note','1');
+"""
+
+TABLES = ["membership_subscriptions", "options", "order_notes"]
+
+def load(tmp_path, jobs):
+    dump = tmp_path / "dump.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    output = tmp_path / f"snapshot-{jobs}.sqlite"
+    counts, _, invalid, _ = dump_loader.load_dump(str(dump), str(output), tables=TABLES, jobs=jobs)
+    connection = sqlite3.connect(output)
+    rows = {table: connection.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall() for table in TABLES}
+    connection.close()
+    return counts, invalid, rows
+
+def test_escapes_and_dates(tmp_path):
+    counts, invalid, rows = load(tmp_path, 1)
+    assert rows["membership_subscriptions"] == [
+        (1, 10, "2024-01-01 00:00:00", "2025-01-01 00:00:00", "active", "manual", "it's", None, "2024-01-01 00:00:00"),
+        # 2024-02-30 is not a date: NOT NULL columns get their default, nullable ones NULL
+        (2, 11, "0000-00-00 00:00:00", "0000-00-00 00:00:00", "expired", "automatic", "ends with \\", None, None),
+        (3, 12, "2024-03-01 00:00:00", "2025-03-01 00:00:00", "active", "manual", "nul\0byte, (paren) 'q'\n", None, None),
+    ]
+    assert invalid["membership_subscriptions"] == 2
+    # Transients are left out; _binary strings are text and 0x values the bytes they encode
+    assert [row[:2] for row in rows["options"]] == [("binary_text", "a,b'c 0x41"), ("hex_value", b"abc,)")]
+    assert counts["options"] == 2
+
+def test_customer_note_from_commentmeta(tmp_path):
+    _, _, rows = load(tmp_path, 1)
+    assert rows["order_notes"] == [
+        (1, 20, "2025-01-02 10:00:00", "Status changed to On hold.", 0),
+        (2, 20, "2025-03-01 10:00:00", "Tak for din ordre", 1),
+    ]
+
+def test_jobs_give_the_same_snapshot(tmp_path):
+    assert load(tmp_path, 2) == load(tmp_path, 1)
@@ -0,0 +1,31 @@
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+email_templates = load_script("email-templates")
+
+def recipient(reminder_type, renewal_type="manual"):
+    return {"email": "medlem@example.dk", "display_name": "Medlem", "end_date": "2026-06-01",
+            "renewal_type": renewal_type, "reminder_type": reminder_type, "renewal_token": "abc"}
+
+def subjects_for(compiled, subjects):
+    recipients = [recipient(reminder_type) for reminder_type in email_templates.REMINDER_TYPES]
+    messages = email_templates.render_messages(compiled, recipients, "j. F Y", "da", "https://example.dk", subjects)
+    return {message["reminder_type"]: message["subject"] for message in messages}
+
+def test_subject_options_override_defaults(tmp_path):
+    snapshot = write_snapshot(tmp_path, {"options": (["option_name", "option_value"], [
+        ["membership_reminder_7_subject", "Husk at forny – 7 dage tilbage"],
+        ["membership_reminder_1_subject", ""],
+    ])})
+    compiled = email_templates.compile_templates("da_DK")
+
+    subjects = subjects_for(compiled, email_templates.reminder_subjects(open_snapshot(snapshot)))
+    assert subjects["7_days"] == "Husk at forny – 7 dage tilbage"
+    # A stored empty subject is kept, as get_option() does; the mailer then refuses the message
+    assert subjects["1_day"] == ""
+    assert subjects["30_days"] == email_templates.SUBJECTS["30_days"]
+    assert subjects["14_days"] == email_templates.SUBJECTS["14_days"]
+
+def test_defaults_without_snapshot():
+    compiled = email_templates.compile_templates("da_DK")
+    assert subjects_for(compiled, None) == email_templates.SUBJECTS
@@ -0,0 +1,12 @@
+import os
+
+from conftest import ROOT, load_script
+
+make_pot = load_script("make-pot")
+
+def test_check_ignores_generation_date():
+    paths = [os.path.join(ROOT, path) for path in make_pot.DEFAULT_PATHS]
+    this_year, _ = make_pot.build_pot(paths, "2026-12-31 23:59+0000")
+    next_year, _ = make_pot.build_pot(paths, "2027-01-01 00:00+0000")
+    assert "# Copyright (C) 2027" in next_year
+    assert make_pot.strip_creation_date(this_year) == make_pot.strip_creation_date(next_year)
@@ -0,0 +1,38 @@
+import sqlite3
+from datetime import datetime
+
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+migration_planner = load_script("migration-planner")
+
+def snapshot(tmp_path, notes):
+    return open_snapshot(write_snapshot(tmp_path, {
+        "wcs_subscriptions": (["id", "user_id", "status", "start_date", "end_date"],
+                              [[10, 5, "wc-on-hold", "2024-01-01 00:00:00", "2026-01-01 00:00:00"]]),
+        "wcs_subscription_items": (["item_id", "subscription_id", "product_id", "is_subscription"], [[1, 10, 42, 1]]),
+        "order_notes": (["note_id", "order_id", "date_created", "content", "is_customer_note"], notes),
+    }))
+
+def planned_dates(connection):
+    migration_planner.build_plan(connection, [42], datetime(2025, 6, 1))
+    return connection.execute("SELECT paused_date, status_changed_date FROM plan").fetchone()
+
+def test_customer_notes_are_ignored(tmp_path):
+    connection = snapshot(tmp_path, [
+        [1, 10, "2025-01-02 10:00:00", "Subscription status changed from Active to On hold.", 0],
+        # wc_get_order_notes( 'type' => 'internal' ) leaves out notes sent to the customer
+        [2, 10, "2025-03-01 10:00:00", "Status changed to on-hold, kontakt os", 1],
+    ])
+    assert planned_dates(connection) == ("2025-01-02 10:00:00", "2025-01-02 10:00:00")
+
+def test_snapshot_without_customer_note_column(tmp_path):
+    path = tmp_path / "old.sqlite"
+    disk = sqlite3.connect(path)
+    disk.execute("CREATE TABLE order_notes (note_id INTEGER PRIMARY KEY, order_id INTEGER NOT NULL, "
+                 "date_created TEXT NOT NULL DEFAULT '', content TEXT NOT NULL DEFAULT '')")
+    disk.execute("INSERT INTO order_notes VALUES (1, 10, '2025-01-02 10:00:00', 'Status changed to On hold')")
+    disk.commit()
+    disk.close()
+    connection = open_snapshot(str(path))
+    assert connection.execute("SELECT is_customer_note FROM order_notes").fetchall() == [(0,)]
@@ -0,0 +1,149 @@
+import gettext
+import io
+import struct
+
+import php_i18n
+
+HEADER = [
+    ("Project-Id-Version", "Membership Manager 1.0.0"),
+    ("Language", "da_DK"),
+    ("MIME-Version", "1.0"),
+    ("Content-Type", "text/plain; charset=UTF-8"),
+    ("Content-Transfer-Encoding", "8bit"),
+    ("Plural-Forms", "nplurals=2; plural=(n != 1);"),
+]
+
+def catalogue():
+    messages = {}
+    translations = {}
+
+    def add(msgid, translated, msgctxt=None, msgid_plural=None, flags=()):
+        key = (msgctxt, msgid)
+        messages[key] = {"msgid": msgid, "msgctxt": msgctxt, "msgid_plural": msgid_plural,
+                         "references": ["includes/class-membership-manager.php:12"], "comments": [],
+                         "flags": list(flags)}
+        translations[key] = translated
+
+    add("Active", "Aktiv")
+    add("Expired", "Udløbet")
+    add("Renew", "Forny", msgctxt="button")
+    add("%d membership", ["%d medlemskab", "%d medlemskaber"], msgid_plural="%d memberships", flags=["php-format"])
+    add("%s day left", ["%s dag tilbage", "%s dage tilbage"], msgctxt="reminder", msgid_plural="%s days left")
+    add("Multi\nline \"quoted\"", "Flere\nlinjer \"citeret\"")
+    add("Fuzzy", "Uklar", flags=["fuzzy"])
+    return messages, translations
+
+def hash_lookup(data, original):
+    """Find `original` through the .mo hash table the way GNU gettext does"""
+    _, _, count, originals, translations, size, offset = struct.unpack_from("<7I", data)
+    key = original.split(b"\0", 1)[0]
+    value = php_i18n.gettext_hash(key)
+    slot = value % size
+    increment = 1 + (value % (size - 2))
+    while True:
+        index = struct.unpack_from("<I", data, offset + slot * 4)[0]
+        if not index:
+            return None
+        length, position = struct.unpack_from("<2I", data, originals + (index - 1) * 8)
+        if data[position:position + length].split(b"\0", 1)[0] == key:
+            length, position = struct.unpack_from("<2I", data, translations + (index - 1) * 8)
+            return data[position:position + length]
+        slot = slot - (size - increment) if slot >= size - increment else slot + increment
+
+def test_mo_round_trip_with_plurals():
+    messages, translations = catalogue()
+    data = php_i18n.build_mo(HEADER, messages, translations)
+    mo = gettext.GNUTranslations(io.BytesIO(data))
+    assert mo.gettext("Active") == "Aktiv"
+    assert mo.pgettext("button", "Renew") == "Forny"
+    assert mo.ngettext("%d membership", "%d memberships", 1) == "%d medlemskab"
+    assert mo.ngettext("%d membership", "%d memberships", 3) == "%d medlemskaber"
+    assert mo.npgettext("reminder", "%s day left", "%s days left", 2) == "%s dage tilbage"
+    assert mo.gettext("Fuzzy") == "Fuzzy"
+
+    for original, translated in php_i18n.compiled_entries(messages, translations):
+        assert hash_lookup(data, original) == translated
+    assert hash_lookup(data, b"Missing") is None
+
+def test_po_round_trip(tmp_path):
+    messages, translations = catalogue()
+    path = tmp_path / "membership-manager-da_DK.po"
+    with open(path, "w", encoding="utf-8") as f:
+        php_i18n.write_po(f, HEADER, messages, translations)
+    header, read_messages, read_translations = php_i18n.read_po(str(path))
+    assert header == HEADER
+    assert list(read_messages) == list(messages)
+    assert read_translations == translations
+    for key, entry in messages.items():
+        assert read_messages[key]["msgid_plural"] == entry["msgid_plural"]
+        assert read_messages[key]["flags"] == entry["flags"]
+    assert php_i18n.build_mo(header, read_messages, read_translations) == php_i18n.build_mo(HEADER, messages, translations)
+
+def calls(source):
+    return list(php_i18n.extract_calls(source))
+
+def msgids(source):
+    return [call["msgid"] for call in calls(source)]
+
+def test_extract_same_line_and_other_domains():
+    source = "<?php echo __( 'Foo', 'other' ) . __( 'Active', 'membership-manager' ); _e( \"Expired\", 'membership-manager' );"
+    assert calls(source) == [{"line": 1, "msgid": "Active"}, {"line": 1, "msgid": "Expired"}]
+
+def test_extract_plural_and_context():
+    source = """<?php
+_n( '%d day', '%d days', $count, 'membership-manager' );
+_x( 'Post', 'verb', 'membership-manager' );
+_nx( '%d member', '%d members', count( $rows ), 'list', 'membership-manager' );
+"""
+    assert calls(source) == [
+        {"line": 2, "msgid": "%d day", "msgid_plural": "%d days"},
+        {"line": 3, "msgid": "Post", "msgctxt": "verb"},
+        {"line": 4, "msgid": "%d member", "msgid_plural": "%d members", "msgctxt": "list"},
+    ]
+
+def test_extract_literal_values():
+    source = r"""<?php
+__( 'It\'s a \\ path', 'membership-manager' );
+__( "Line\none \x41\u{e6}", 'membership-manager' );
+__( 'Concat' . "enated", 'membership-manager' );
+__( "Hello $name", 'membership-manager' );
+__( $text, 'membership-manager' );
+__( 'Dynamic domain', $domain );
+"""
+    assert msgids(source) == ["It's a \\ path", "Line\none Aæ", "Concatenated"]
+
+def test_extract_skips_non_calls():
+    source = """<?php
+$mailer->__( 'Method', 'membership-manager' );
+Helper::_e( 'Static', 'membership-manager' );
+function __( $text, $domain ) {}
+// __( 'Comment', 'membership-manager' );
+/* _e( 'Block', 'membership-manager' ); */
+echo '__( "In a string", "membership-manager" )';
+echo <<<EOT
+_e( 'Heredoc', 'membership-manager' );
+EOT;
+?>
+<p>__( 'Inline HTML', 'membership-manager' )</p>
+<?php _e( 'After HTML', 'membership-manager' ); ?>
+"""
+    assert calls(source) == [{"line": 13, "msgid": "After HTML"}]
+
+def test_extract_nested_calls_and_close_tag_in_comment():
+    source = """<?php printf( esc_html__( 'Hi %s', 'membership-manager' ), esc_html( __( 'there', 'membership-manager' ) ) );
+// a comment ends at ?> __( 'Not PHP', 'membership-manager' )
+<?php _e( 'Back in PHP', 'membership-manager' );
+"""
+    assert msgids(source) == ["Hi %s", "there", "Back in PHP"]
+
+def test_extract_translator_comments():
+    source = """<?php
+/* translators: %s: member name */
+printf( __( 'Welcome %s', 'membership-manager' ), $name );
+// translators: far away
+
+_e( 'No comment', 'membership-manager' );
+"""
+    found = calls(source)
+    assert found[0]["comment"] == "translators: %s: member name"
+    assert "comment" not in found[1]
@@ -0,0 +1,98 @@
+import asyncio
+
+from conftest import load_script
+
+mailer_module = load_script("reminder-mailer")
+SinkServer = mailer_module.SinkServer
+Mailer = mailer_module.Mailer
+
+def message(number):
+    return {"to": f"medlem{number}@example.dk", "subject": "Dit medlemskab udløber", "body": "<p>Hej</p>",
+            "renewal_type": "manual", "reminder_type": "7 dage"}
+
+def settings(port, **smtp):
+    return {
+        "staging": False,
+        "from_name": "Foreningen",
+        "from_address": "info@example.dk",
+        "smtp": {"host": "127.0.0.1", "port": port, "tls": "none", "timeout": 0.5, **smtp},
+    }
+
+async def deliver(handler, items, **options):
+    """Run a Mailer against a server that talks through `handler`; None uses the normal sink"""
+    sink = SinkServer()
+    server = await asyncio.start_server(handler or sink.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    mailer = Mailer(settings(port, **options.pop("smtp", {})), backoff=0.01, **options)
+    try:
+        await asyncio.wait_for(mailer.run(items), 10)
+    finally:
+        server.close()
+        await server.wait_closed()
+    return mailer, sink
+
+def test_sink_receives_every_message():
+    mailer, sink = asyncio.run(deliver(None, [message(n) for n in range(25)], connections=3))
+    assert sink.received == 25
+    assert mailer.stats["sent"] == 25 and mailer.stats["failed"] == 0
+    assert mailer.stats["connections"] == 3
+    assert sum("Sendte manuel fornyelsespåmindelse (7 dage)" in line for line in mailer.log_lines) == 25
+
+def test_invalid_address_is_not_sent():
+    items = [message(1), dict(message(2), to="ikke-en-adresse")]
+    mailer, sink = asyncio.run(deliver(None, items, connections=1))
+    assert sink.received == 1
+    assert mailer.stats["invalid"] == 1
+
+def test_silent_server_fails_instead_of_hanging():
+    sessions = []
+
+    async def silent(reader, writer):
+        # Accepts the connection but never sends a greeting
+        sessions.append(writer)
+        await reader.read()
+        writer.close()
+
+    mailer, _ = asyncio.run(deliver(silent, [message(n) for n in range(6)], connections=2, retries=1,
+                                    smtp={"timeout": 0.2}))
+    assert mailer.stats["sent"] == 0
+    assert mailer.stats["failed"] == 6
+    assert mailer.stats["retries"] == 6
+
+def test_rejected_auth_drops_the_connection():
+    commands = []
+
+    async def refusing(reader, writer):
+        writer.write(b"220 test\r\n")
+        while line := await reader.readline():
+            verb = line.split()[0].upper()
+            commands.append(verb)
+            if verb == b"EHLO":
+                writer.write(b"250-test\r\n250 AUTH PLAIN\r\n")
+            elif verb == b"AUTH":
+                writer.write(b"535 5.7.8 Forkert adgangskode\r\n")
+            else:
+                writer.write(b"250 OK\r\n")
+        writer.close()
+
+    mailer, _ = asyncio.run(deliver(refusing, [message(1), message(2)], connections=1,
+                                    smtp={"username": "bruger", "password": "forkert"}))
+    assert mailer.stats["failed"] == 2
+    # Each message opens a new session; the refused one is never reused for MAIL
+    assert commands.count(b"AUTH") == 2
+    assert b"MAIL" not in commands
+
+def test_dead_worker_does_not_block_run():
+    async def run():
+        mailer = Mailer(settings(1), connections=1)
+
+        async def broken_worker(queue):
+            raise RuntimeError("worker fejlede")
+
+        mailer.worker = broken_worker
+        await asyncio.wait_for(mailer.run([message(n) for n in range(50)]), 5)
+        return mailer
+
+    mailer = asyncio.run(run())
+    assert any("worker fejlede" in line for line in mailer.log_lines)
+    assert mailer.stats["failed"] > 0
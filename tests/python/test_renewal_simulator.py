@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+renewal_simulator = load_script("renewal-simulator")
+
+START = date(2025, 1, 1)
+END = date(2025, 12, 31)
+RUN_TIME = "06:00"
+UTC_OFFSET = 2
+
+ROWS = [
+    [1, "active", "manual", "2025-03-15 10:00:00"],
+    # The day-0 run at 06:00 UTC (08:00 site time) is before the 12:00 end_date
+    [2, "active", "automatic", "2025-04-10 12:00:00"],
+    # Expired by process_expirations() before the renewal check on its last day
+    [3, "active", "automatic", "2025-05-01 03:00:00"],
+    # Only active rows are processed, so failed renewals and expired rows are left alone
+    [4, "pending-cancel", "automatic", "2025-02-01 00:00:00"],
+    [5, "expired", "manual", "2025-02-01 00:00:00"],
+    [6, "active", "manual", "0000-00-00 00:00:00"],
+    # Already past end_date: expired on the first run
+    [7, "active", "manual", "2024-12-01 00:00:00"],
+    [8, "active", "automatic", "2025-01-20 09:00:00"],
+    [9, "active", "manual", "2025-01-10 23:00:00"],
+    [10, "active", "automatic", "2024-02-29 00:00:00"],
+]
+
+def store(tmp_path):
+    return write_snapshot(tmp_path, {"membership_subscriptions": (
+        ["id", "user_id", "status", "renewal_type", "end_date"], [[row[0], row[0], *row[1:]] for row in ROWS])})
+
+def add_year(moment):
+    """DateTime::modify('+1 year'); Feb 29 overflows to Mar 1"""
+    try:
+        return moment.replace(year=moment.year + 1)
+    except ValueError:
+        return moment.replace(year=moment.year + 1, month=3, day=1)
+
+def php_cron(start, end, run_time, utc_offset, assume_renewed):
+    """process_membership_renewals() run once a day, subscription by subscription as the PHP does"""
+    hours, minutes = (int(part) for part in run_time.split(":"))
+    rows = {row_id: {"status": status, "automatic": renewal_type == "automatic", "end": end_date}
+            for row_id, status, renewal_type, end_date in ROWS}
+    events = []
+    day = start
+    while day <= end:
+        now = datetime(day.year, day.month, day.day, hours, minutes)
+        site_now = (now + timedelta(hours=utc_offset)).strftime("%Y-%m-%d %H:%M:%S")
+        # process_expirations(): string comparison against current_time( 'mysql' )
+        for row_id, row in rows.items():
+            if row["status"] == "active" and row["end"] < site_now and row["end"] != "0000-00-00 00:00:00":
+                row["status"] = "expired"
+                events.append((day.isoformat(), "expired", int(row["automatic"]), row_id))
+        for row_id, row in rows.items():
+            if row["status"] != "active" or row["end"] == "0000-00-00 00:00:00":
+                continue
+            end_day = date.fromisoformat(row["end"][:10])
+            days_left = abs((end_day - day).days)
+            if not day < end_day and days_left != 0:
+                continue
+            if days_left == 0 and row["automatic"]:
+                events.append((day.isoformat(), "renewal", 1, row_id))
+                if assume_renewed:
+                    row["end"] = add_year(datetime.fromisoformat(row["end"])).strftime("%Y-%m-%d %H:%M:%S")
+            for kind, days in renewal_simulator.REMINDERS:
+                if days_left == days:
+                    events.append((day.isoformat(), kind, int(row["automatic"]), row_id))
+        day += timedelta(days=1)
+    return sorted(events)
+
+def simulated(tmp_path, assume_renewed):
+    connection = open_snapshot(store(tmp_path))
+    params = renewal_simulator.simulate(connection, START, END, RUN_TIME, UTC_OFFSET, assume_renewed)
+    events = sorted(connection.execute("SELECT date(day), kind, automatic, id FROM events"))
+    return events, renewal_simulator.missed_renewals(connection, params)
+
+@pytest.mark.parametrize("assume_renewed", [False, True])
+def test_events_match_the_php_cron(tmp_path, assume_renewed):
+    events, _ = simulated(tmp_path, assume_renewed)
+    assert events == php_cron(START, END, RUN_TIME, UTC_OFFSET, assume_renewed)
+
+def test_reminder_windows_and_outcomes(tmp_path):
+    events, missed = simulated(tmp_path, False)
+    by_id = {}
+    for day, kind, _, row_id in events:
+        by_id.setdefault(row_id, []).append((day, kind))
+    assert by_id[1] == [("2025-02-13", "30_days"), ("2025-03-01", "14_days"), ("2025-03-08", "7_days"),
+                        ("2025-03-14", "1_day"), ("2025-03-16", "expired")]
+    assert by_id[2][-2:] == [("2025-04-10", "renewal"), ("2025-04-11", "expired")]
+    assert ("2025-05-01", "expired") in by_id[3] and ("2025-05-01", "renewal") not in by_id[3]
+    assert missed == 1
+    assert by_id[7] == [("2025-01-01", "expired")]
+    assert not {4, 5, 6} & set(by_id)
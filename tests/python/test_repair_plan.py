@@ -0,0 +1,91 @@
+import io
+
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+repair_plan = load_script("repair-plan")
+
+AUTOMATIC = 100
+MANUAL = 200
+SUBSCRIPTION = 300
+
+ORDER_COLUMNS = ["id", "status", "date_created", "user_id", "membership_created", "membership_ids",
+                 "subscription_relation", "subscription_id"]
+
+def store(tmp_path):
+    """A shop where fix_membership_data() links, links via a subscription, creates and skips orders"""
+    return write_snapshot(tmp_path, {
+        "options": (["option_name", "option_value"], [
+            ["membership_automatic_renewal_products", str(AUTOMATIC)],
+            ["membership_manual_renewal_products", str(MANUAL)],
+        ]),
+        "orders": (ORDER_COLUMNS, [
+            [1, "completed", "2025-01-01 00:00:00", 5, "", "", "", ""],
+            # Guest, subscription-only and already linked orders are left alone
+            [2, "completed", "2025-01-02 00:00:00", 0, "", "", "", ""],
+            [3, "completed", "2025-01-03 00:00:00", 6, "", "", "", ""],
+            [4, "completed", "2025-01-04 00:00:00", 7, "1", 'a:1:{i:0;s:2:"11";}', "", ""],
+            [5, "pending", "2025-01-05 00:00:00", 7, "", "", "", ""],
+            # Renewal of subscription 600: the parent's membership wins over the user's latest
+            [20, "completed", "2024-06-01 00:00:00", 8, "1", 'a:1:{i:0;s:2:"13";}', "parent", 600],
+            [21, "completed", "2025-06-01 00:00:00", 8, "", "", "renewal", 600],
+            # The newer order creates the membership, the older one is linked to it
+            [30, "completed", "2025-03-02 00:00:00", 9, "", "", "", ""],
+            [31, "processing", "2025-03-01 00:00:00", 9, "", "", "", ""],
+            # A JSON _membership_ids is a string to is_array(), so the parent falls back to the user
+            [40, "completed", "2025-04-01 00:00:00", 10, "", "", "parent", 700],
+            [41, "completed", "2025-05-01 00:00:00", 10, "1", "[18]", "renewal", 700],
+        ]),
+        "order_items": (["item_id", "order_id", "product_id", "name", "is_subscription"], [
+            [1, 1, AUTOMATIC, "Privat", 1],
+            [2, 2, MANUAL, "Pensionist", 0],
+            [3, 3, SUBSCRIPTION, "Forening", 1],
+            [4, 4, MANUAL, "Pensionist", 0],
+            [5, 5, MANUAL, "Pensionist", 0],
+            [6, 20, AUTOMATIC, "Privat", 1],
+            [7, 21, AUTOMATIC, "Privat", 1],
+            [8, 30, SUBSCRIPTION, "Forening", 1],
+            [9, 30, MANUAL, "Pensionist", 0],
+            [10, 31, AUTOMATIC, "Privat", 1],
+            [11, 40, AUTOMATIC, "Privat", 1],
+            [12, 41, AUTOMATIC, "Privat", 1],
+        ]),
+        "membership_subscriptions": (["id", "user_id", "end_date"], [
+            [11, 5, "2026-01-01 00:00:00"],
+            [13, 8, "2025-12-01 00:00:00"],
+            [17, 8, "2026-12-01 00:00:00"],
+            [18, 10, "2026-01-01 00:00:00"],
+        ]),
+    })
+
+def test_results_match_php(tmp_path):
+    results, plan = repair_plan.plan_repairs(open_snapshot(store(tmp_path)))
+    assert {key: value for key, value in results.items() if key != "fixes"} == {
+        "total_fixed": 5, "orders_linked": 4, "memberships_created": 1, "errors": 0, "success": True}
+    assert [(fix["order_id"], fix["membership_id"], fix["message"]) for fix in results["fixes"]] == [
+        (21, 13, "Linkede ordre #21 til eksisterende medlemskab #13 (via subscription)"),
+        (40, 18, "Linkede ordre #40 til eksisterende medlemskab #18"),
+        (30, 19, "Oprettede nyt medlemskab #19 for ordre #30 (bruger #9)"),
+        (31, 19, "Linkede ordre #31 til eksisterende medlemskab #19"),
+        (1, 11, "Linkede ordre #1 til eksisterende medlemskab #11"),
+    ]
+    # The first item that is a membership or subscription product picks the renewal type
+    assert plan["create"] == [{"seq": 0, "order_id": 30, "user_id": 9, "membership_id": 19, "renewal_type": "automatic"}]
+    assert plan["link"] == [
+        {"order_id": 21, "membership_id": 13, "user_id": None},
+        {"order_id": 40, "membership_id": 18, "user_id": None},
+        {"order_id": 31, "membership_id": None, "user_id": 9},
+        {"order_id": 1, "membership_id": 11, "user_id": None},
+    ]
+
+def test_sql_links_created_memberships_through_the_user(tmp_path):
+    _, plan = repair_plan.plan_repairs(open_snapshot(store(tmp_path)))
+    stream = io.StringIO()
+    repair_plan.write_sql(stream, plan, prefix="wp_", link_created=True)
+    sql = stream.getvalue()
+    assert sql.startswith("-- Membership Manager: reparation af 1 medlemskaber og 5 ordre-links\n")
+    # No activation hook runs, so the script says the roles need role-reconciler.py
+    assert f"-- ADVARSEL: {repair_plan.ROLE_WARNING}\n" in sql
+    assert "(31, NULL, 9)" in sql and "(30, NULL, 9)" in sql
+    assert "WHERE NOT EXISTS (SELECT 1 FROM `wp_membership_subscriptions` s WHERE s.user_id = c.user_id)" in sql
+    assert sql.rstrip().endswith("COMMIT;")
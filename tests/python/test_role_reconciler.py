@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+role_reconciler = load_script("role-reconciler")
+
+CUSTOMER = 'a:1:{s:8:"customer";b:1;}'
+MEMBER = 'a:1:{s:6:"medlem";b:1;}'
+CUSTOMER_MEMBER = 'a:2:{s:8:"customer";b:1;s:6:"medlem";b:1;}'
+
+def store(tmp_path, remove_role="yes"):
+    return write_snapshot(tmp_path, {
+        "options": (["option_name", "option_value"], [
+            ["membership_member_role", "medlem"],
+            ["membership_remove_role_on_expiration", remove_role],
+            ["default_role", "subscriber"],
+        ]),
+        "users": (["id", "user_login"], [[1, "aktiv"], [2, "udløbet"], [3, "kunde"], [5, "i-orden"]]),
+        "usermeta": (["umeta_id", "user_id", "meta_key", "meta_value"], [
+            [1, 1, "wp_capabilities", CUSTOMER],
+            [2, 2, "wp_capabilities", MEMBER],
+            [3, 2, "has_active_membership", "yes"],
+            [4, 3, "wp_capabilities", CUSTOMER_MEMBER],
+            [5, 3, "has_active_membership", "yes"],
+            [6, 5, "wp_capabilities", CUSTOMER_MEMBER],
+            [7, 5, "has_active_membership", "yes"],
+        ]),
+        "membership_subscriptions": (["id", "user_id", "status"], [
+            [1, 1, "active"],
+            [2, 2, "expired"],
+            [3, 3, "cancelled"],
+            [4, 5, "expired"],
+            [5, 5, "active"],
+            # get_user_by() fails for a deleted user
+            [6, 6, "active"],
+        ]),
+    })
+
+def plan(tmp_path, remove_role="yes"):
+    summary, changes = role_reconciler.plan_roles(open_snapshot(store(tmp_path, remove_role)))
+    return summary, {change["user_id"]: change for change in changes}
+
+def test_active_user_gets_the_role(tmp_path):
+    summary, changes = plan(tmp_path)
+    assert changes[1] == {"user_id": 1, "active": 1, "old_caps": CUSTOMER,
+                          "new_caps": CUSTOMER_MEMBER, "flag": "yes"}
+    assert summary["missing_role"] == 1
+    assert summary["missing_users"] == 1
+    assert 5 not in changes
+
+def test_ended_user_loses_the_role(tmp_path):
+    summary, changes = plan(tmp_path)
+    # remove_role() leaves no role, so WordPress falls back to default_role
+    assert changes[2]["new_caps"] == 'a:1:{s:10:"subscriber";b:1;}'
+    assert changes[2]["flag"] == "no"
+    assert changes[3]["new_caps"] == CUSTOMER
+    assert summary["stale_role"] == 2
+
+def test_role_kept_when_removal_is_off(tmp_path):
+    summary, changes = plan(tmp_path, remove_role="no")
+    assert {user_id: (change["new_caps"], change["flag"]) for user_id, change in changes.items() if user_id != 1} == {
+        2: (None, "no"), 3: (None, "no")}
+    assert summary["stale_role_kept"] == 2
+    assert summary["flag_only"] == 2
+
+def test_sql_replaces_only_the_planned_value(tmp_path):
+    _, changes = role_reconciler.plan_roles(open_snapshot(store(tmp_path)))
+    stream = io.StringIO()
+    role_reconciler.write_sql(stream, changes, prefix="wp_")
+    sql = stream.getvalue()
+    assert sql.startswith("-- Membership Manager: rolleafstemning for 3 brugere\n")
+    assert "WHERE c.new_caps IS NOT NULL AND um.meta_value = c.old_caps;" in sql
+    assert "'a:1:{s:10:\"subscriber\";b:1;}'" in sql
+
+@pytest.mark.parametrize("value", [
+    'a:1:{s:9:"forælder";b:1;}',
+    'a:2:{s:15:"medlem_årsløn";b:1;s:8:"kasserer";b:0;}',
+    'a:1:{s:6:"会员";b:1;}',
+    "a:0:{}",
+])
+def test_serialize_round_trip(value):
+    assert role_reconciler.serialize_capabilities(role_reconciler.capability_roles(value)) == value
@@ -0,0 +1,13 @@
+import pytest
+
+from translation_catalogue import CatalogueError, read_source, source_path
+
+def test_shipped_source_loads():
+    assert read_source(source_path())
+
+def test_escaped_quote_in_source_is_rejected(tmp_path):
+    path = tmp_path / "translations-da_DK.tsv"
+    path.write_text('# Settings\nThe name that appears in the \\"From\\" field.\tNavnet i \\"Fra\\" feltet.\n',
+                    encoding="utf-8")
+    with pytest.raises(CatalogueError, match=":2:"):
+        read_source(str(path))
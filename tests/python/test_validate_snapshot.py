@@ -0,0 +1,103 @@
+from conftest import load_script, write_snapshot
+from membership_snapshot import open_snapshot
+
+validate_snapshot = load_script("validate-snapshot")
+
+AUTOMATIC = 100
+MANUAL = 200
+SUBSCRIPTION = 300
+OTHER = 400
+
+ORDER_COLUMNS = ["id", "status", "date_created", "user_id", "billing_email", "billing_first_name", "billing_last_name",
+                 "membership_created", "membership_ids", "subscription_relation", "subscription_id"]
+
+def order(order_id, user_id, status="completed", created="", ids="", relation="", subscription="", billing=("", "", "")):
+    return [order_id, status, f"2025-01-{order_id:02d} 12:00:00", user_id, *billing, created, ids, relation, subscription]
+
+def store(tmp_path):
+    """A shop where every branch of validate_membership_data() is taken once"""
+    notes = [[1, 1, "2024-12-01 00:00:00", "Manuelt oprettet medlemskab - mailadresse: gammel@example.dk"]]
+    # Only the 10 newest notes are read, so the marker on order 1 is not seen
+    notes += [[100 + n, 1, f"2025-01-01 0{n % 10}:00:00", "Ordrestatus ændret"] for n in range(10)]
+    notes += [[2, 2, "2025-01-02 08:00:00", "Manuelt oprettet medlemskab - mailadresse: admin@example.dk"]]
+    return write_snapshot(tmp_path, {
+        "options": (["option_name", "option_value"], [
+            ["membership_automatic_renewal_products", f'a:1:{{i:0;s:3:"{AUTOMATIC}";}}'],
+            ["membership_manual_renewal_products", f'a:1:{{i:0;i:{MANUAL};}}'],
+        ]),
+        "orders": (ORDER_COLUMNS, [
+            order(1, 0, billing=("anna@example.dk", "Anna", "Hansen ")),
+            order(2, 0),
+            order(3, 5, status="processing", created="1", ids='a:1:{i:0;s:2:"11";}'),
+            order(4, 6, created="1", ids="a:2:{i:0;i:12;i:1;i:99;}"),
+            order(5, 8, relation="renewal", subscription=500),
+            order(6, 9),
+            order(7, 10, relation="renewal", subscription=501),
+            order(8, 11, status="pending"),
+            order(9, 12),
+            order(10, 14),
+        ]),
+        "order_items": (["item_id", "order_id", "product_id", "name", "is_subscription"], [
+            [1, 1, MANUAL, "Pensionist", 0],
+            [2, 2, OTHER, "T-shirt", 0],
+            [3, 2, AUTOMATIC, "Privat", 1],
+            [4, 3, AUTOMATIC, "Privat", 1],
+            [5, 4, MANUAL, "Pensionist", 0],
+            [6, 5, AUTOMATIC, "Privat", 1],
+            [7, 6, MANUAL, "Pensionist", 0],
+            [8, 7, AUTOMATIC, "Privat", 1],
+            [9, 8, AUTOMATIC, "Privat", 1],
+            [10, 9, OTHER, "T-shirt", 0],
+            [11, 10, SUBSCRIPTION, "Forening", 1],
+        ]),
+        "order_notes": (["note_id", "order_id", "date_created", "content"], notes),
+        "membership_subscriptions": (["id", "user_id", "end_date", "renewal_type"], [
+            [11, 5, "2026-01-01 00:00:00", "automatic"],
+            [12, 7, "2026-01-01 00:00:00", "manual"],
+            [13, 8, "2026-01-01 00:00:00", "automatic"],
+            [14, 14, "2025-01-01 00:00:00", "manual"],
+            [15, 14, "2026-01-01 00:00:00", "manual"],
+            [16, 20, "2026-01-01 00:00:00", "manual"],
+        ]),
+    })
+
+def test_results_match_php(tmp_path):
+    results = validate_snapshot.validate(open_snapshot(store(tmp_path)))
+    assert {key: value for key, value in results.items() if key != "issues"} == {
+        "total_orders_checked": 9,
+        "total_memberships_checked": 6,
+        "orders_with_membership": 2,
+        "orders_without_membership": 6,
+        "memberships_with_order": 4,
+        "orphaned_memberships": 2,
+        "data_mismatches": 2,
+        "success": True,
+    }
+    # Orders newest first as wc_get_orders() returns them, then memberships by ID
+    assert [(issue["type"], issue["message"]) for issue in results["issues"]] == [
+        ("warning", "Ordre #10 (bruger 14) mangler link til medlemskab #15"),
+        ("info", "Fornyelsesordre #7 (bruger 10) uden medlemskab - forventer parent ordre har oprettet det (Abonnement #501)"),
+        ("error", "Ordre #6 (bruger 9) burde have medlemskab men der eksisterer ikke noget for denne bruger."),
+        ("info", "Ordre #5 (fornyelse) mangler link til medlemskab #13 (Abonnement #500)"),
+        ("error", "Ordre #4 (bruger 6) har medlemskab #12 men medlemskabet tilhører bruger 7."),
+        ("error", "Ordre #4 refererer til medlemskab #99 som ikke længere findes i databasen."),
+        ("warning", "Ordre #2: Manuelt oprettet medlemskab (kontant betaling) - Privat (automatisk fornyelse) - Admin: admin@example.dk"),
+        ("warning", "Ordre #1: Guest checkout (ingen brugerkonto) - Anna Hansen (anna@example.dk) - Pensionist"),
+        ("info", "Medlemskab #12 (bruger 7) har ingen tilknyttet fuldført ordre med medlemskabsprodukter. "
+                 "Kan være manuelt oprettet eller migreret."),
+        ("info", "Medlemskab #16 (bruger 20) har ingen tilknyttet fuldført ordre med medlemskabsprodukter. "
+                 "Kan være manuelt oprettet eller migreret."),
+    ]
+
+def test_renewal_type_check(tmp_path):
+    connection = open_snapshot(store(tmp_path))
+    connection.execute("UPDATE membership_subscriptions SET renewal_type = 'manual' WHERE id = 11")
+    results = validate_snapshot.validate(connection, check_renewal_type=True)
+    assert "Ordre #3: medlemskab #11 har fornyelsestype manual, men produktet er automatic." in [
+        issue["message"] for issue in results["issues"]]
+    assert results["data_mismatches"] == 2
+
+def test_no_products_configured(tmp_path):
+    results = validate_snapshot.validate(open_snapshot(write_snapshot(tmp_path, {})))
+    assert results["success"] is False
+    assert results["issues"][0]["type"] == "error"
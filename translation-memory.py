@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Oversættelseshukommelse for Membership Manager
+Indekserer eksisterende oversættelser efter normaliseret form og tegn-trigrammer,
+så nye strenge får forslag fra de nærmeste kendte oversættelser uden at gennemløbe hele ordbogen
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+from php_i18n import PRINTF_PLACEHOLDER, read_po
+from translation_catalogue import open_catalogue
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_POT = os.path.join(PLUGIN_DIR, "languages", "membership-manager.pot")
+
+NGRAM = 3
+PLACEHOLDER_TOKEN = "\x01"
+
+def normalize(text):
+    """Lowercase, unify placeholders and whitespace, drop trailing punctuation"""
+    text = PRINTF_PLACEHOLDER.sub(PLACEHOLDER_TOKEN, text.lower())
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .:!?…").rstrip()
+
+def ngrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+def placeholders(text):
+    return [match.group(0) for match in PRINTF_PLACEHOLDER.finditer(text)]
+
+class TranslationMemory:
+    """Source/translation pairs indexed for exact-normalized and fuzzy lookup
+
+    Fuzzy lookup counts shared trigrams using the posting lists of the
+    query's rarest trigrams, up to a fixed budget of postings, and scores the
+    best-covered entries by the Dice coefficient of their trigram sets. The
+    work per query is bounded by the budget rather than the memory size.
+    """
+
+    def __init__(self, candidate_budget=1500, verify_limit=50):
+        self.candidate_budget = candidate_budget
+        self.verify_limit = verify_limit
+        self.entries = []
+        self.by_source = {}
+        self.by_normalized = defaultdict(list)
+        self.postings = defaultdict(list)
+        self.gram_sets = []
+
+    def add(self, source, translation, origin=""):
+        """Add a pair; identity pairs and exact duplicates are ignored"""
+        if not translation or source == translation or source in self.by_source:
+            return None
+        entry_id = len(self.entries)
+        normalized = normalize(source)
+        grams = frozenset(ngrams(normalized))
+        self.entries.append((source, translation, origin))
+        self.by_source[source] = entry_id
+        self.by_normalized[normalized].append(entry_id)
+        self.gram_sets.append(grams)
+        for gram in grams:
+            self.postings[gram].append(entry_id)
+        return entry_id
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, text, limit=5, threshold=0.6):
+        """Return up to `limit` suggestions as dicts sorted by score
+
+        Score 1.0 is an exact match; entries equal after normalization
+        (case, whitespace, trailing punctuation, placeholder types) score
+        0.99. Below that the score is trigram similarity.
+        """
+        results = {}
+        exact = self.by_source.get(text)
+        if exact is not None:
+            results[exact] = 1.0
+
+        normalized = normalize(text)
+        for entry_id in self.by_normalized.get(normalized, ()):
+            results.setdefault(entry_id, 0.99)
+
+        query = ngrams(normalized)
+        size = len(query)
+        hits = Counter()
+        scanned = 0
+        for gram in sorted(query, key=lambda gram: len(self.postings.get(gram, ()))):
+            posting = self.postings.get(gram, ())
+            if scanned and scanned + len(posting) > self.candidate_budget:
+                break
+            hits.update(posting)
+            scanned += len(posting)
+        for entry_id, _ in hits.most_common(self.verify_limit):
+            if entry_id in results:
+                continue
+            grams = self.gram_sets[entry_id]
+            score = 2 * len(query & grams) / (size + len(grams))
+            if score >= threshold:
+                results[entry_id] = round(score, 3)
+
+        ranked = sorted(results.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        suggestions = []
+        for entry_id, score in ranked:
+            source, translation, origin = self.entries[entry_id]
+            suggestions.append({
+                "score": score,
+                "source": source,
+                "translation": translation,
+                "origin": origin,
+                "placeholders_match": placeholders(source) == placeholders(text),
+            })
+        return suggestions
+
+def build_memory(po_files=()):
+    memory = TranslationMemory()
+    catalogue = open_catalogue()
+    origin = os.path.basename(catalogue.source)
+    for source, translation in catalogue.items():
+        memory.add(source, translation, origin)
+    for po_file in po_files:
+        _, messages, translations = read_po(po_file)
+        for key, translation in translations.items():
+            if isinstance(translation, list):
+                translation = translation[0]
+            memory.add(messages[key]["msgid"], translation, os.path.basename(po_file))
+    return memory
+
+def print_suggestions(text, suggestions):
+    print(f'\n"{text}"')
+    if not suggestions:
+        print("   (ingen forslag)")
+    for suggestion in suggestions:
+        marker = "" if suggestion["placeholders_match"] else "  ⚠ pladsholdere afviger"
+        print(f'   {suggestion["score"]:.2f}  "{suggestion["source"]}" => "{suggestion["translation"]}"'
+              f'  [{suggestion["origin"]}]{marker}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find oversættelsesforslag fra eksisterende oversættelser.")
+    parser.add_argument("strings", nargs="*", help="Strenge der skal findes forslag til")
+    parser.add_argument("--untranslated", nargs="?", const=DEFAULT_POT, metavar="POT",
+                        help="Foreslå oversættelser for alle strenge i POT-filen uden oversættelse")
+    parser.add_argument("--po", action="append", default=[], help="Ekstra .po-fil der indlæses i hukommelsen")
+    parser.add_argument("-n", "--limit", type=int, default=3, help="Antal forslag pr. streng")
+    parser.add_argument("-t", "--threshold", type=float, default=0.6, help="Minimum lighed (0-1)")
+    args = parser.parse_args(argv)
+
+    memory = build_memory(args.po)
+    queries = list(args.strings)
+    if args.untranslated:
+        _, messages, _ = read_po(args.untranslated)
+        queries += [entry["msgid"] for entry in messages.values() if entry["msgid"] not in memory.by_source]
+
+    started = time.perf_counter()
+    for text in queries:
+        print_suggestions(text, memory.lookup(text, args.limit, args.threshold))
+    elapsed = time.perf_counter() - started
+
+    if queries:
+        print(f"\n{len(queries)} opslag i {len(memory)} oversættelser: "
+              f"{elapsed / len(queries) * 1000:.3f} ms pr. opslag")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
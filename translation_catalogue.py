@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Fælles oversættelseskatalog for Membership Manager
+Kompilerer languages/translations-<sprog>.tsv én gang til en binær fil med sorteret strengtabel, offset-tabel,
+hash-indeks og pladsholdersignaturer, som værktøjerne memory-mapper og først åbner ved første opslag
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+
+from php_i18n import PRINTF_PLACEHOLDER
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(PLUGIN_DIR, "languages")
+BUILD_DIR = os.path.join(PLUGIN_DIR, "build")
+DEFAULT_LOCALE = "da_DK"
+
+MAGIC = b"MMCAT\r\n\x1a"
+FORMAT_VERSION = 1
+# magic, version, entries, index slots, offsets of the records, order,
+# index and string sections, source mtime_ns and size, source SHA-256
+HEADER = struct.Struct("<8sIIIIIIIqq32s")
+# Per entry, in sorted source order: source, translation, auto-translate
+# replacement and placeholder signature as (offset, length) into the string
+# section, then the position in the source file and the replacement's hits
+RECORD = struct.Struct("<IIIIIIIIII")
+ORDER = struct.Struct("<I")
+# hash, record number + 1 (0 is an empty slot)
+SLOT = struct.Struct("<II")
+
+class CatalogueError(Exception):
+    pass
+
+def source_path(locale=DEFAULT_LOCALE):
+    return os.path.join(SOURCE_DIR, f"translations-{locale}.tsv")
+
+def compiled_path(locale=DEFAULT_LOCALE):
+    return os.path.join(BUILD_DIR, f"translations-{locale}.cat")
+
+def read_source(path):
+    """{source: translation} from a catalogue source file, in file order
+
+    A source listed twice keeps its first position and its last
+    translation, like a repeated key in a dict literal.
+    """
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            if len(parts) != 2 or not parts[0]:
+                raise CatalogueError(f"{path}:{number}: forventede kildetekst og oversættelse adskilt af ét tabulatortegn")
+            # A PHP string literal copied with its escapes is a msgid no __() call looks up
+            if '\\"' in parts[0]:
+                raise CatalogueError(f"{path}:{number}: kildeteksten indeholder \\\" (kopieret fra en PHP-streng?)")
+            entries[parts[0]] = parts[1]
+    return entries
+
+POSITIONAL = re.compile(r"%(\d+)\$")
+
+def placeholder_signature(text):
+    """The printf arguments a string consumes, as '1s 2d'; positions are explicit or in order"""
+    arguments = []
+    for index, match in enumerate(PRINTF_PLACEHOLDER.finditer(text.replace("%%", "")), 1):
+        positional = POSITIONAL.match(match.group(0))
+        arguments.append((int(positional.group(1)) if positional else index, match.group(0)[-1]))
+    return " ".join(f"{position}{conversion}" for position, conversion in sorted(set(arguments)))
+
+def check_signatures(entries, path=""):
+    """Raise CatalogueError listing every entry whose translation takes other printf arguments"""
+    errors = []
+    for source, translation in entries.items():
+        expected, found = placeholder_signature(source), placeholder_signature(translation)
+        if expected != found:
+            errors.append(f'   "{source}" ({expected or "-"}) => "{translation}" ({found or "-"})')
+    if errors:
+        raise CatalogueError(f"{path}: pladsholdere afviger i {len(errors)} oversættelser:\n" + "\n".join(errors))
+
+def build_replacement_table(translations):
+    """Map each source literal to its final replacement and hit count
+
+    The old engine applied the dictionary entry by entry, so a Danish value
+    that is itself a later key got replaced again. Resolving those chains up
+    front keeps the output identical while scanning each file only once.
+    """
+    order = {english: i for i, english in enumerate(translations)}
+    table = {}
+    for english in translations:
+        position = order[english]
+        literal = translations[english].replace("'", "\\'")
+        hits = 1
+        while order.get(literal, -1) > position:
+            position = order[literal]
+            literal = translations[literal].replace("'", "\\'")
+            hits += 1
+        table[english] = (literal, hits)
+    return table
+
+def compile_entries(entries, source_stat=(0, 0), digest=b"\0" * 32):
+    """The binary catalogue for an ordered {source: translation} dict"""
+    replacements = build_replacement_table(entries)
+    encoded = sorted((source.encode("utf-8"), position) for position, source in enumerate(entries))
+    strings = bytearray()
+    offsets = {}
+
+    def intern(data):
+        if data not in offsets:
+            offsets[data] = len(strings)
+            strings.extend(data)
+        return offsets[data], len(data)
+
+    # Sources first and in sorted order, so the string section doubles as
+    # a sorted string table; translations and replacements are shared when equal
+    for key, _ in encoded:
+        intern(key)
+    sources = list(entries)
+    records = bytearray()
+    order = [0] * len(encoded)
+    for index, (key, position) in enumerate(encoded):
+        source = sources[position]
+        literal, hits = replacements[source]
+        fields = intern(key) + intern(entries[source].encode("utf-8")) + intern(literal.encode("utf-8")) + \
+            intern(placeholder_signature(source).encode("ascii"))
+        records += RECORD.pack(*fields, position, hits)
+        order[position] = index
+
+    slots = 8
+    while slots < len(encoded) * 2:
+        slots *= 2
+    index_table = [(0, 0)] * slots
+    for number, (key, _) in enumerate(encoded):
+        value = zlib.crc32(key)
+        slot = value & (slots - 1)
+        while index_table[slot][1]:
+            slot = (slot + 1) & (slots - 1)
+        index_table[slot] = (value, number + 1)
+
+    records_offset = HEADER.size
+    order_offset = records_offset + len(records)
+    index_offset = order_offset + ORDER.size * len(order)
+    strings_offset = index_offset + SLOT.size * slots
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded), slots, records_offset, order_offset, index_offset,
+                         strings_offset, source_stat[0], source_stat[1], digest)
+    return b"".join([header, bytes(records), b"".join(ORDER.pack(number) for number in order),
+                     b"".join(SLOT.pack(*slot) for slot in index_table), bytes(strings)])
+
+def compile_catalogue(source, target):
+    """Compile a source file to `target` (atomically); returns the number of entries"""
+    with open(source, "rb") as f:
+        digest = hashlib.sha256(f.read()).digest()
+    stat = os.stat(source)
+    entries = read_source(source)
+    check_signatures(entries, source)
+    data = compile_entries(entries, (stat.st_mtime_ns, stat.st_size), digest)
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    with open(target + f".{os.getpid()}.tmp", "wb") as f:
+        f.write(data)
+    os.replace(target + f".{os.getpid()}.tmp", target)
+    return len(entries)
+
+def is_current(source, target):
+    """True when `target` was compiled from `source` as it is now; only the header is read"""
+    try:
+        with open(target, "rb") as f:
+            header = f.read(HEADER.size)
+        stat = os.stat(source)
+    except OSError:
+        return False
+    if len(header) != HEADER.size:
+        return False
+    magic, version, *_, mtime_ns, size, _ = HEADER.unpack(header)
+    return magic == MAGIC and version == FORMAT_VERSION and (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size)
+
+class Catalogue:
+    """A compiled catalogue, memory-mapped on first use
+
+    Nothing is read when the object is made. The first lookup recompiles
+    the file if the source has changed, maps it and reads the header; a
+    lookup after that hashes the key and probes the index, so neither cost
+    grows with the number of entries. Strings are decoded as they are
+    looked up, never all at once.
+    """
+
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source
+        self._map = None
+
+    def _open(self):
+        if self.source and os.path.exists(self.source) and not is_current(self.source, self.path):
+            compile_catalogue(self.source, self.path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._count, self._slots, self._records, self._order, self._index, self._strings,
+         _, _, self._digest) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise CatalogueError(f"{self.path}: ikke et katalog i format {FORMAT_VERSION}")
+
+    @property
+    def data(self):
+        if self._map is None:
+            self._open()
+        return self._map
+
+    def __len__(self):
+        self.data
+        return self._count
+
+    @property
+    def digest(self):
+        """SHA-256 of the source the catalogue was compiled from"""
+        self.data
+        return self._digest.hex()
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _record(self, number):
+        return RECORD.unpack_from(self._map, self._records + number * RECORD.size)
+
+    def find(self, source):
+        """Record number of `source`, or -1"""
+        data = self.data
+        key = source.encode("utf-8")
+        value = zlib.crc32(key)
+        mask = self._slots - 1
+        slot = value & mask
+        while True:
+            stored, number = SLOT.unpack_from(data, self._index + slot * SLOT.size)
+            if not number:
+                return -1
+            if stored == value:
+                offset, length = RECORD.unpack_from(data, self._records + (number - 1) * RECORD.size)[:2]
+                start = self._strings + offset
+                if length == len(key) and data[start:start + length] == key:
+                    return number - 1
+            slot = (slot + 1) & mask
+
+    def __contains__(self, source):
+        return self.find(source) >= 0
+
+    def get(self, source, default=None):
+        number = self.find(source)
+        if number < 0:
+            return default
+        return self._string(*self._record(number)[2:4])
+
+    def replacement(self, source):
+        """(literal, hits) as auto-translate.py writes it for `source`, or None"""
+        number = self.find(source)
+        if number < 0:
+            return None
+        record = self._record(number)
+        return self._string(record[4], record[5]), record[9]
+
+    def signature(self, source):
+        number = self.find(source)
+        return None if number < 0 else self._string(*self._record(number)[6:8])
+
+    def entry(self, number):
+        """(source, translation) of a record"""
+        record = self._record(number)
+        return self._string(record[0], record[1]), self._string(record[2], record[3])
+
+    def items(self):
+        """(source, translation) pairs in source file order"""
+        data = self.data
+        for position in range(self._count):
+            yield self.entry(ORDER.unpack_from(data, self._order + position * ORDER.size)[0])
+
+    def sorted_items(self):
+        """(source, translation) pairs sorted by the UTF-8 bytes of the source"""
+        self.data
+        for number in range(self._count):
+            yield self.entry(number)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+_catalogues = {}
+
+def open_catalogue(locale=DEFAULT_LOCALE):
+    """The shared, lazily opened Catalogue for a locale"""
+    if locale not in _catalogues:
+        _catalogues[locale] = Catalogue(compiled_path(locale), source_path(locale))
+    return _catalogues[locale]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kompilér oversættelseskataloget til den binære fil værktøjerne læser.")
+    parser.add_argument("--locale", action="append", help="Sprog der kompileres (standard: alle i languages/)")
+    args = parser.parse_args(argv)
+    locales = args.locale or sorted(name[len("translations-"):-len(".tsv")] for name in os.listdir(SOURCE_DIR)
+                                    if name.startswith("translations-") and name.endswith(".tsv"))
+    failed = 0
+    for locale in locales:
+        started = time.perf_counter()
+        try:
+            count = compile_catalogue(source_path(locale), compiled_path(locale))
+        except CatalogueError as error:
+            print(f"❌ {error}")
+            failed += 1
+            continue
+        print(f"✓ {compiled_path(locale)}: {count} oversættelser på {(time.perf_counter() - started) * 1000:.1f} ms")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Offline validering af medlemskabsdata
+Kører de samme tjek som Membership_Manager::validate_membership_data() på et snapshot af medlemskabstabellen
+og ordrerne, med joins over hele tabeller i stedet for wc_get_order() pr. ordre
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from membership_snapshot import load_membership_products, open_snapshot, php_empty_sql
+
+MANUAL_NOTE = "Manuelt oprettet medlemskab"
+NOTE_EMAIL = re.compile(r"mailadresse:\s*([^\s]+@[^\s]+)")
+CHECKED_STATUSES = ("completed", "processing")
+ISSUE_ICONS = {"error": "❌", "warning": "⚠", "info": "ℹ"}
+
+# What the PHP loop derives from an order's line items. The first item that
+# is a configured membership product or a subscription product decides
+# expected_automatic; the manual/guest messages name the first configured
+# membership product. MIN() picks the other columns from the row it chose.
+ORDER_PRODUCTS = """
+CREATE TEMP TABLE first_hits (order_id INTEGER PRIMARY KEY, item_id INTEGER, automatic INTEGER);
+INSERT INTO first_hits
+SELECT i.order_id, MIN(i.item_id), COALESCE(p.automatic, 1)
+FROM order_items i
+LEFT JOIN membership_products p ON p.product_id = i.product_id
+WHERE p.product_id IS NOT NULL OR i.is_subscription
+GROUP BY i.order_id;
+
+CREATE TEMP TABLE first_products (order_id INTEGER PRIMARY KEY, item_id INTEGER, name TEXT, automatic INTEGER);
+INSERT INTO first_products
+SELECT i.order_id, MIN(i.item_id), i.name, p.automatic
+FROM order_items i
+JOIN membership_products p ON p.product_id = i.product_id
+GROUP BY i.order_id;
+"""
+
+# Every checked order with a membership product, numbered in wc_get_orders() order
+MEMBERSHIP_ORDERS = """
+CREATE TEMP TABLE membership_orders AS
+SELECT o.*,
+       ROW_NUMBER() OVER (ORDER BY o.date_created DESC, o.id DESC) AS seq,
+       hit.automatic AS expected_automatic,
+       NOT {created_empty} AND NOT {ids_empty} AS linked,
+       product.name AS product_name,
+       product.automatic AS product_automatic
+FROM first_hits hit
+JOIN orders o ON o.id = hit.order_id
+LEFT JOIN first_products product ON product.order_id = hit.order_id
+WHERE o.status IN (?, ?, ?, ?)
+""".format(created_empty=php_empty_sql("o.membership_created"), ids_empty=php_empty_sql("o.membership_ids"))
+
+# wc_get_order_notes() returns the 10 newest notes; the first of those with
+# the manual membership marker is the one the PHP reads the e-mail from
+MANUAL_NOTES = """
+CREATE TEMP TABLE manual_notes AS
+SELECT order_id, content FROM (
+    SELECT order_id, content, ROW_NUMBER() OVER (PARTITION BY order_id ORDER BY newest) AS hit
+    FROM (
+        SELECT n.order_id, n.content,
+               ROW_NUMBER() OVER (PARTITION BY n.order_id ORDER BY n.date_created DESC, n.note_id DESC) AS newest
+        FROM membership_orders mo
+        JOIN order_notes n ON n.order_id = mo.id
+        WHERE mo.user_id IS NULL OR mo.user_id = 0
+    )
+    WHERE newest <= 10 AND instr(content, ?) > 0
+)
+WHERE hit = 1
+"""
+
+GUEST_ORDERS = """
+SELECT mo.seq, mo.id, mo.billing_email, mo.billing_first_name, mo.billing_last_name,
+       mo.product_name, mo.product_automatic, note.content
+FROM membership_orders mo
+LEFT JOIN manual_notes note ON note.order_id = mo.id
+WHERE mo.user_id IS NULL OR mo.user_id = 0
+"""
+
+LINKED_MEMBERSHIPS = """
+SELECT mo.seq, link.key, mo.id, mo.user_id, link.value, s.id IS NOT NULL, s.user_id,
+       s.renewal_type, mo.expected_automatic
+FROM membership_orders mo, json_each(php_list_json(mo.membership_ids)) link
+LEFT JOIN membership_subscriptions s ON s.id = CAST(link.value AS INTEGER)
+WHERE mo.user_id <> 0 AND mo.linked
+"""
+
+# get_user_membership(): the user's membership with the latest end_date
+UNLINKED_ORDERS = """
+SELECT mo.seq, mo.id, mo.user_id, mo.subscription_relation, mo.subscription_id, latest.id
+FROM membership_orders mo
+LEFT JOIN (
+    SELECT user_id, id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY end_date DESC, id) AS rank
+    FROM membership_subscriptions
+) latest ON latest.user_id = mo.user_id AND latest.rank = 1
+WHERE mo.user_id <> 0 AND NOT mo.linked
+"""
+
+ORPHANED_MEMBERSHIPS = """
+SELECT s.id, s.user_id
+FROM membership_subscriptions s
+WHERE s.user_id NOT IN (SELECT user_id FROM membership_orders WHERE user_id <> 0)
+ORDER BY s.id
+"""
+
+def guest_issue(order_id, email, first_name, last_name, product_name, product_automatic, note):
+    if note is not None:
+        match = NOTE_EMAIL.search(note)
+        renewal_type = "" if product_automatic is None else (
+            "automatisk fornyelse" if product_automatic else "manuel fornyelse")
+        return {
+            "type": "warning",
+            "order_id": order_id,
+            "message": "Ordre #%d: Manuelt oprettet medlemskab (kontant betaling) - %s (%s)%s" % (
+                order_id, product_name or "", renewal_type, " - Admin: " + match.group(1) if match else ""),
+        }
+    name = f"{first_name} {last_name}".strip(" \t\n\r\0\x0b")
+    return {
+        "type": "warning",
+        "order_id": order_id,
+        "message": "Ordre #%d: Guest checkout (ingen brugerkonto) - %s%s%s" % (
+            order_id, name or "Ingen navn", f" ({email})" if email else "",
+            f" - {product_name}" if product_name else ""),
+    }
+
+def linked_issue(order_id, user_id, membership_value, exists, owner, renewal_type, expected_automatic,
+                 check_renewal_type):
+    membership_id = int(float(membership_value)) if re.match(r"-?\d", str(membership_value)) else 0
+    if not exists:
+        return {
+            "type": "error",
+            "order_id": order_id,
+            "membership_id": membership_id,
+            "message": "Ordre #%d refererer til medlemskab #%d som ikke længere findes i databasen." % (
+                order_id, membership_id),
+        }
+    if owner != user_id:
+        return {
+            "type": "error",
+            "order_id": order_id,
+            "membership_id": membership_id,
+            "message": "Ordre #%d (bruger %d) har medlemskab #%d men medlemskabet tilhører bruger %d." % (
+                order_id, user_id, membership_id, owner),
+        }
+    expected = "automatic" if expected_automatic else "manual"
+    if check_renewal_type and renewal_type != expected:
+        return {
+            "type": "warning",
+            "order_id": order_id,
+            "membership_id": membership_id,
+            "message": "Ordre #%d: medlemskab #%d har fornyelsestype %s, men produktet er %s." % (
+                order_id, membership_id, renewal_type, expected),
+        }
+    return None
+
+def unlinked_issue(order_id, user_id, relation, subscription_id, membership_id):
+    is_renewal = relation == "renewal"
+    is_parent = relation == "parent"
+    subscription = " (Abonnement #%d)" % subscription_id if subscription_id else ""
+    if membership_id is not None:
+        return {
+            "type": "info" if is_renewal or is_parent else "warning",
+            "order_id": order_id,
+            "user_id": user_id,
+            "membership_id": membership_id,
+            "message": "Ordre #%d (%s) mangler link til medlemskab #%d%s" % (
+                order_id, "fornyelse" if is_renewal else ("parent" if is_parent else f"bruger {user_id}"),
+                membership_id, subscription),
+        }
+    if is_renewal:
+        return {
+            "type": "info",
+            "order_id": order_id,
+            "user_id": user_id,
+            "message": "Fornyelsesordre #%d (bruger %d) uden medlemskab - forventer parent ordre har oprettet det%s" % (
+                order_id, user_id, subscription),
+        }
+    return {
+        "type": "error",
+        "order_id": order_id,
+        "user_id": user_id,
+        "message": "Ordre #%d (bruger %d) burde have medlemskab men der eksisterer ikke noget for denne bruger." % (
+            order_id, user_id),
+    }
+
+def validate(connection, automatic=None, manual=None, check_renewal_type=False):
+    """The results array of validate_membership_data() for a snapshot
+
+    Issues come in the same order as in PHP: orders newest first (the
+    wc_get_orders() default), then memberships by ID. With
+    check_renewal_type, linked memberships whose renewal_type differs from
+    what the order's product implies are reported as well; the PHP computes
+    that expectation but does not report it.
+    """
+    results = {
+        "total_orders_checked": 0,
+        "total_memberships_checked": 0,
+        "orders_with_membership": 0,
+        "orders_without_membership": 0,
+        "memberships_with_order": 0,
+        "orphaned_memberships": 0,
+        "data_mismatches": 0,
+        "issues": [],
+        "success": True,
+    }
+    automatic, manual = load_membership_products(connection, automatic, manual)
+    if not automatic and not manual:
+        results["success"] = False
+        results["issues"].append({
+            "type": "error",
+            "message": "Ingen medlemskabsprodukter konfigureret. Konfigurer venligst medlemskabsprodukter i indstillinger først.",
+        })
+        return results
+
+    statuses = CHECKED_STATUSES + tuple(f"wc-{status}" for status in CHECKED_STATUSES)
+    results["total_orders_checked"] = connection.execute(
+        f"SELECT COUNT(*) FROM orders WHERE status IN ({', '.join('?' for _ in statuses)})", statuses).fetchone()[0]
+    connection.executescript(ORDER_PRODUCTS)
+    connection.execute(MEMBERSHIP_ORDERS, statuses)
+
+    # (seq, position) keeps each order's issues where the PHP loop emits them
+    order_issues = []
+    connection.execute(MANUAL_NOTES, (MANUAL_NOTE,))
+    connection.execute("CREATE INDEX temp.manual_note_order ON manual_notes (order_id)")
+    for seq, order_id, *fields in connection.execute(GUEST_ORDERS):
+        results["orders_without_membership"] += 1
+        order_issues.append(((seq, 0), guest_issue(order_id, *fields)))
+
+    linked_orders = set()
+    for seq, position, order_id, user_id, *fields in connection.execute(LINKED_MEMBERSHIPS):
+        linked_orders.add(order_id)
+        issue = linked_issue(order_id, user_id, *fields, check_renewal_type)
+        if issue:
+            if issue["type"] == "error":
+                results["data_mismatches"] += 1
+            order_issues.append(((seq, position), issue))
+    results["orders_with_membership"] = len(linked_orders)
+
+    for seq, *fields in connection.execute(UNLINKED_ORDERS):
+        results["orders_without_membership"] += 1
+        order_issues.append(((seq, 0), unlinked_issue(*fields)))
+
+    order_issues.sort(key=lambda item: item[0])
+    results["issues"] = [issue for _, issue in order_issues]
+
+    results["total_memberships_checked"] = connection.execute(
+        "SELECT COUNT(*) FROM membership_subscriptions").fetchone()[0]
+    for membership_id, user_id in connection.execute(ORPHANED_MEMBERSHIPS):
+        results["orphaned_memberships"] += 1
+        results["issues"].append({
+            "type": "info",
+            "membership_id": membership_id,
+            "user_id": user_id,
+            "message": "Medlemskab #%d (bruger %d) har ingen tilknyttet fuldført ordre med medlemskabsprodukter. "
+                       "Kan være manuelt oprettet eller migreret." % (membership_id, user_id),
+        })
+    results["memberships_with_order"] = results["total_memberships_checked"] - results["orphaned_memberships"]
+    return results
+
+def parse_ids(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valider medlemskabsdata offline mod et snapshot af ordrer og medlemskaber.")
+    parser.add_argument("snapshot", help="SQLite-fil eller mappe med CSV-filer (se membership_snapshot.py)")
+    parser.add_argument("--automatic-products", type=parse_ids, help="Produkt-ID'er med automatisk fornyelse (standard: fra options)")
+    parser.add_argument("--manual-products", type=parse_ids, help="Produkt-ID'er med manuel fornyelse (standard: fra options)")
+    parser.add_argument("--renewal-type", action="store_true", help="Rapporter også forkert renewal_type på linkede medlemskaber")
+    parser.add_argument("--limit", type=int, default=50, help="Antal problemer der vises (0 = alle)")
+    parser.add_argument("--json", action="store_true", help="Skriv resultatet som JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    connection = open_snapshot(args.snapshot)
+    loaded = time.perf_counter()
+    results = validate(connection, args.automatic_products, args.manual_products, args.renewal_type)
+    finished = time.perf_counter()
+
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0 if results["success"] else 1
+
+    issues = results["issues"]
+    for issue in issues[:args.limit or None]:
+        print(f"{ISSUE_ICONS.get(issue['type'], '•')} {issue['message']}")
+    if args.limit and len(issues) > args.limit:
+        print(f"   ... og {len(issues) - args.limit} mere")
+
+    print(f"\n{'='*60}\n📊 Resultat\n{'='*60}")
+    print(f"   Ordrer tjekket: {results['total_orders_checked']}")
+    print(f"   Medlemskaber tjekket: {results['total_memberships_checked']}")
+    print(f"   Ordrer med medlemskab: {results['orders_with_membership']}")
+    print(f"   Ordrer uden medlemskab: {results['orders_without_membership']}")
+    print(f"   Medlemskaber med ordre: {results['memberships_with_order']}")
+    print(f"   Forældreløse medlemskaber: {results['orphaned_memberships']}")
+    print(f"   Data uoverensstemmelser: {results['data_mismatches']}")
+    print(f"   Problemer: {len(issues)}")
+    print(f"\n✅ Indlæst på {loaded - started:.2f} s, valideret på {finished - loaded:.2f} s")
+    return 0 if results["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Profilering af medlemskabsdata validering
+Parrer log-markørerne fra validate_membership_data() pr. kørsel, måler ordre-scanning og medlemskabstjek
+og sammenligner tiden pr. ordre og pr. medlemskab med en gemt baseline
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+
+from membership_log import LOG_DIR, log_files, parse_timestamp, scan_files
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(PLUGIN_DIR, "benchmarks", "validation-baseline.json")
+
+# Markers logged by Membership_Manager::validate_membership_data()
+START = b"Starter medlemskabsdata validering."
+MAP_CHECK = b"Tjekker medlemskaber mod ordre kort..."
+SUMMARY = re.compile(rb"Validering fuldf\xc3\xb8rt: (\d+) ordrer tjekket, (\d+) medlemskaber tjekket, (\d+) problemer fundet\.")
+FAILURE = b"Validering mislykkedes"
+
+# Metrics compared against the baseline; lower is better for all of them
+METRICS = ["ms_per_order", "ms_per_membership", "seconds"]
+
+def collect_runs(paths):
+    """Completed validation runs in log order as dicts
+
+    Part 1 (the wc_get_order() loop over every order) runs from the start
+    marker to "Tjekker medlemskaber mod ordre kort...", part 2 (the
+    membership table against the order map) from there to the summary.
+    Log timestamps have one-second resolution, so short phases read as 0.
+    """
+    runs = []
+    current = None
+    failed = 0
+    for timestamp, _, message, _ in scan_files(paths):
+        if message == START:
+            current = {"started": timestamp, "map_check": None}
+        elif current is None:
+            continue
+        elif message == MAP_CHECK:
+            current["map_check"] = timestamp
+        elif message.startswith(FAILURE):
+            failed += 1
+            current = None
+        else:
+            match = SUMMARY.match(message)
+            if match:
+                runs.append(run_metrics(current, timestamp, *map(int, match.groups())))
+                current = None
+    return runs, failed
+
+def run_metrics(markers, finished, orders, memberships, problems):
+    started = parse_timestamp(markers["started"])
+    map_check = parse_timestamp(markers["map_check"] or finished)
+    end = parse_timestamp(finished)
+    order_scan = (map_check - started).total_seconds()
+    membership_check = (end - map_check).total_seconds()
+    return {
+        "started": markers["started"].decode(),
+        "orders": orders,
+        "memberships": memberships,
+        "problems": problems,
+        "seconds": order_scan + membership_check,
+        "order_scan": order_scan,
+        "membership_check": membership_check,
+        "ms_per_order": order_scan * 1000 / orders if orders else None,
+        "ms_per_membership": membership_check * 1000 / memberships if memberships else None,
+        "orders_per_second": orders / order_scan if order_scan else None,
+    }
+
+def summarize(runs):
+    """Median of each metric over the runs, ignoring runs where it is undefined"""
+    summary = {"runs": len(runs)}
+    for metric in METRICS + ["orders", "memberships"]:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        summary[metric] = round(statistics.median(values), 3) if values else None
+    return summary
+
+def order_cost_trend(runs):
+    """Least-squares slope of ms per order against order count (ms per order per 1000 orders)
+
+    A positive slope means each order gets more expensive as the shop grows,
+    rather than the pass merely taking longer because there are more orders.
+    """
+    points = [(run["orders"], run["ms_per_order"]) for run in runs if run["ms_per_order"] is not None]
+    if len({orders for orders, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    return round(numerator / denominator * 1000, 4)
+
+def compare(summary, baseline, tolerance):
+    """[(metric, baseline, current, change)] for metrics worse than baseline by more than tolerance"""
+    regressions = []
+    for metric in METRICS:
+        before, after = baseline.get(metric), summary.get(metric)
+        if not before or after is None:
+            continue
+        change = after / before - 1
+        if change > tolerance:
+            regressions.append((metric, before, after, change))
+    return regressions
+
+def format_value(value, unit=""):
+    return "–" if value is None else f"{value:.1f}{unit}"
+
+def print_report(runs, failed, summary, trend):
+    print(f"{'start':<21}{'ordrer':>8}{'medl.':>7}{'fejl':>6}{'del 1':>8}{'del 2':>8}{'ms/ordre':>10}{'ms/medl.':>10}")
+    for run in runs:
+        print(f"{run['started']:<21}{run['orders']:>8}{run['memberships']:>7}{run['problems']:>6}"
+              f"{format_value(run['order_scan'], 's'):>8}{format_value(run['membership_check'], 's'):>8}"
+              f"{format_value(run['ms_per_order']):>10}{format_value(run['ms_per_membership']):>10}")
+
+    print(f"\n{'='*60}\n📊 Median af {summary['runs']} kørsler\n{'='*60}")
+    print(f"   Varighed: {format_value(summary['seconds'], ' s')}")
+    print(f"   Ordre-scanning: {format_value(summary['ms_per_order'], ' ms')} pr. ordre")
+    print(f"   Medlemskabstjek: {format_value(summary['ms_per_membership'], ' ms')} pr. medlemskab")
+    if trend is not None:
+        print(f"   Tendens: {trend:+.2f} ms pr. ordre for hver 1000 ekstra ordrer")
+    if failed:
+        print(f"   ⚠ {failed} kørsler mislykkedes")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profilér medlemskabsdata validering ud fra membership.log.")
+    parser.add_argument("files", nargs="*", help="Logfiler (standard: logs/membership.log og alle .bak-filer)")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Mappe med logfiler")
+    parser.add_argument("--last", type=int, help="Brug kun de seneste N kørsler")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON-fil med baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Gem resultatet som ny baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tilladt forværring før regression (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="Skriv resultatet som JSON")
+    args = parser.parse_args(argv)
+
+    paths = args.files or log_files(args.log_dir)
+    runs, failed = collect_runs(paths)
+    if args.last:
+        runs = runs[-args.last:]
+    if not runs:
+        print("⚠ Ingen fuldførte valideringskørsler fundet")
+        return 1
+
+    summary = summarize(runs)
+    trend = order_cost_trend(runs)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(summary, baseline, args.tolerance) if baseline else []
+
+    if args.json:
+        json.dump({"runs": runs, "failed": failed, "summary": summary, "trend": trend,
+                   "baseline": baseline, "regressions": [r[0] for r in regressions]},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(runs, failed, summary, trend)
+        if args.save_baseline:
+            print(f"\n✓ Baseline gemt i {args.baseline}")
+        elif baseline:
+            for metric, before, after, change in regressions:
+                print(f"\n⚠ Regression i {metric}: {before:.3f} → {after:.3f} ({change:+.0%})")
+            if not regressions:
+                print(f"\n✅ Inden for {args.tolerance:.0%} af baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())